@@ -147,12 +147,9 @@ def main():
     remove_purview_protection(str(contract_analysis.document.pdf_path_to_use))
 
 
-    print("Analyzing document layout...")
+    print("Analyzing document layout and extracting fields...")
     contract_analysis.document_intelligence.init_document_analysis_client()
-    contract_analysis.document_intelligence.analyse_document_layout()
-
-    print("Extracting document fields...")
-    contract_analysis.document_intelligence.extract_document_fields()
+    contract_analysis.document_intelligence.analyse_document()
 
     print("Contract analysis completed.")
 
@@ -166,6 +163,11 @@ def main():
         confidence = contract_analysis.field_confidence_dict.get(field, 0.0)
         print(f"{field}: {value} (Confidence: {confidence:.2f})")
 
+    print("\n🔎 Verifying low-confidence fields:")
+    for field, check in contract_analysis.verify_fields(threshold=0.8).items():
+        status = "confirmed" if check.confirmed else f"suggested: {check.verified_value}"
+        print(f"{field} (pages {check.pages}): {check.value} -> {status}")
+
 
 
     # Run content understanding with the provided schema
@@ -175,14 +177,17 @@ def main():
     # Run GPT checks
     full_text = "\n".join(contract_analysis.document_layout_pages)
 
+    # packed=True sends the contract once for all three checks; checks it could not answer run in parallel
+    checks = contract_analysis.gpt.run_prompts(["Partner_Prime", "Scope", "Timelines"], full_text, clean=True, packed=True)
+
     print("\n🤝 Partner Prime Check:")
-    print(contract_analysis.gpt.run_prompt("Partner_Prime", full_text, clean=True)[0])
+    print(checks["Partner_Prime"][0])
 
     print("\n📦 Scope Check:")
-    print(contract_analysis.gpt.run_prompt("Scope", full_text, clean=True)[0])
+    print(checks["Scope"][0])
 
     print("\n🗓️ Timelines Check:")
-    print(contract_analysis.gpt.run_prompt("Timelines", full_text, clean=True)[0])
+    print(checks["Timelines"][0])
 
 
     print("\n✅ Contract analysis completed.")
@@ -3,7 +3,7 @@
 Compare two contracts using GPT only (no DI, no CU). Handles:
 - .pdf or .docx inputs (PDF -> DOCX normalization via Document.from_file()).
 - Purview-protected files (unprotected via PowerShell before processing).
-- Large files via size-based chunking with overlap + per-chunk GPT comparison + final consolidation.
+- Large files via token-based chunking with overlap + per-chunk GPT comparison + final consolidation.
 - No translation: comparison is performed in the original language for precision.
 
 Requirements:
@@ -18,6 +18,7 @@ from typing import List, Tuple
 
 import yaml
 from src.contract_analysis import ContractAnalysis
+from src.contract_analysis.chunking import TextChunker
 
 # =============================================================================
 # Configuration
@@ -75,23 +76,15 @@ def remove_purview_protection(file_path: str):
 # =============================================================================
 # Chunking utilities
 # =============================================================================
-def chunk_text(text: str, max_chars: int = 6000, overlap: int = 400) -> List[str]:
+def chunk_text(text: str, max_tokens: int = 1500, overlap_tokens: int = 100) -> List[str]:
     """
-    Size-based chunker with overlap to preserve context across boundaries.
-    Keep chunks conservative because the GPT wrapper is configured with small max_tokens.
+    Token-based chunker with overlap to preserve context across boundaries.
+    Chunks end on paragraph or clause boundaries; each holds at most max_tokens tokens, so that
+    a pair of chunks and the prompt fit the deployment's context window on the first try.
     """
     if not text:
         return []
-    chunks: List[str] = []
-    start = 0
-    n = len(text)
-    while start < n:
-        end = min(n, start + max_chars)
-        chunks.append(text[start:end])
-        if end == n:
-            break
-        start = max(0, end - overlap)
-    return chunks
+    return TextChunker(max_tokens, overlap_tokens).split(text)
 
 
 def pair_chunks(a_chunks: List[str], b_chunks: List[str]) -> List[Tuple[int, str, str]]:
@@ -233,7 +226,7 @@ def extract_text_for_gpt(ca: ContractAnalysis) -> str:
 
 
 def compare_in_chunks(caA: ContractAnalysis, caB: ContractAnalysis,
-                      max_chars: int = 6000, overlap: int = 400) -> str:
+                      max_tokens: int = 1500, overlap_tokens: int = 100) -> str:
     """
     1) Split A and B into chunks.
     2) Compare pairwise chunk i of A vs i of B using GPT.
@@ -242,8 +235,8 @@ def compare_in_chunks(caA: ContractAnalysis, caB: ContractAnalysis,
     textA = extract_text_for_gpt(caA)
     textB = extract_text_for_gpt(caB)
 
-    a_chunks = chunk_text(textA, max_chars=max_chars, overlap=overlap)
-    b_chunks = chunk_text(textB, max_chars=max_chars, overlap=overlap)
+    a_chunks = chunk_text(textA, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+    b_chunks = chunk_text(textB, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
     pairs = pair_chunks(a_chunks, b_chunks)
 
     if not pairs:
@@ -280,7 +273,7 @@ def main():
     caB = build_analysis_instance(fB)
 
     # Chunked comparison + consolidation
-    final_report = compare_in_chunks(caA, caB, max_chars=6000, overlap=400)
+    final_report = compare_in_chunks(caA, caB, max_tokens=1500, overlap_tokens=100)
 
     print("\n===== GPT Contract Comparison (GPT-only, chunked) =====\n")
     print(final_report)
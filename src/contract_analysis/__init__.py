@@ -6,17 +6,41 @@ It integrates Azure AI services, OpenAI GPT, and custom logic for document proce
 
 Modules:
 - document: Handles DOCX/PDF conversion and text extraction.
+- docx_backend: Word automation and pure-Python OpenXML backends used by Document.
+- cache: On-disk caches shared across runs and worker processes.
+- throttling: Retry-After parsing, jittered backoff and adaptive concurrency limits.
+- http_transport: Connection-pooled HTTP client shared by the REST based services.
+- credentials: Process-wide token broker shared by all services.
 - translation: Translates documents using Azure Translator.
+- translation_memory: Persistent SQLite segment cache for translations.
+- language_detection: Offline script and stop-word based language detection.
 - document_intelligence: Extracts structured data using Azure Document Intelligence.
+- layout_index: Compact, queryable store of the lines of analyzed documents.
+- field_verification: GPT verification of low-confidence Document Intelligence fields.
 - content_understanding: Interfaces with Azure Content Understanding for semantic analysis.
+- chunking: Token-aware text chunking at paragraph and clause boundaries.
 - openai_gpt: Wraps Azure OpenAI GPT for prompt-based processing.
 - contract_analysis: Orchestrates the full contract analysis pipeline.
 
 Exports:
 - Document
+- ParsedDocument
+- TranslationResult
+- DocxBackend
+- WordBackend
+- OpenXmlBackend
+- ConversionCache
+- ResultCache
+- HttpTransport
+- TokenBroker
 - Translation
+- TranslationMemory
 - DocumentIntelligence
+- AsyncDocumentIntelligence
+- LayoutIndex
+- FieldVerifier
 - ContentUnderstanding
+- TextChunker
 - OpenAIGPT
 - ContractAnalysis
 """
@@ -25,20 +49,86 @@ Exports:
 __version__ = "0.1.2"
 
 
-from .document import Document
-from .translation import Translation
-from .document_intelligence import DocumentIntelligence
-from .content_understanding import ContentUnderstanding
-from .content_understanding import Settings
-from .openai_gpt import OpenAIGPT
-from .contract_analysis import ContractAnalysis
+import importlib
+from typing import TYPE_CHECKING
+
+# Submodules are imported on first attribute access (PEP 562), so that importing the package does
+# not load the Azure, OpenAI and COM client libraries that a given run may never use.
+_EXPORTS = {
+    "Document": ".document",
+    "ParsedDocument": ".document",
+    "TranslationResult": ".document",
+    "DocxBackend": ".docx_backend",
+    "WordBackend": ".docx_backend",
+    "OpenXmlBackend": ".docx_backend",
+    "ConversionCache": ".cache",
+    "ResultCache": ".cache",
+    "HttpTransport": ".http_transport",
+    "TokenBroker": ".credentials",
+    "Translation": ".translation",
+    "TranslationMemory": ".translation_memory",
+    "DocumentIntelligence": ".document_intelligence",
+    "AsyncDocumentIntelligence": ".document_intelligence",
+    "LayoutIndex": ".layout_index",
+    "FieldVerifier": ".field_verification",
+    "ContentUnderstanding": ".content_understanding",
+    "Settings": ".content_understanding",
+    "TextChunker": ".chunking",
+    "OpenAIGPT": ".openai_gpt",
+    "ContractAnalysis": ".contract_analysis",
+}
+
+if TYPE_CHECKING:
+    from .document import Document, ParsedDocument, TranslationResult
+    from .docx_backend import DocxBackend, WordBackend, OpenXmlBackend
+    from .cache import ConversionCache, ResultCache
+    from .http_transport import HttpTransport
+    from .credentials import TokenBroker
+    from .translation import Translation
+    from .translation_memory import TranslationMemory
+    from .document_intelligence import DocumentIntelligence, AsyncDocumentIntelligence
+    from .layout_index import LayoutIndex
+    from .field_verification import FieldVerifier
+    from .content_understanding import ContentUnderstanding
+    from .content_understanding import Settings
+    from .chunking import TextChunker
+    from .openai_gpt import OpenAIGPT
+    from .contract_analysis import ContractAnalysis
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "Document",
+    "ParsedDocument",
+    "TranslationResult",
+    "DocxBackend",
+    "WordBackend",
+    "OpenXmlBackend",
+    "ConversionCache",
+    "ResultCache",
+    "HttpTransport",
+    "TokenBroker",
     "Translation",
+    "TranslationMemory",
     "DocumentIntelligence",
+    "AsyncDocumentIntelligence",
+    "LayoutIndex",
+    "FieldVerifier",
     "ContentUnderstanding",
     "Settings",
+    "TextChunker",
     "OpenAIGPT",
     "ContractAnalysis",
 ]
@@ -0,0 +1,323 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Writes after which a cache directory is measured again, to account for other processes.
+_RESCAN_INTERVAL = 256
+
+_content_hashes: Dict[Tuple[str, int, int], str] = {}
+_content_hashes_lock = threading.Lock()
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """
+    Computes the SHA-256 digest of a file without loading it into memory.
+
+    Args:
+        path (Union[str, Path]): Path to the file.
+
+    Returns:
+        str: Hexadecimal digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(path: Union[str, Path]) -> str:
+    """
+    Returns the SHA-256 digest of a file, reusing it while the file's size and mtime are unchanged.
+
+    Args:
+        path (Union[str, Path]): Path to the file.
+
+    Returns:
+        str: Hexadecimal digest of the file content.
+    """
+    stat = os.stat(path)
+    stamp = (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+    with _content_hashes_lock:
+        digest = _content_hashes.get(stamp)
+    if digest is None:
+        digest = file_sha256(path)
+        with _content_hashes_lock:
+            _content_hashes[stamp] = digest
+    return digest
+
+
+def atomic_copy(source: Union[str, Path], destination: Union[str, Path]):
+    """
+    Copies a file so that readers of ``destination`` never observe a partial write.
+
+    Args:
+        source (Union[str, Path]): File to copy.
+        destination (Union[str, Path]): Target path, replaced if it exists.
+    """
+    destination = Path(destination)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=destination.parent)
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes):
+    """
+    Writes a file so that readers of ``path`` never observe a partial write.
+
+    Args:
+        path (Union[str, Path]): Target path, replaced if it exists.
+        data (bytes): Content.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_text(path: Union[str, Path], text: str):
+    """
+    Writes a text file so that readers of ``path`` never observe a partial write.
+
+    Args:
+        path (Union[str, Path]): Target path, replaced if it exists.
+        text (str): Content, written as UTF-8.
+    """
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _evict_least_recently_used(cache_dir: Path, max_bytes: int) -> int:
+    """
+    Removes the entries with the oldest mtime until the files under ``cache_dir`` fit in ``max_bytes``.
+
+    Returns:
+        int: Total size of the remaining entries.
+    """
+    entries = []
+    total = 0
+    for path in cache_dir.glob("*/*"):
+        if path.name.startswith(".tmp-"):
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
+
+
+class _SizeBudget:
+    """
+    Running total of the size of a cache directory, which triggers eviction past a byte budget.
+
+    The directory is scanned on the first write, when the total passes the budget, and every
+    ``_RESCAN_INTERVAL`` writes, which picks up entries written by other processes sharing it.
+    In between, a write only adds its size to the total.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self._total: Optional[int] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def add(self, size: int, max_bytes: int):
+        """
+        Records a write that grew the directory by ``size`` bytes, evicting entries if needed.
+        """
+        with self._lock:
+            self._writes += 1
+            if self._total is not None:
+                self._total += size
+            scan = self._total is None or self._total > max_bytes or self._writes >= _RESCAN_INTERVAL
+            if scan:
+                self._writes = 0
+        if scan:
+            total = _evict_least_recently_used(self.cache_dir, max_bytes)
+            with self._lock:
+                self._total = total
+
+
+class ConversionCache:
+    """
+    On-disk cache of converted documents, keyed by the content hash of the input and the conversion direction.
+
+    Entries are written atomically and the least recently used ones are evicted once the cache
+    exceeds ``max_bytes``, so several worker processes can safely share one cache directory.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 2 * 1024 ** 3):
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir (Union[str, Path]): Directory holding the cached files. Created if missing.
+            max_bytes (int): Maximum total size of the cached files.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size = _SizeBudget(self.cache_dir)
+
+    def get(self, source_path: Path, direction: str, destination: Path) -> Optional[Path]:
+        """
+        Copies the cached conversion of ``source_path`` to ``destination`` if present.
+
+        Args:
+            source_path (Path): The file that would be converted.
+            direction (str): Conversion direction, e.g. ``"pdf-docx"``.
+            destination (Path): Where the converted file is expected.
+
+        Returns:
+            Optional[Path]: ``destination`` on a cache hit, otherwise None.
+        """
+        entry = self._entry_path(source_path, direction, Path(destination).suffix)
+        try:
+            atomic_copy(entry, destination)
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        return Path(destination)
+
+    def put(self, source_path: Path, direction: str, converted_path: Path):
+        """
+        Stores the result of converting ``source_path``.
+
+        Args:
+            source_path (Path): The converted input file.
+            direction (str): Conversion direction, e.g. ``"pdf-docx"``.
+            converted_path (Path): The conversion output.
+        """
+        entry = self._entry_path(source_path, direction, Path(converted_path).suffix)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        previous_size = _file_size(entry)
+        atomic_copy(converted_path, entry)
+        self._size.add(_file_size(entry) - previous_size, self.max_bytes)
+
+    def _entry_path(self, source_path: Path, direction: str, suffix: str) -> Path:
+        """
+        Returns the cache path for a source file and conversion direction.
+        """
+        key = hashlib.sha256(f"{content_hash(source_path)}:{direction}".encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+
+class ResultCache:
+    """
+    On-disk cache of service results, stored as gzip-compressed JSON.
+
+    Entries expire ``ttl`` seconds after they were written, and the least recently used ones are
+    evicted once the cache exceeds ``max_bytes``. Writes are atomic, so several worker processes
+    can share one cache directory.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], ttl: Optional[float] = 30 * 24 * 3600,
+                 max_bytes: int = 256 * 1024 ** 2):
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir (Union[str, Path]): Directory holding the cached results. Created if missing.
+            ttl (Optional[float]): Lifetime of an entry in seconds; None keeps entries until evicted.
+            max_bytes (int): Maximum total size of the cached results.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._size = _SizeBudget(self.cache_dir)
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """
+        Builds a cache key from its parts, e.g. a content hash, a model id and an API version.
+
+        Args:
+            *parts (str): Key parts.
+
+        Returns:
+            str: Hexadecimal key.
+        """
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the cached value for a key, unless it is missing or expired.
+
+        Args:
+            key (str): Key built with ``key``.
+
+        Returns:
+            Optional[Any]: The decoded value, or None.
+        """
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry.get("value")
+
+    def put(self, key: str, value: Any):
+        """
+        Stores a JSON-serializable value.
+
+        Args:
+            key (str): Key built with ``key``.
+            value (Any): Value to store.
+        """
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"created": time.time(), "value": value}, separators=(",", ":"), ensure_ascii=False)
+        data = gzip.compress(payload.encode("utf-8"))
+        previous_size = _file_size(path)
+        atomic_write_bytes(path, data)
+        self._size.add(len(data) - previous_size, self.max_bytes)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
@@ -0,0 +1,180 @@
+import math
+import re
+from typing import Callable, List, Optional
+
+TokenCounter = Callable[[str], int]
+
+DEFAULT_ENCODING = "o200k_base"
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+_CLAUSE = re.compile(r".+?(?:[.;:!?](?=\s)\s*|\n+|$)", re.DOTALL)
+_WORD = re.compile(r"\S+\s*|\s+")
+
+
+def approximate_token_count(text: str) -> int:
+    """
+    Estimates the number of tokens of a text without a tokenizer.
+
+    Words count one token per four characters, rounded up, and punctuation one token each, which
+    errs on the high side for the BPE encodings of GPT models.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in _PIECE.findall(text))
+
+
+def tiktoken_counter(encoding_name: str = DEFAULT_ENCODING) -> TokenCounter:
+    """
+    Returns a token counter backed by a ``tiktoken`` encoding.
+
+    Args:
+        encoding_name (str): Encoding of the deployed model, e.g. ``o200k_base`` or ``cl100k_base``.
+
+    Returns:
+        TokenCounter: Function returning the number of tokens of a text.
+
+    Raises:
+        ImportError: If ``tiktoken`` is not installed.
+    """
+    import tiktoken
+
+    encoding = tiktoken.get_encoding(encoding_name)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def get_token_counter(encoding_name: str = DEFAULT_ENCODING) -> TokenCounter:
+    """
+    Returns the most accurate local token counter available.
+
+    Args:
+        encoding_name (str): ``tiktoken`` encoding to use when the package is installed.
+
+    Returns:
+        TokenCounter: A ``tiktoken`` counter, or ``approximate_token_count`` without ``tiktoken``.
+    """
+    try:
+        return tiktoken_counter(encoding_name)
+    except Exception:
+        # Not installed, or its encoding files could not be downloaded.
+        return approximate_token_count
+
+
+class TextChunker:
+    """
+    Splits text into chunks that fit a token budget, cutting at paragraph and clause boundaries.
+
+    Paragraphs are packed into a chunk until the next one would exceed ``max_tokens``; a
+    paragraph that is too long on its own is split between clauses (after ``.``, ``;``, ``:``,
+    ``!`` or ``?``), and only a clause that is still too long is split between words. Each chunk
+    after the first repeats the trailing paragraphs or clauses of the previous one, up to
+    ``overlap_tokens``, so that context is not lost at the cut. Joining the chunks without their
+    overlaps gives back the original text.
+    """
+
+    def __init__(self, max_tokens: int, overlap_tokens: int = 0,
+                 count_tokens: Optional[TokenCounter] = None):
+        """
+        Initializes the chunker.
+
+        Args:
+            max_tokens (int): Token budget of a chunk.
+            overlap_tokens (int): Tokens of the previous chunk repeated at the start of the next.
+            count_tokens (Optional[TokenCounter]): Tokenizer; defaults to ``get_token_counter()``.
+        """
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be between 0 and max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens or get_token_counter()
+
+    def split(self, text: str) -> List[str]:
+        """
+        Splits a text into chunks of at most ``max_tokens`` tokens.
+
+        Counts are summed per paragraph or clause, so a chunk may differ from the budget by
+        the few tokens that merge across the cuts.
+
+        Args:
+            text (str): Text to split.
+
+        Returns:
+            List[str]: Chunks, in order; empty for an empty text.
+        """
+        units = [(unit, self.count_tokens(unit)) for unit in self._units(text)]
+        chunks: List[str] = []
+        current: List[tuple] = []
+        size = 0
+        fresh = 0
+        for unit, tokens in units:
+            if current and size + tokens > self.max_tokens:
+                chunks.append("".join(u for u, _ in current))
+                current, size = self._overlap(current, tokens)
+                fresh = 0
+            current.append((unit, tokens))
+            size += tokens
+            fresh += 1
+        if fresh:
+            chunks.append("".join(u for u, _ in current))
+        return chunks
+
+    def count(self, text: str) -> int:
+        """
+        Returns the number of tokens of a text.
+        """
+        return self.count_tokens(text)
+
+    def _units(self, text: str) -> List[str]:
+        """
+        Cuts a text into paragraphs, or clauses and words where a paragraph exceeds the budget.
+        """
+        units: List[str] = []
+        for paragraph in text.splitlines(keepends=True):
+            if not paragraph.strip() and units:
+                units[-1] += paragraph
+            elif self.count_tokens(paragraph) <= self.max_tokens:
+                units.append(paragraph)
+            else:
+                for clause in _CLAUSE.findall(paragraph):
+                    if self.count_tokens(clause) <= self.max_tokens:
+                        units.append(clause)
+                    else:
+                        units.extend(self._words(clause))
+        return units
+
+    def _words(self, clause: str) -> List[str]:
+        """
+        Packs the words of an overlong clause into pieces that fit the budget.
+        """
+        pieces: List[str] = []
+        current = ""
+        size = 0
+        for word in _WORD.findall(clause):
+            tokens = self.count_tokens(word)
+            if current and size + tokens > self.max_tokens:
+                pieces.append(current)
+                current, size = "", 0
+            current += word
+            size += tokens
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def _overlap(self, units: List[tuple], next_tokens: int) -> tuple:
+        """
+        Returns the trailing units to repeat in the next chunk, leaving room for the next unit.
+        """
+        budget = min(self.overlap_tokens, self.max_tokens - next_tokens)
+        kept: List[tuple] = []
+        size = 0
+        for unit, tokens in reversed(units):
+            if size + tokens > budget:
+                break
+            kept.insert(0, (unit, tokens))
+            size += tokens
+        return kept, size
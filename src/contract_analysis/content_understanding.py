@@ -1,12 +1,47 @@
+import heapq
 import logging
+import os
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from pathlib import Path
 from typing import Any, cast
 from dataclasses import dataclass
 
 import requests
 
+from .http_transport import HttpTransport, get_default_transport
+from .throttling import backoff_delay, parse_retry_after
+
+_RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+def _poll_delay(
+    attempt: int,
+    headers: Mapping[str, str] | None,
+    interval: float,
+    max_interval: float,
+) -> float:
+    """
+    Returns the time to wait before polling an operation again.
+
+    The wait is never shorter than ``interval``. A longer ``Retry-After`` delay from the service
+    wins; a zero or past one does not make the poll loop spin. Otherwise the wait grows with
+    jittered exponential backoff up to ``max_interval``.
+
+    Args:
+        attempt (int): Zero-based number of polls that found the operation still running.
+        headers (Mapping[str, str] | None): Headers of the last poll response.
+        interval (float): Minimum delay in seconds.
+        max_interval (float): Maximum delay in seconds.
+
+    Returns:
+        float: Delay in seconds.
+    """
+    retry_after = parse_retry_after(headers)
+    if retry_after is not None:
+        return max(retry_after, interval)
+    return min(max_interval, interval + backoff_delay(attempt, base=interval, cap=max_interval))
+
 
 @dataclass(frozen=True, kw_only=True)
 class Settings:
@@ -53,6 +88,7 @@ class ContentUnderstanding:
         token_provider: Callable[[], str] | None = None,
         analyzer_id: str | None = None,
         x_ms_useragent: str = "cu-sample-code",
+        transport: HttpTransport | None = None,
     ) -> None:
         """
         Initializes the ContentUnderstanding client with required credentials and configuration.
@@ -61,9 +97,11 @@ class ContentUnderstanding:
             endpoint (str): The base URL of the Content Understanding service.
             api_version (str): The API version to use.
             subscription_key (str, optional): The subscription key for authentication.
-            token_provider (Callable, optional): A callable that returns an AAD token.
+            token_provider (Callable, optional): A callable that returns an AAD token. It is called
+                for every request, so providers backed by a TokenBroker stay current.
             analyzer_id (str, optional): The ID of the analyzer to use.
             x_ms_useragent (str): Custom user agent string for tracking.
+            transport (HttpTransport, optional): Pooled HTTP client; defaults to the process-wide one.
         """
         if not subscription_key and token_provider is None:
             raise ValueError(
@@ -78,18 +116,20 @@ class ContentUnderstanding:
         self.api_version: str = api_version
         self.analyzer_id: str | None = analyzer_id
         self.file_location: str = None
+        self.transport: HttpTransport = transport or get_default_transport()
         self._logger: logging.Logger = logging.getLogger(__name__)
         self._logger.setLevel(logging.INFO)
-        self._headers: dict[str, str] = self._get_headers(
-            subscription_key, token_provider and token_provider(), x_ms_useragent
-        )
+        self._subscription_key: str | None = subscription_key
+        self._token_provider: Callable[[], str] | None = token_provider
+        self._x_ms_useragent: str = x_ms_useragent
 
     def begin_analyze(self):
         """
         Initiates an analysis request using either a local file or a URL.
 
         Determines the content type based on the file location and sends a POST request
-        to the Content Understanding service.
+        to the Content Understanding service. Local files are streamed from disk, so memory
+        use does not grow with the file size.
 
         Returns:
             Response: The HTTP response from the service.
@@ -98,33 +138,24 @@ class ContentUnderstanding:
             ValueError: If the file location is invalid.
             HTTPError: If the request fails.
         """
+        url = self._get_analyze_url(self.endpoint, self.api_version, self.analyzer_id)
         if Path(self.file_location).exists():
+            # The body is streamed from the open file with a known length, never read into memory.
+            headers = {
+                "Content-Type": "application/octet-stream",
+                "Content-Length": str(os.path.getsize(self.file_location)),
+            }
+            headers.update(self._headers)
             with open(self.file_location, "rb") as file:
-                data = file.read()
-            headers = {"Content-Type": "application/octet-stream"}
+                response = self.transport.post(url=url, headers=headers, data=file)
         elif "https://" in self.file_location or "http://" in self.file_location:
-            data = {"url": self.file_location}
             headers = {"Content-Type": "application/json"}
-        else:
-            raise ValueError("File location must be a valid path or URL.")
-
-        headers.update(self._headers)
-        if isinstance(data, dict):
-            response = requests.post(
-                url=self._get_analyze_url(
-                    self.endpoint, self.api_version, self.analyzer_id
-                ),
-                headers=headers,
-                json=data,
+            headers.update(self._headers)
+            response = self.transport.post(
+                url=url, headers=headers, json={"url": self.file_location}
             )
         else:
-            response = requests.post(
-                url=self._get_analyze_url(
-                    self.endpoint, self.api_version, self.analyzer_id
-                ),
-                headers=headers,
-                data=data,
-            )
+            raise ValueError("File location must be a valid path or URL.")
 
         response.raise_for_status()
         self._logger.info(
@@ -137,17 +168,20 @@ class ContentUnderstanding:
         response: requests.Response,
         timeout_seconds: int = 120,
         polling_interval_seconds: int = 2,
+        max_polling_interval_seconds: float = 30,
     ) -> dict[str, Any]:
         """
         Polls the operation result until it completes or times out.
 
         Continuously checks the status of the asynchronous operation using the
-        operation-location header from the initial response.
+        operation-location header from the initial response. The service's ``Retry-After``
+        delay is honored when given; otherwise the interval grows with jittered backoff.
 
         Args:
             response (Response): Initial response containing operation-location.
             timeout_seconds (int): Max time to wait for completion.
-            polling_interval_seconds (int): Time between polling attempts.
+            polling_interval_seconds (int): Minimum time between polling attempts.
+            max_polling_interval_seconds (float): Maximum time between polling attempts.
 
         Returns:
             dict: Final result of the operation.
@@ -157,16 +191,12 @@ class ContentUnderstanding:
             TimeoutError: If operation exceeds timeout.
             RuntimeError: If operation fails.
         """
-        operation_location = response.headers.get("operation-location", "")
-        if not operation_location:
-            raise ValueError("Operation location not found in response headers.")
+        operation_location = self._operation_location(response)
 
-        headers = {"Content-Type": "application/json"}
-        headers.update(self._headers)
-
-        start_time = time.time()
+        start_time = time.monotonic()
+        attempt = 0
         while True:
-            elapsed_time = time.time() - start_time
+            elapsed_time = time.monotonic() - start_time
             self._logger.info(
                 "Waiting for service response", extra={"elapsed": elapsed_time}
             )
@@ -175,23 +205,152 @@ class ContentUnderstanding:
                     f"Operation timed out after {timeout_seconds:.2f} seconds."
                 )
 
-            response = requests.get(operation_location, headers=self._headers)
-            response.raise_for_status()
-            result = cast(dict[str, str], response.json())
-            status = result.get("status", "").lower()
-            if status == "succeeded":
+            result, headers = self._check_operation(operation_location)
+            if result is not None:
                 self._logger.info(
                     f"Request result is ready after {elapsed_time:.2f} seconds."
                 )
-                return response.json()
-            elif status == "failed":
-                self._logger.error(f"Request failed. Reason: {response.json()}")
-                raise RuntimeError("Request failed.")
-            else:
-                self._logger.info(
-                    f"Request {operation_location.split('/')[-1].split('?')[0]} in progress ..."
-                )
-            time.sleep(polling_interval_seconds)
+                return result
+            delay = _poll_delay(
+                attempt, headers, polling_interval_seconds, max_polling_interval_seconds
+            )
+            attempt += 1
+            remaining = timeout_seconds - (time.monotonic() - start_time)
+            time.sleep(max(min(delay, remaining), 0))
+
+    def poll_many(
+        self,
+        responses: Iterable[requests.Response | str],
+        timeout_seconds: int = 120,
+        polling_interval_seconds: int = 2,
+        max_polling_interval_seconds: float = 30,
+        return_exceptions: bool = False,
+    ) -> Iterator[tuple[str, dict[str, Any] | Exception]]:
+        """
+        Polls many operations from a single loop and yields their results as they complete.
+
+        Each operation is checked when its own delay (``Retry-After`` or jittered backoff) is
+        due, so one thread follows any number of analyses without a blocked thread per
+        operation.
+
+        Args:
+            responses (Iterable[Response | str]): Initial responses, or their operation-locations.
+            timeout_seconds (int): Max time to wait for each operation, from the start of polling.
+            polling_interval_seconds (int): Minimum time between polls of an operation.
+            max_polling_interval_seconds (float): Maximum time between polls of an operation.
+            return_exceptions (bool): Yield the error of a failed or timed-out operation instead
+                of raising it, and keep polling the others.
+
+        Yields:
+            tuple[str, dict | Exception]: Operation-location and final result (or error).
+
+        Raises:
+            ValueError: If an operation-location is missing.
+            TimeoutError: If an operation exceeds timeout and ``return_exceptions`` is False.
+            RuntimeError: If an operation fails and ``return_exceptions`` is False.
+        """
+        start_time = time.monotonic()
+        deadline = start_time + timeout_seconds
+        # Heap of (due time, sequence, operation-location, attempt); the sequence keeps order stable.
+        pending = [
+            (start_time, i, self._operation_location(response), 0)
+            for i, response in enumerate(responses)
+        ]
+        heapq.heapify(pending)
+        sequence = len(pending)
+
+        while pending:
+            due, _, operation_location, attempt = heapq.heappop(pending)
+            now = time.monotonic()
+            if due > now:
+                time.sleep(due - now)
+
+            try:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"Operation timed out after {timeout_seconds:.2f} seconds."
+                    )
+                result, headers = self._check_operation(operation_location)
+            except (TimeoutError, RuntimeError, requests.RequestException) as e:
+                if not return_exceptions:
+                    raise
+                yield operation_location, e
+                continue
+
+            if result is not None:
+                yield operation_location, result
+                continue
+            delay = _poll_delay(
+                attempt, headers, polling_interval_seconds, max_polling_interval_seconds
+            )
+            heapq.heappush(
+                pending,
+                (min(time.monotonic() + delay, deadline + 0.001), sequence, operation_location, attempt + 1),
+            )
+            sequence += 1
+
+    def _operation_location(self, response: requests.Response | str) -> str:
+        """
+        Returns the operation-location of an initial response.
+
+        Raises:
+            ValueError: If operation-location is missing.
+        """
+        if isinstance(response, str):
+            operation_location = response
+        else:
+            operation_location = response.headers.get("operation-location", "")
+        if not operation_location:
+            raise ValueError("Operation location not found in response headers.")
+        return operation_location
+
+    def _check_operation(
+        self, operation_location: str
+    ) -> tuple[dict[str, Any] | None, Mapping[str, str]]:
+        """
+        Checks the status of an operation once.
+
+        Throttled (429) and server error (5xx) answers count as "not ready yet".
+
+        Args:
+            operation_location (str): URL of the operation.
+
+        Returns:
+            tuple: Final result (None while the operation runs) and the response headers.
+
+        Raises:
+            RuntimeError: If the operation failed.
+            HTTPError: If the request fails.
+        """
+        response = self.transport.get(operation_location, headers=self._headers)
+        if response.status_code in _RETRYABLE_STATUS:
+            return None, response.headers
+        response.raise_for_status()
+        result = cast(dict[str, Any], response.json())
+        status = str(result.get("status", "")).lower()
+        if status == "succeeded":
+            return result, response.headers
+        if status == "failed":
+            self._logger.error(f"Request failed. Reason: {result}")
+            raise RuntimeError("Request failed.")
+        self._logger.info(
+            f"Request {operation_location.split('/')[-1].split('?')[0]} in progress ..."
+        )
+        return None, response.headers
+
+    @property
+    def _headers(self) -> dict[str, str]:
+        """
+        Returns the authentication headers, with a freshly provided token when using AAD.
+
+        Returns:
+            dict: Dictionary of HTTP headers.
+        """
+        return self._get_headers(
+            self._subscription_key,
+            None if self._subscription_key else self._token_provider(),
+            self._x_ms_useragent,
+        )
 
     def _get_analyze_url(self, endpoint: str, api_version: str, analyzer_id: str):
         """
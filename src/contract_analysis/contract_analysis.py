@@ -1,17 +1,51 @@
-from pathlib import Path
-from typing import Optional, Dict, Union, Callable, List
-
-from azure.identity import DefaultAzureCredential
+import importlib
+import threading
+from typing import TYPE_CHECKING, Optional, Dict, Union, Callable, List
 
 # Prefer relative imports inside the package to avoid circular import issues.
+from .credentials import COGNITIVE_SERVICES_SCOPE, TokenBroker, get_token_broker
 from .document import Document
-from .translation import Translation
-from .document_intelligence import DocumentIntelligence
-from .openai_gpt import OpenAIGPT
-from .content_understanding import ContentUnderstanding, Settings
+from .field_verification import DEFAULT_CONFIDENCE_THRESHOLD, FieldCheck, FieldVerifier
+
+if TYPE_CHECKING:
+    from azure.core.credentials import TokenCredential
+    from .cache import ConversionCache, ResultCache
+    from .http_transport import HttpTransport
+    from .translation import Translation
+    from .translation_memory import TranslationMemory
+    from .document_intelligence import DocumentIntelligence
+    from .openai_gpt import OpenAIGPT
+    from .content_understanding import ContentUnderstanding, Settings
 
 PromptRegistry = Dict[str, Union[str, Callable[[], str]]]
 
+# Service clients pull in heavy SDKs (openai, azure.ai.formrecognizer, requests); their modules are
+# imported when a component is first used rather than when this module is.
+_LAZY_COMPONENTS = {
+    "Translation": ".translation",
+    "DocumentIntelligence": ".document_intelligence",
+    "OpenAIGPT": ".openai_gpt",
+    "ContentUnderstanding": ".content_understanding",
+    "Settings": ".content_understanding",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_COMPONENTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __package__), name)
+    globals()[name] = value
+    return value
+
+
+def _component(name: str):
+    """
+    Returns a component class, importing its module on first use.
+    """
+    return globals().get(name) or __getattr__(name)
+
+
 class ContractAnalysis:
     """
     Orchestrator for contract processing where 'Document' and 'Translation' are mandatory,
@@ -25,7 +59,9 @@ class ContractAnalysis:
       - Translation + any combination of (GPT, DI, CU)
 
     Notes:
-      - PDF conversion is performed *only* if DI is configured (DI needs a PDF).
+      - The document and the service clients are created on first use, so constructing an
+        instance is cheap and components that are never used cost nothing.
+      - PDF conversion is performed *only* when DI is first used (DI needs a PDF).
       - Properties that surface DI outputs will raise if DI is not configured.
     """
 
@@ -39,6 +75,8 @@ class ContractAnalysis:
         gpt_endpoint: Optional[str] = None,
         gpt_model: Optional[str] = None,
         gpt_token_scope: str = "https://cognitiveservices.azure.com/.default",
+        gpt_max_input_tokens: Optional[int] = None,
+        gpt_response_cache: Optional["ResultCache"] = None,
         prompt_registry: Optional[PromptRegistry] = None,
         di_endpoint: Optional[str] = None,
         di_model_id: Optional[str] = None,
@@ -48,10 +86,22 @@ class ContractAnalysis:
         cu_subscription_key: Optional[str] = None,
         cu_token_provider: Optional[str] = None,
         cu_analyzer_id: Optional[str] = None,
+        conversion_cache: Optional["ConversionCache"] = None,
+        di_result_cache: Optional["ResultCache"] = None,
+        di_shard_pages: Optional[int] = None,
+        translator_max_workers: int = 1,
+        incremental_translation: bool = False,
+        defer_translation_rendering: bool = False,
+        translation_memory: Optional["TranslationMemory"] = None,
+        transport: Optional["HttpTransport"] = None,
+        credential: Optional["TokenCredential"] = None,
     ):
         """
         Initializes the ContractAnalysis orchestrator with mandatory and optional components.
 
+        Only the configuration is validated and stored here; the document is opened and the
+        service clients are built when they are first accessed.
+
         Args:
             document_path (str): Path to the input document.
             target_language (str): Target language for translation.
@@ -61,6 +111,10 @@ class ContractAnalysis:
             gpt_endpoint (Optional[str]): Endpoint for Azure OpenAI.
             gpt_model (Optional[str]): Deployment name for Azure OpenAI.
             gpt_token_scope (str): Token scope for Azure OpenAI.
+            gpt_max_input_tokens (Optional[int]): Token budget of a GPT request; longer texts are
+                split at paragraph and clause boundaries before they are sent.
+            gpt_response_cache (Optional[ResultCache]): Cache of GPT completions, so unchanged
+                requests are answered without calling the service.
             prompt_registry (Optional[PromptRegistry]): Registry of prompts for GPT.
             di_endpoint (Optional[str]): Endpoint for Document Intelligence.
             di_model_id (Optional[str]): Model ID for Document Intelligence.
@@ -68,70 +122,189 @@ class ContractAnalysis:
             cu_endpoint (Optional[str]): Endpoint for Content Understanding.
             cu_api_version (Optional[str]): API version for Content Understanding.
             cu_subscription_key (Optional[str]): Subscription key for CU.
-            cu_token_provider (Optional[str]): AAD token for CU.
+            cu_token_provider (Optional[str]): AAD token for CU. Without it or a subscription key,
+                CU authenticates through the shared token broker.
             cu_analyzer_id (Optional[str]): Analyzer ID for CU.
+            conversion_cache (Optional[ConversionCache]): Cache of PDF/DOCX conversions shared across runs.
+            di_result_cache (Optional[ResultCache]): Cache of DI results, so unchanged PDFs are not
+                analyzed again.
+            di_shard_pages (Optional[int]): Analyze the layout of longer documents in parallel page
+                ranges of this size.
+            translator_max_workers (int): Maximum number of concurrent Translator requests.
+            incremental_translation (bool): Only retranslate paragraphs changed since the previous
+                translation of the document.
+            defer_translation_rendering (bool): Keep the translation as text and write the translated
+                DOCX/PDF only when a later stage such as DI uses the document's paths.
+            translation_memory (Optional[TranslationMemory]): Persistent cache of translated segments.
+            transport (Optional[HttpTransport]): Pooled HTTP client for Translator and CU; defaults to
+                the process-wide transport, so connections are reused across documents.
+            credential (Optional[TokenCredential]): Credential used by all services. Defaults to one
+                process-wide DefaultAzureCredential; tokens are cached and refreshed by a TokenBroker.
+
+        Raises:
+            FileNotFoundError: If the document does not exist.
+            ValueError: If the document is not a .docx or .pdf file, or GPT is partially configured.
         """
-        self.document_path = Path(document_path)
-        self.document = Document.from_file(self.document_path)
+        if any([gpt_api_version, gpt_endpoint, gpt_model]) and not all([gpt_api_version, gpt_endpoint, gpt_model]):
+            raise ValueError(
+                "If configuring GPT, you must provide gpt_api_version, gpt_endpoint, and gpt_model."
+            )
+
+        # The document is opened on first use, but a bad path should still fail here.
+        self.document_path = Document.check_file(document_path)
+        self.conversion_cache = conversion_cache
+        self.target_language = target_language
+        self.transport = transport
+        self.credential: TokenBroker = get_token_broker(credential)
 
-        self.translator_credential = DefaultAzureCredential()
-        self.translator = Translation(
-            credential=self.translator_credential,
+        self.translator_credential = self.credential
+        self._translator_config = dict(
             translator_endpoint=translator_endpoint,
             translator_region=translator_region,
             target_language=target_language,
-            document=self.document,
+            max_workers=translator_max_workers,
+            incremental=incremental_translation,
+            defer_rendering=defer_translation_rendering,
+            memory=translation_memory,
+            transport=transport,
         )
 
-        if any([gpt_api_version, gpt_endpoint, gpt_model]) and not all([gpt_api_version, gpt_endpoint, gpt_model]):
-            raise ValueError(
-                "If configuring GPT, you must provide gpt_api_version, gpt_endpoint, and gpt_model."
-            )
-
-        self.gpt: Optional[OpenAIGPT] = None
-        self.gpt_credential: Optional[DefaultAzureCredential] = None
+        self.gpt_credential: Optional["TokenCredential"] = None
+        self._prompt_registry = prompt_registry or {}
+        self._gpt_config: Optional[dict] = None
         if all([gpt_api_version, gpt_endpoint, gpt_model]):
-            self.gpt_credential = DefaultAzureCredential()
-            self.gpt = OpenAIGPT(
-                prompt_registry=prompt_registry or {},
-                gpt_credential=self.gpt_credential,
+            self.gpt_credential = self.credential
+            self._gpt_config = dict(
                 api_version=gpt_api_version,
                 azure_endpoint=gpt_endpoint,
                 model=gpt_model,
                 token_scope=gpt_token_scope,
+                max_input_tokens=gpt_max_input_tokens,
+                response_cache=gpt_response_cache,
             )
 
-        self.document_intelligence: Optional[DocumentIntelligence] = None
-        self.di_credential: Optional[DefaultAzureCredential] = None
+        self.di_credential: Optional["TokenCredential"] = None
+        self._di_config: Optional[dict] = None
         if di_endpoint and di_model_id:
-            self.document.ensure_pdf_exists()
-            self.di_credential = DefaultAzureCredential()
-            pdf_path_to_use = str(self.document.pdf_path_to_use or self.document.original_pdf_path)
-            self.document_intelligence = DocumentIntelligence(
-                credential=self.di_credential,
+            self.di_credential = self.credential
+            self._di_config = dict(
                 di_endpoint=di_endpoint,
                 di_model_id=di_model_id,
-                document_pdf_path=pdf_path_to_use,
+                fields=di_fields_list,
+                result_cache=di_result_cache,
+                shard_pages=di_shard_pages,
             )
-            if di_fields_list:
-                self.document_intelligence.init_field_dict(di_fields_list)
 
-        self.content_understanding: Optional[ContentUnderstanding] = None
-        if cu_endpoint and cu_api_version and (cu_subscription_key or cu_token_provider):
-            settings = Settings(
+        self._cu_config: Optional[dict] = None
+        if cu_endpoint and cu_api_version:
+            self._cu_config = dict(
                 endpoint=cu_endpoint,
                 api_version=cu_api_version,
                 subscription_key=cu_subscription_key,
-                aad_token=cu_token_provider,
-            )
-            self.content_understanding = ContentUnderstanding(
-                settings.endpoint,
-                settings.api_version,
-                subscription_key=settings.subscription_key,
-                token_provider=settings.token_provider,
+                token_provider=cu_token_provider,
                 analyzer_id=cu_analyzer_id,
             )
 
+        self._document: Optional[Document] = None
+        self._translator: Optional["Translation"] = None
+        self._gpt: Optional["OpenAIGPT"] = None
+        self._document_intelligence: Optional["DocumentIntelligence"] = None
+        self._content_understanding: Optional["ContentUnderstanding"] = None
+        self._lock = threading.RLock()
+
+    @property
+    def document(self) -> Document:
+        """
+        Returns the document, opening (and, for a PDF, converting) it on first access.
+        """
+        with self._lock:
+            if self._document is None:
+                self._document = Document.from_file(self.document_path, conversion_cache=self.conversion_cache)
+            return self._document
+
+    @property
+    def translator(self) -> "Translation":
+        """
+        Returns the Translator client, created on first access.
+        """
+        with self._lock:
+            if self._translator is None:
+                self._translator = _component("Translation")(
+                    credential=self.translator_credential,
+                    document=self.document,
+                    **self._translator_config,
+                )
+            return self._translator
+
+    @property
+    def gpt(self) -> Optional["OpenAIGPT"]:
+        """
+        Returns the GPT client, created on first access, or None if GPT is not configured.
+        """
+        with self._lock:
+            if self._gpt is None and self._gpt_config:
+                self._gpt = _component("OpenAIGPT")(
+                    prompt_registry=self._prompt_registry,
+                    gpt_credential=self.gpt_credential,
+                    **self._gpt_config,
+                )
+            return self._gpt
+
+    @property
+    def document_intelligence(self) -> Optional["DocumentIntelligence"]:
+        """
+        Returns the Document Intelligence client, or None if DI is not configured.
+
+        DI deliberately analyzes the PDF of the original document, produced on first access,
+        even if the document has been translated since: its field definitions and layout describe
+        the source contract, as they did when the client was built before translation. DI
+        therefore never renders a text-only translation; stages that need the translated file
+        read ``document.pdf_path_to_use`` or ``document.docx_path_to_use``, which render it first.
+        """
+        with self._lock:
+            if self._document_intelligence is None and self._di_config:
+                self.document.ensure_pdf_exists()
+                pdf_path = str(self.document.original_pdf_path)
+                self._document_intelligence = _component("DocumentIntelligence")(
+                    credential=self.di_credential,
+                    di_endpoint=self._di_config["di_endpoint"],
+                    di_model_id=self._di_config["di_model_id"],
+                    document_pdf_path=pdf_path,
+                    result_cache=self._di_config["result_cache"],
+                    shard_pages=self._di_config["shard_pages"],
+                )
+                if self._di_config["fields"]:
+                    self._document_intelligence.init_field_dict(self._di_config["fields"])
+            return self._document_intelligence
+
+    @property
+    def content_understanding(self) -> Optional["ContentUnderstanding"]:
+        """
+        Returns the Content Understanding client, created on first access, or None if CU is not configured.
+        """
+        with self._lock:
+            if self._content_understanding is None and self._cu_config:
+                config = self._cu_config
+                if config["subscription_key"] or config["token_provider"]:
+                    settings = _component("Settings")(
+                        endpoint=config["endpoint"],
+                        api_version=config["api_version"],
+                        subscription_key=config["subscription_key"],
+                        aad_token=config["token_provider"],
+                    )
+                    cu_key, cu_token = settings.subscription_key, settings.token_provider
+                else:
+                    cu_key, cu_token = None, self.credential.bearer_token_provider(COGNITIVE_SERVICES_SCOPE)
+                self._content_understanding = _component("ContentUnderstanding")(
+                    config["endpoint"],
+                    config["api_version"],
+                    subscription_key=cu_key,
+                    token_provider=cu_token,
+                    analyzer_id=config["analyzer_id"],
+                    transport=self.transport,
+                )
+            return self._content_understanding
+
     def reset_gpt_credential(
         self,
         new_credential,
@@ -144,6 +317,8 @@ class ContractAnalysis:
         """
         Rebuilds the GPT client with a new credential or endpoint.
 
+        The new client is created on next use and keeps the request token budget and response cache.
+
         Args:
             new_credential: New Azure credential.
             api_version (str): API version for GPT.
@@ -151,15 +326,20 @@ class ContractAnalysis:
             model (str): Deployment name for GPT.
             token_scope (str): Token scope for GPT.
         """
-        self.gpt_credential = new_credential
-        self.gpt = OpenAIGPT(
-            prompt_registry=(self.gpt.prompt_registry if self.gpt else {}),
-            gpt_credential=self.gpt_credential,
-            api_version=api_version,
-            azure_endpoint=azure_endpoint,
-            model=model,
-            token_scope=token_scope,
-        )
+        with self._lock:
+            if self._gpt is not None:
+                self._prompt_registry = self._gpt.prompt_registry
+            previous = self._gpt_config or {}
+            self.gpt_credential = new_credential
+            self._gpt_config = dict(
+                api_version=api_version,
+                azure_endpoint=azure_endpoint,
+                model=model,
+                token_scope=token_scope,
+                max_input_tokens=previous.get("max_input_tokens"),
+                response_cache=previous.get("response_cache"),
+            )
+            self._gpt = None
 
     @property
     def document_layout_pages(self):
@@ -173,6 +353,18 @@ class ContractAnalysis:
             raise RuntimeError("DocumentIntelligence is not configured for this instance.")
         return self.document_intelligence.document_layout_pages
 
+    @property
+    def layout_index(self):
+        """
+        Returns the line index built by Document Intelligence.
+
+        Raises:
+            RuntimeError: If DI is not configured.
+        """
+        if not self.document_intelligence:
+            raise RuntimeError("DocumentIntelligence is not configured for this instance.")
+        return self.document_intelligence.layout_index
+
     @property
     def field_dict(self):
         """
@@ -196,3 +388,37 @@ class ContractAnalysis:
         if not self.document_intelligence:
             raise RuntimeError("DocumentIntelligence is not configured for this instance.")
         return self.document_intelligence.field_confidence_dict
+
+    @property
+    def field_pages_dict(self):
+        """
+        Returns the pages on which Document Intelligence found each field.
+
+        Raises:
+            RuntimeError: If DI is not configured.
+        """
+        if not self.document_intelligence:
+            raise RuntimeError("DocumentIntelligence is not configured for this instance.")
+        return self.document_intelligence.field_pages_dict
+
+    def verify_fields(self, threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> Dict[str, FieldCheck]:
+        """
+        Double-checks the extracted fields whose confidence is below a threshold with GPT.
+
+        All uncertain fields are checked in one request that only contains the pages they were
+        found on. Call it after ``analyse_document``.
+
+        Args:
+            threshold (float): Fields with a lower confidence are verified.
+
+        Returns:
+            Dict[str, FieldCheck]: Checks of the verified fields.
+
+        Raises:
+            RuntimeError: If DI or GPT is not configured.
+        """
+        if not self.document_intelligence:
+            raise RuntimeError("DocumentIntelligence is not configured for this instance.")
+        if not self.gpt:
+            raise RuntimeError("OpenAI GPT is not configured for this instance.")
+        return FieldVerifier(self.gpt, threshold=threshold).verify(self.document_intelligence)
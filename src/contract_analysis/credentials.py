@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from azure.core.credentials import AccessToken, TokenCredential
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+_logger = logging.getLogger(__name__)
+
+
+class TokenBroker:
+    """
+    Token credential that caches access tokens per scope and refreshes them before they expire.
+
+    A broker wraps one underlying credential (``DefaultAzureCredential`` by default, created on
+    first use) and can be passed anywhere a ``TokenCredential`` is expected. A cached token is
+    refreshed on a background timer ``refresh_margin`` seconds before expiry if its scopes were
+    requested since the last refresh, so callers keep getting a valid token without waiting on the
+    identity provider while idle scopes are left to expire. The timers hold only a weak reference
+    to the broker and are cancelled when it is garbage collected.
+    """
+
+    def __init__(self, credential: Optional["TokenCredential"] = None, refresh_margin: float = 300):
+        """
+        Initializes the broker.
+
+        Args:
+            credential (Optional[TokenCredential]): Credential to obtain tokens from. Defaults to a
+                ``DefaultAzureCredential`` created on the first token request.
+            refresh_margin (float): Seconds before expiry at which a token is refreshed.
+        """
+        self._credential = credential
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[Tuple[str, ...], "AccessToken"] = {}
+        self._timers: Dict[Tuple[str, ...], threading.Timer] = {}
+        self._locks: Dict[Tuple[str, ...], threading.Lock] = {}
+        self._requested: Set[Tuple[str, ...]] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        weakref.finalize(self, _cancel_timers, self._timers)
+
+    @property
+    def credential(self) -> "TokenCredential":
+        """
+        Returns the underlying credential, creating a ``DefaultAzureCredential`` on first use.
+        """
+        with self._lock:
+            if self._credential is None:
+                from azure.identity import DefaultAzureCredential
+                self._credential = DefaultAzureCredential()
+            return self._credential
+
+    def get_token(self, *scopes: str, **kwargs) -> "AccessToken":
+        """
+        Returns a cached token for the scopes, requesting a new one if none is valid.
+
+        Requests with ``claims`` or ``tenant_id`` bypass the cache.
+
+        Args:
+            *scopes (str): Requested scopes.
+            **kwargs: Passed on to the underlying credential.
+
+        Returns:
+            AccessToken: A valid access token.
+        """
+        if kwargs.get("claims") or kwargs.get("tenant_id"):
+            return self.credential.get_token(*scopes, **kwargs)
+
+        key = tuple(scopes)
+        self._requested.add(key)
+        token = self._tokens.get(key)
+        if token is not None and token.expires_on - time.time() > 30:
+            return token
+
+        with self._scope_lock(key):
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - time.time() <= 30:
+                token = self._refresh(key)
+        return token
+
+    def bearer_token_provider(self, scope: str = COGNITIVE_SERVICES_SCOPE) -> Callable[[], str]:
+        """
+        Returns a callable producing a bearer token for ``scope``, e.g. for ``azure_ad_token_provider``.
+
+        Args:
+            scope (str): Token scope.
+
+        Returns:
+            Callable[[], str]: Function returning the current token string.
+        """
+        return lambda: self.get_token(scope).token
+
+    def close(self):
+        """
+        Stops background refreshes.
+        """
+        with self._lock:
+            self._closed = True
+            timers = list(self._timers.values())
+            self._timers.clear()
+        for timer in timers:
+            timer.cancel()
+
+    def _scope_lock(self, key: Tuple[str, ...]) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _refresh(self, key: Tuple[str, ...]) -> "AccessToken":
+        """
+        Requests a new token and schedules its background refresh.
+        """
+        self._requested.discard(key)
+        token = self.credential.get_token(*key)
+        self._tokens[key] = token
+        self._schedule(key, token)
+        return token
+
+    def _schedule(self, key: Tuple[str, ...], token: "AccessToken"):
+        delay = max(token.expires_on - time.time() - self.refresh_margin, 0)
+        timer = threading.Timer(min(delay, threading.TIMEOUT_MAX), _background_refresh,
+                                args=(weakref.ref(self), key))
+        timer.daemon = True
+        with self._lock:
+            if self._closed:
+                return
+            previous = self._timers.pop(key, None)
+            self._timers[key] = timer
+        if previous is not None:
+            previous.cancel()
+        timer.start()
+
+    def _background_refresh(self, key: Tuple[str, ...]):
+        with self._scope_lock(key):
+            if key not in self._requested:
+                # Unused since the last refresh; get_token fetches a new token if it is needed again.
+                with self._lock:
+                    self._timers.pop(key, None)
+                return
+            try:
+                self._refresh(key)
+            except Exception as e:
+                # The token is requested again synchronously once it is about to expire.
+                _logger.warning("Background token refresh for %s failed: %s", key, e)
+
+
+def _background_refresh(broker_ref: "weakref.ReferenceType[TokenBroker]", key: Tuple[str, ...]):
+    broker = broker_ref()
+    if broker is not None:
+        broker._background_refresh(key)
+
+
+def _cancel_timers(timers: Dict[Tuple[str, ...], threading.Timer]):
+    for timer in list(timers.values()):
+        timer.cancel()
+
+
+_default_broker: Optional[TokenBroker] = None
+# Brokers are kept alive by the clients using them; a broker holds its credential, so the id
+# cannot be reused while the entry exists.
+_brokers: "weakref.WeakValueDictionary[int, TokenBroker]" = weakref.WeakValueDictionary()
+_brokers_lock = threading.Lock()
+
+
+def get_token_broker(credential: Optional["TokenCredential"] = None) -> TokenBroker:
+    """
+    Returns the process-wide broker for a credential.
+
+    Brokers of explicit credentials are released, and their refreshes stopped, once no client
+    references them any more.
+
+    Args:
+        credential (Optional[TokenCredential]): Credential to broker. ``None`` selects the shared
+            ``DefaultAzureCredential``; a ``TokenBroker`` is returned as is.
+
+    Returns:
+        TokenBroker: The broker, created on first request.
+    """
+    global _default_broker
+    if isinstance(credential, TokenBroker):
+        return credential
+    with _brokers_lock:
+        if credential is None:
+            if _default_broker is None:
+                _default_broker = TokenBroker()
+            return _default_broker
+        broker = _brokers.get(id(credential))
+        if broker is None:
+            broker = TokenBroker(credential)
+            _brokers[id(credential)] = broker
+        return broker
+
+
+class AsyncCredentialAdapter:
+    """
+    Async token credential backed by a synchronous one, for the SDKs' async clients.
+
+    Tokens normally come from the broker's cache; a request that has to reach the identity
+    provider runs in the default executor, so the event loop is never blocked.
+    """
+
+    def __init__(self, credential: Optional["TokenCredential"] = None):
+        """
+        Initializes the adapter.
+
+        Args:
+            credential (Optional[TokenCredential]): Synchronous credential, brokered through
+                ``get_token_broker``.
+        """
+        self.broker = get_token_broker(credential)
+
+    async def get_token(self, *scopes: str, **kwargs) -> "AccessToken":
+        """
+        Returns a valid token for the scopes.
+
+        Args:
+            *scopes (str): Requested scopes.
+            **kwargs: Passed on to the underlying credential.
+
+        Returns:
+            AccessToken: A valid access token.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.broker.get_token(*scopes, **kwargs))
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -1,15 +1,163 @@
+import bisect
 import os
-import win32com.client
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
+
+from .cache import ConversionCache
+from .docx_backend import DocxBackend, default_backend, load_win32com
+
+
+def __getattr__(name):
+    # win32com is imported on first use; resolving it here keeps ``document.win32com`` reachable.
+    if name == "win32com":
+        return load_win32com()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass(frozen=True)
+class ParsedDocument:
+    """
+    Text of a document parsed once and shared by all consumers.
+
+    Attributes:
+        text (str): Full text, paragraphs separated by a carriage return.
+        paragraphs (List[str]): Paragraph texts in document order.
+        offsets (List[int]): Start offset of each paragraph in ``text``.
+    """
+    text: str
+    paragraphs: List[str]
+    offsets: List[int]
+
+    @classmethod
+    def from_paragraphs(cls, paragraphs: List[str]) -> "ParsedDocument":
+        """
+        Builds the parsed representation from paragraph texts.
+
+        Args:
+            paragraphs (List[str]): Paragraph texts in document order.
+
+        Returns:
+            ParsedDocument: The parsed document.
+        """
+        offsets = []
+        position = 0
+        for paragraph in paragraphs:
+            offsets.append(position)
+            position += len(paragraph) + 1
+        return cls(text="\r".join(paragraphs), paragraphs=list(paragraphs), offsets=offsets)
+
+    def paragraph_index(self, offset: int) -> int:
+        """
+        Returns the index of the paragraph containing a character offset of ``text``.
+
+        Args:
+            offset (int): Character offset in ``text``.
+
+        Returns:
+            int: Paragraph index.
+        """
+        return max(bisect.bisect_right(self.offsets, offset) - 1, 0)
+
+
+class TranslationResult:
+    """
+    Translated paragraphs of a document, held as text until a translated file is needed.
+
+    Translated paragraphs keep the structure of the source, so each one is mapped to the page on
+    which its source paragraph starts. The translated DOCX and PDF are written by ``render``,
+    which the document calls the first time a translated path is used.
+    """
+
+    def __init__(self, document: "Document", paragraphs: List[str], rendered: bool = False,
+                 on_render: Optional[Callable[[List[Path]], None]] = None):
+        """
+        Initializes the result.
+
+        Args:
+            document (Document): The translated document.
+            paragraphs (List[str]): Translated text of each paragraph, in document order.
+            rendered (bool): Whether the translated files are already up to date.
+            on_render (Optional[Callable[[List[Path]], None]]): Called with the files written after
+                the translated files are written.
+        """
+        self.document = document
+        self.parsed = ParsedDocument.from_paragraphs(paragraphs)
+        self.rendered = rendered
+        self._on_render = on_render
+        self._pages: Optional[List[int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def paragraphs(self) -> List[str]:
+        return self.parsed.paragraphs
+
+    @property
+    def offsets(self) -> List[int]:
+        return self.parsed.offsets
+
+    @property
+    def text(self) -> str:
+        return self.parsed.text
+
+    @property
+    def pages(self) -> List[int]:
+        """
+        Returns the one-based page of each paragraph in the source layout.
+        """
+        if self._pages is None:
+            self._pages = self.document.get_paragraph_pages()
+        return self._pages
+
+    def page_of_offset(self, offset: int) -> int:
+        """
+        Returns the page of the paragraph containing a character offset of ``text``.
+
+        Args:
+            offset (int): Character offset in ``text``.
+
+        Returns:
+            int: One-based page number.
+        """
+        return self.pages[self.parsed.paragraph_index(offset)]
+
+    def text_of_page(self, page: int) -> str:
+        """
+        Returns the translated paragraphs starting on a page, separated by carriage returns.
+
+        Args:
+            page (int): One-based page number.
+
+        Returns:
+            str: Text of the page.
+        """
+        return "\r".join(p for p, n in zip(self.paragraphs, self.pages) if n == page)
+
+    def render(self):
+        """
+        Writes the translated DOCX and PDF, unless they are already up to date.
+        """
+        with self._lock:
+            if self.rendered:
+                return
+            written = self.document.save_translated(self.paragraphs)
+            if self._on_render:
+                self._on_render(written)
+            self.rendered = True
+
 
 class Document:
-    def __init__(self, docx_path: Path):
+    def __init__(self, docx_path: Path, backend: Optional[DocxBackend] = None,
+                 conversion_cache: Optional[ConversionCache] = None):
         """
         Initializes the Document object with paths and metadata.
 
         Args:
             docx_path (Path): Path to the input .docx file.
+            backend (Optional[DocxBackend]): Backend used to read and write the DOCX.
+                Defaults to Word automation when available, otherwise the pure-Python OpenXML backend.
+            conversion_cache (Optional[ConversionCache]): Cache of previous DOCX/PDF conversions.
 
         Raises:
             ValueError: If the file is not a valid .docx file.
@@ -25,23 +173,53 @@ class Document:
         self.translated_docx_path = self.folder / f"{self.base_name}_translated.docx"
         self.translated_pdf_path = self.folder / f"{self.base_name}_translated.pdf"
 
-        self.docx_path_to_use: Optional[Path] = None
-        self.pdf_path_to_use: Optional[Path] = None
+        self._docx_path_to_use: Optional[Path] = None
+        self._pdf_path_to_use: Optional[Path] = None
+        self.translation: Optional[TranslationResult] = None
+
+        self.backend: DocxBackend = backend or default_backend()
+        self.conversion_cache = conversion_cache
 
-        self.word_app: Optional[object] = None
-        self.doc: Optional[object] = None
+        self._parsed: Optional[ParsedDocument] = None
+        self._parsed_stamp: Optional[Tuple[int, int]] = None
+        self._pages: Optional[List[int]] = None
+        self._pages_stamp: Optional[Tuple[int, int]] = None
 
     @classmethod
-    def from_file(cls, file_path: Path) -> "Document":
+    def from_file(cls, file_path: Path, backend: Optional[DocxBackend] = None,
+                  conversion_cache: Optional[ConversionCache] = None) -> "Document":
         """
         Creates a Document instance from a .docx or .pdf file.
 
         Args:
             file_path (Path): Path to the input file.
+            backend (Optional[DocxBackend]): Backend used to read and write the DOCX.
+            conversion_cache (Optional[ConversionCache]): Cache of previous DOCX/PDF conversions.
 
         Returns:
             Document: An instance of the Document class.
 
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file type is unsupported.
+        """
+        file_path = cls.check_file(file_path)
+        if file_path.suffix.lower() == ".docx":
+            return cls(file_path, backend=backend, conversion_cache=conversion_cache)
+        docx_path = cls.convert_pdf_to_docx(file_path, cache=conversion_cache)
+        return cls(docx_path, backend=backend, conversion_cache=conversion_cache)
+
+    @staticmethod
+    def check_file(file_path: Path) -> Path:
+        """
+        Checks that an input file exists and is a .docx or .pdf, without opening it.
+
+        Args:
+            file_path (Path): Path to the input file.
+
+        Returns:
+            Path: The path, as a ``Path``.
+
         Raises:
             FileNotFoundError: If the file does not exist.
             ValueError: If the file type is unsupported.
@@ -49,73 +227,90 @@ class Document:
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-
-        if file_path.suffix.lower() == ".docx":
-            return cls(file_path)
-        elif file_path.suffix.lower() == ".pdf":
-            docx_path = cls.convert_pdf_to_docx(file_path)
-            return cls(docx_path)
-        else:
+        if file_path.suffix.lower() not in (".docx", ".pdf"):
             raise ValueError("Unsupported file type. Only .docx or .pdf are allowed.")
+        return file_path
 
     @staticmethod
-    def convert_pdf_to_docx(pdf_path: Path) -> Path:
+    def convert_pdf_to_docx(pdf_path: Path, cache: Optional[ConversionCache] = None) -> Path:
         """
         Converts a PDF file to DOCX using Word automation.
 
         Args:
             pdf_path (Path): Path to the PDF file.
+            cache (Optional[ConversionCache]): Cache consulted before starting Word.
 
         Returns:
             Path: Path to the converted DOCX file.
 
         Raises:
             FileNotFoundError: If the PDF file does not exist.
+            RuntimeError: If Word automation is not available.
         """
         if not pdf_path.exists():
             raise FileNotFoundError("PDF file does not exist.")
 
+        docx_path = pdf_path.with_suffix(".docx")
+        if cache and cache.get(pdf_path, "pdf-docx", docx_path):
+            return docx_path
+
+        win32com = load_win32com()
+        if win32com is None:
+            raise RuntimeError("Converting PDF files requires pywin32 and Microsoft Word.")
+
         word_app = win32com.client.Dispatch("Word.Application")
         word_app.Visible = False
 
         try:
             doc = word_app.Documents.Open(str(pdf_path))
-            docx_path = pdf_path.with_suffix(".docx")
             doc.SaveAs(str(docx_path), FileFormat=16)
             doc.Close(False)
         finally:
             word_app.Quit(SaveChanges=False)
 
+        if cache:
+            cache.put(pdf_path, "pdf-docx", docx_path)
         return docx_path
 
     @staticmethod
-    def convert_docx_to_pdf(docx_path: Path) -> Path:
+    def convert_docx_to_pdf(docx_path: Path, cache: Optional[ConversionCache] = None) -> Path:
         """
         Converts a DOCX file to PDF using Word automation.
 
         Args:
             docx_path (Path): Path to the DOCX file.
+            cache (Optional[ConversionCache]): Cache consulted before starting Word.
 
         Returns:
             Path: Path to the converted PDF file.
 
         Raises:
             FileNotFoundError: If the DOCX file does not exist.
+            RuntimeError: If Word automation is not available.
         """
         if not docx_path.exists():
             raise FileNotFoundError("DOCX file does not exist.")
 
+        pdf_path = docx_path.with_suffix(".pdf")
+        if cache and cache.get(docx_path, "docx-pdf", pdf_path):
+            return pdf_path
+
+        win32com = load_win32com()
+        if win32com is None:
+            raise RuntimeError("Converting DOCX files requires pywin32 and Microsoft Word.")
+
         word_app = win32com.client.Dispatch("Word.Application")
         word_app.Visible = False
 
         try:
             doc = word_app.Documents.Open(str(docx_path))
-            pdf_path = docx_path.with_suffix(".pdf")
             doc.SaveAs(str(pdf_path), FileFormat=17)
             doc.Close(False)
         finally:
             word_app.Quit(SaveChanges=False)
 
+        if cache:
+            cache.put(docx_path, "docx-pdf", pdf_path)
         return pdf_path
 
     def ensure_pdf_exists(self):
@@ -124,7 +319,60 @@ class Document:
         Converts the DOCX to PDF if necessary.
         """
         if not self.original_pdf_path.exists():
-            self.original_pdf_path = self.convert_docx_to_pdf(self.original_docx_path)
+            self.original_pdf_path = self.convert_docx_to_pdf(
+                self.original_docx_path, cache=self.conversion_cache
+            )
+
+    @property
+    def docx_path_to_use(self) -> Optional[Path]:
+        """
+        Returns the DOCX downstream stages should use, rendering a pending translation first.
+        """
+        if self._docx_path_to_use == self.translated_docx_path:
+            self.render_translation()
+        return self._docx_path_to_use
+
+    @docx_path_to_use.setter
+    def docx_path_to_use(self, path: Optional[Path]):
+        self._docx_path_to_use = path
+
+    @property
+    def pdf_path_to_use(self) -> Optional[Path]:
+        """
+        Returns the PDF downstream stages should use, rendering a pending translation first.
+        """
+        if self._pdf_path_to_use == self.translated_pdf_path:
+            self.render_translation()
+        return self._pdf_path_to_use
+
+    @pdf_path_to_use.setter
+    def pdf_path_to_use(self, path: Optional[Path]):
+        self._pdf_path_to_use = path
+
+    def render_translation(self):
+        """
+        Writes the translated DOCX and PDF if a text-only translation has not been rendered yet.
+        """
+        if self.translation is not None:
+            self.translation.render()
+
+    def _stamp(self) -> Tuple[int, int]:
+        stat = os.stat(self.original_docx_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def parse(self) -> ParsedDocument:
+        """
+        Parses the document, reusing the previous result while the file's mtime and size are unchanged.
+
+        Returns:
+            ParsedDocument: Full text, paragraphs and paragraph offsets.
+        """
+        stamp = self._stamp()
+        if self._parsed is None or self._parsed_stamp != stamp:
+            paragraphs = self.backend.get_paragraph_texts(self.original_docx_path)
+            self._parsed = ParsedDocument.from_paragraphs(paragraphs)
+            self._parsed_stamp = stamp
+        return self._parsed
 
     def extract_text(self) -> str:
         """
@@ -133,46 +381,55 @@ class Document:
         Returns:
             str: The extracted text.
         """
-        self._open()
-        try:
-            return self.doc.Content.Text.strip()
-        finally:
-            self._close()
+        return self.parse().text.strip()
 
     def get_paragraphs(self):
         """
         Retrieves all paragraphs from the document.
 
         Returns:
-            List: A list of paragraph objects.
+            List: A list of backend specific paragraph objects.
         """
-        self._open()
-        return list(self.doc.Paragraphs)
+        return self.backend.get_paragraphs(self.original_docx_path)
 
-    def save_translated(self, translated_texts: list):
+    def get_paragraph_texts(self) -> List[str]:
+        """
+        Retrieves the text of every paragraph in document order.
+
+        Returns:
+            List[str]: Paragraph texts without the trailing paragraph mark.
+        """
+        return list(self.parse().paragraphs)
+
+    def get_paragraph_pages(self) -> List[int]:
+        """
+        Retrieves the page on which every paragraph starts, cached like ``parse``.
+
+        Returns:
+            List[int]: One-based page numbers, aligned with ``get_paragraph_texts``.
+        """
+        stamp = self._stamp()
+        if self._pages is None or self._pages_stamp != stamp:
+            self._pages = self.backend.get_paragraph_pages(self.original_docx_path)
+            self._pages_stamp = stamp
+        return list(self._pages)
+
+    def save_translated(self, translated_texts: list) -> List[Path]:
         """
         Saves translated text into the document and exports both DOCX and PDF versions.
 
         Args:
             translated_texts (list): List of translated paragraph texts.
+
+        Returns:
+            List[Path]: The files written; without a PDF if the backend cannot render one.
         """
-        self._open()
-        try:
-            paragraphs = list(self.doc.Paragraphs)
-            for i, paragraph in enumerate(paragraphs):
-                try:
-                    text = translated_texts[i]
-                    if paragraph.Range.Tables.Count > 0:
-                        paragraph.Range.Text = text
-                    else:
-                        paragraph.Range.Text = text + "\r"
-                except Exception:
-                    continue
-
-            self.doc.SaveAs(str(self.translated_docx_path), FileFormat=16)
-            self.doc.SaveAs(str(self.translated_pdf_path), FileFormat=17)
-        finally:
-            self._close()
+        return self.backend.save_translated(
+            self.original_docx_path,
+            translated_texts,
+            self.translated_docx_path,
+            self.translated_pdf_path,
+        )
 
     def set_paths_to_use(self, translated: bool):
         """
@@ -187,24 +444,3 @@ class Document:
         else:
             self.docx_path_to_use = self.original_docx_path
             self.pdf_path_to_use = self.original_pdf_path
-
-    def _open(self):
-        """
-        Opens the Word application and loads the document.
-        """
-        if not self.word_app:
-            self.word_app = win32com.client.Dispatch("Word.Application")
-            self.word_app.Visible = False
-        if not self.doc:
-            self.doc = self.word_app.Documents.Open(str(self.original_docx_path))
-
-    def _close(self):
-        """
-        Closes the Word document and application.
-        """
-        if self.doc:
-            self.doc.Close(False)
-            self.doc = None
-        if self.word_app:
-            self.word_app.Quit(False)
-            self.word_app = None
@@ -1,10 +1,231 @@
-from azure.ai.formrecognizer import DocumentAnalysisClient
+import asyncio
+import base64
+import datetime
+import inspect
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from azure.ai.formrecognizer import (
+    AddressValue, BoundingRegion, CurrencyValue, DocumentAnalysisApiVersion, DocumentAnalysisClient, DocumentField,
+)
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient as AsyncDocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
-from typing import List, Dict
+from typing import Any, Iterable, List, Dict, Optional, Tuple
+from .cache import ResultCache, content_hash
+from .credentials import AsyncCredentialAdapter
+from .layout_index import LayoutIndex
+
+DEFAULT_API_VERSION = DocumentAnalysisApiVersion.V2023_07_31.value
+
+_logger = logging.getLogger(__name__)
+
+# Page tree nodes and the linearization dictionary, whose /N is the page count.
+_MARKER = re.compile(rb"/Type\s*/Pages?(?![A-Za-z])|/Linearized(?![A-Za-z])")
+_OBJECT_HEADER = re.compile(rb"(\d+)\s+\d+\s+obj(?![A-Za-z])")
+_OBJECT_END = re.compile(rb"endobj|\d+\s+\d+\s+obj(?![A-Za-z])")
+_COUNT = re.compile(rb"/Count\s+(\d+)")
+_PARENT = re.compile(rb"/Parent\s+\d+\s+\d+\s+R")
+_LINEARIZED_PAGES = re.compile(rb"/N\s+(\d+)")
+_SCAN_CHUNK_SIZE = 1024 * 1024
+# Bytes searched around a marker for the rest of its object.
+_OBJECT_WINDOW = 4096
+
+
+def pdf_page_count(pdf_path: str) -> Optional[int]:
+    """
+    Reads the number of pages of a PDF with ``pypdf``, or by scanning its objects without it.
+
+    Args:
+        pdf_path (str): Path to the PDF.
+
+    Returns:
+        Optional[int]: Number of pages, or None if it could not be determined reliably.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return scan_pdf_page_count(pdf_path)
+    try:
+        return len(PdfReader(pdf_path).pages) or None
+    except Exception as e:
+        _logger.debug("pypdf could not read %s, scanning it instead: %s", pdf_path, e)
+        return scan_pdf_page_count(pdf_path)
+
+
+def scan_pdf_page_count(pdf_path: str) -> Optional[int]:
+    """
+    Reads the number of pages of a PDF by scanning its objects, without a PDF library.
+
+    The count is read from ``/Count`` of the root of the page tree (the ``/Type /Pages`` object
+    without a ``/Parent``) and from ``/N`` of the linearization dictionary, and cross-checked
+    against the number of distinct ``/Type /Page`` objects. ``/Count`` entries of outlines and of
+    intermediate page tree nodes are ignored, and an object redefined by an incremental update
+    counts once. When the sources disagree, for instance because an incremental update left a
+    stale page tree or removed pages, or when the page tree sits in compressed object streams,
+    the count is ambiguous and None is returned.
+
+    The file is scanned in chunks, so memory use does not grow with its size.
+
+    Args:
+        pdf_path (str): Path to the PDF.
+
+    Returns:
+        Optional[int]: Number of pages, or None if it could not be determined reliably.
+    """
+    roots: Dict[Any, Optional[int]] = {}
+    pages = set()
+    linearized: Optional[int] = None
+    with open(pdf_path, "rb") as f:
+        for marker, data, position in _scan_markers(f):
+            number, body = _object_at(data, marker.start(), marker.end())
+            key = number if number is not None else position
+            if marker.group(0) == b"/Linearized":
+                found = _LINEARIZED_PAGES.search(body)
+                if linearized is None and found:
+                    linearized = int(found.group(1))
+            elif marker.group(0).endswith(b"/Pages"):
+                if not _PARENT.search(body):
+                    found = _COUNT.search(body)
+                    roots[key] = int(found.group(1)) if found else None
+            else:
+                pages.add(key)
+
+    if len(roots) > 1:
+        return None
+    counts = list(roots.values()) + ([linearized] if linearized is not None else [])
+    if not counts or any(count != len(pages) for count in counts):
+        return None
+    return len(pages) or None
+
+
+def _scan_markers(f) -> Iterable[Tuple[Any, bytes, int]]:
+    """
+    Yields the page tree and linearization markers of a file, read in chunks.
+
+    Each marker is yielded once, with the buffer it was found in and its offset in the file, and
+    with at least ``_OBJECT_WINDOW`` bytes of the buffer on either side unless the file ends first.
+    """
+    buffer = b""
+    offset = 0
+    done = 0
+    while True:
+        chunk = f.read(_SCAN_CHUNK_SIZE)
+        data = buffer + chunk
+        limit = len(data) if not chunk else len(data) - _OBJECT_WINDOW
+        for marker in _MARKER.finditer(data):
+            if marker.start() >= limit:
+                break
+            if offset + marker.start() >= done:
+                yield marker, data, offset + marker.start()
+        done = max(done, offset + limit)
+        if not chunk:
+            return
+        buffer = data[-2 * _OBJECT_WINDOW:]
+        offset += len(data) - len(buffer)
+
+
+def _object_at(data: bytes, start: int, end: int) -> Tuple[Optional[int], bytes]:
+    """
+    Returns the number and the body of the object containing a marker, as far as the window reaches.
+    """
+    headers = list(_OBJECT_HEADER.finditer(data, max(start - _OBJECT_WINDOW, 0), start))
+    body_start = headers[-1].end() if headers else start
+    stop = _OBJECT_END.search(data, end, end + _OBJECT_WINDOW)
+    body_end = stop.start() if stop else min(end + _OBJECT_WINDOW, len(data))
+    return (int(headers[-1].group(1)) if headers else None), data[body_start:body_end]
+
+
+def page_ranges(page_count: int, shard_pages: int) -> List[str]:
+    """
+    Splits pages into consecutive ranges in the format of the service's ``pages`` parameter.
+
+    Args:
+        page_count (int): Number of pages.
+        shard_pages (int): Maximum number of pages per range.
+
+    Returns:
+        List[str]: Ranges such as ``"1-50"``, in page order.
+    """
+    return [
+        f"{first}-{min(first + shard_pages - 1, page_count)}"
+        for first in range(1, page_count + 1, shard_pages)
+    ]
+
+
+def _summarize(*results) -> Dict[str, Any]:
+    """
+    Keeps the parts of analysis results this module uses: the text of each page and the fields.
+
+    Results of page ranges are merged in the order given.
+
+    Returns:
+        Dict[str, Any]: ``pages`` (List[str]), ``layout`` (LayoutIndex) and ``fields``
+            (Dict[str, DocumentField]).
+    """
+    return {
+        "pages": ["".join([line.content for line in page.lines]) for result in results for page in result.pages],
+        "layout": LayoutIndex.from_results(*results),
+        "fields": {
+            name: field for result in results for doc in result.documents for name, field in doc.fields.items()
+        },
+    }
+
+
+def _field_to_json(field: DocumentField) -> Dict[str, Any]:
+    """
+    Serializes a field without its polygons and spans, keeping the pages it was found on.
+    """
+    value = field.value
+    if isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    elif isinstance(value, (CurrencyValue, AddressValue)):
+        value = value.to_dict()
+    elif isinstance(value, list):
+        value = [_field_to_json(v) for v in value]
+    elif isinstance(value, dict):
+        value = {k: _field_to_json(v) for k, v in value.items()}
+    return {
+        "value_type": field.value_type,
+        "value": value,
+        "content": field.content,
+        "confidence": field.confidence,
+        "pages": [region.page_number for region in field.bounding_regions or []],
+    }
+
+
+def _field_from_json(data: Dict[str, Any]) -> DocumentField:
+    """
+    Restores a field serialized by ``_field_to_json``.
+    """
+    value_type, value = data.get("value_type"), data.get("value")
+    if value is not None:
+        if value_type == "date":
+            value = datetime.date.fromisoformat(value)
+        elif value_type == "time":
+            value = datetime.time.fromisoformat(value)
+        elif value_type == "currency":
+            value = CurrencyValue.from_dict(value)
+        elif value_type == "address":
+            value = AddressValue.from_dict(value)
+        elif value_type == "list":
+            value = [_field_from_json(v) for v in value]
+        elif value_type == "dictionary":
+            value = {k: _field_from_json(v) for k, v in value.items()}
+    return DocumentField(
+        value_type=value_type,
+        value=value,
+        content=data.get("content"),
+        bounding_regions=[BoundingRegion(page_number=page, polygon=[]) for page in data.get("pages", [])],
+        spans=[],
+        confidence=data.get("confidence"),
+    )
+
 
 class DocumentIntelligence:
     def __init__(self, credential: AzureKeyCredential, di_endpoint: str,
-                 di_model_id: str, document_pdf_path: str):
+                 di_model_id: str, document_pdf_path: str,
+                 result_cache: Optional[ResultCache] = None, api_version: Optional[str] = None,
+                 shard_pages: Optional[int] = None, max_shard_workers: int = 4):
         """
         Initializes the Document Intelligence client with credentials and configuration.
 
@@ -13,26 +234,40 @@ class DocumentIntelligence:
             di_endpoint (str): Endpoint for the Document Intelligence service.
             di_model_id (str): Custom model ID for field extraction.
             document_pdf_path (str): Path to the PDF document to analyze.
+            result_cache (Optional[ResultCache]): Cache of analysis results, keyed by the PDF content
+                hash, the model id and the API version. Unchanged PDFs are not analyzed again.
+            api_version (Optional[str]): Document Intelligence API version; defaults to the SDK's.
+            shard_pages (Optional[int]): When set, the layout of documents with more pages is
+                analyzed in page ranges of this size, as parallel operations. Documents whose
+                page count cannot be read reliably are analyzed in a single operation.
+            max_shard_workers (int): Maximum number of page ranges analyzed at once.
         """
         self.credential = credential
         self.di_endpoint = di_endpoint
         self.di_model_id = di_model_id
         self.document_pdf_path_to_use = document_pdf_path
+        self.result_cache = result_cache
+        self.api_version = api_version
+        self.shard_pages = shard_pages
+        self.max_shard_workers = max_shard_workers
 
         self.document_analysis_client: DocumentAnalysisClient = None
         self.document_layout_pages: List[str] = []
+        self.layout_index: Optional[LayoutIndex] = None
         self.field_dict: Dict[str, str] = {}
         self.field_confidence_dict: Dict[str, float] = {}
+        self.field_pages_dict: Dict[str, List[int]] = {}
 
     def init_field_dict(self, fields_list: List[str]):
         """
-        Initializes dictionaries for field values and confidence scores.
+        Initializes dictionaries for field values, confidence scores and pages.
 
         Args:
             fields_list (List[str]): List of expected field names to extract.
         """
         self.field_dict = {field: None for field in fields_list}
         self.field_confidence_dict = {field: 0.0 for field in fields_list}
+        self.field_pages_dict = {field: [] for field in fields_list}
 
     def init_document_analysis_client(self):
         """
@@ -42,25 +277,46 @@ class DocumentIntelligence:
         """
         self.document_analysis_client = DocumentAnalysisClient(
             endpoint=self.di_endpoint,
-            credential=self.credential
+            credential=self.credential,
+            **self._client_options()
         )
 
-    def analyse_document_layout(self):
+    def _client_options(self) -> Dict[str, str]:
+        return {"api_version": self.api_version} if self.api_version else {}
+
+    def analyse_document(self, single_pass: bool = True):
         """
-        Analyzes the document layout using the prebuilt-layout model.
+        Extracts the page layout and the fields of the document.
 
-        Extracts and stores text content per page from the document.
+        The custom model's result already contains the pages and lines of the document, so by
+        default a single analysis with the custom model fills ``document_layout_pages``,
+        ``field_dict`` and ``field_confidence_dict``. Should that result carry no pages, the
+        layout is analyzed separately with prebuilt-layout.
+
+        Args:
+            single_pass (bool): Use one analysis with the custom model. When False, the document
+                is analyzed twice, with prebuilt-layout and with the custom model.
         """
-        with open(self.document_pdf_path_to_use, "rb") as f:
-            document = f.read()
+        if not single_pass:
+            self.analyse_document_layout()
+            self.extract_document_fields()
+            return
 
-        poller = self.document_analysis_client.begin_analyze_document("prebuilt-layout", document)
-        result = poller.result()
+        analysis = self._analysis(self.di_model_id)
+        self._populate_fields(analysis)
+        if analysis["pages"]:
+            self._populate_layout(analysis)
+        else:
+            self.analyse_document_layout()
 
-        self.document_layout_pages.clear()
-        for page in result.pages:
-            page_text = "".join([line.content for line in page.lines])
-            self.document_layout_pages.append(page_text)
+    def analyse_document_layout(self):
+        """
+        Analyzes the document layout using the prebuilt-layout model.
+
+        Extracts and stores text content per page from the document. With ``shard_pages`` set,
+        long documents are analyzed in page ranges whose pages are merged back in order.
+        """
+        self._populate_layout(self._analysis("prebuilt-layout", sharded=True))
 
     def extract_document_fields(self):
         """
@@ -68,17 +324,265 @@ class DocumentIntelligence:
 
         Populates field values and confidence scores into dictionaries.
         """
+        self._populate_fields(self._analysis(self.di_model_id))
+
+    def _analysis(self, model_id: str, sharded: bool = False) -> Dict[str, Any]:
+        """
+        Returns the summarized analysis of the document by a model, from the cache when possible.
+
+        Args:
+            model_id (str): Model to analyze the document with.
+            sharded (bool): Analyze page ranges in parallel when ``shard_pages`` applies.
+
+        Returns:
+            Dict[str, Any]: Page texts and fields, see ``_summarize``.
+        """
+        key, analysis = self._cached_analysis(model_id)
+        if analysis is None:
+            shards = self._shards() if sharded else []
+            if len(shards) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(shards), self.max_shard_workers)) as executor:
+                    results = list(executor.map(lambda pages: self._analyze(model_id, pages), shards))
+            else:
+                results = [self._analyze(model_id)]
+            analysis = self._store_analysis(key, _summarize(*results))
+        return analysis
+
+    def _shards(self) -> List[str]:
+        """
+        Returns the page ranges to analyze separately, or an empty list for a single operation.
+        """
+        if not self.shard_pages:
+            return []
+        page_count = pdf_page_count(self.document_pdf_path_to_use)
+        if page_count is None:
+            _logger.warning("Could not read the page count of %s; analyzing it in a single operation.",
+                            self.document_pdf_path_to_use)
+            return []
+        if page_count <= self.shard_pages:
+            return []
+        return page_ranges(page_count, self.shard_pages)
+
+    def _cached_analysis(self, model_id: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Looks up the cached analysis of the document by a model.
+
+        Returns:
+            Tuple[Optional[str], Optional[Dict[str, Any]]]: The cache key (None without a cache)
+                and the cached analysis, if any.
+        """
+        if self.result_cache is None:
+            return None, None
+        key = ResultCache.key(
+            content_hash(self.document_pdf_path_to_use), model_id, self.api_version or DEFAULT_API_VERSION
+        )
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return key, None
+        layout = cached.get("layout")
+        return key, {
+            "pages": cached["pages"],
+            "layout": LayoutIndex.from_bytes(base64.b64decode(layout)) if layout else None,
+            "fields": {name: _field_from_json(field) for name, field in cached["fields"].items()},
+        }
+
+    def _store_analysis(self, key: Optional[str], analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Stores a summarized analysis in the cache.
+        """
+        if key is not None:
+            self.result_cache.put(key, {
+                "pages": analysis["pages"],
+                "layout": base64.b64encode(analysis["layout"].to_bytes()).decode("ascii"),
+                "fields": {name: _field_to_json(field) for name, field in analysis["fields"].items()},
+            })
+        return analysis
+
+    def _analyze(self, model_id: str, pages: Optional[str] = None):
+        """
+        Streams the document to a model and waits for the analysis result.
+
+        Args:
+            model_id (str): Model to analyze the document with.
+            pages (Optional[str]): Page range to analyze, e.g. ``"1-50"``; all pages by default.
+
+        Returns:
+            AnalyzeResult: The analysis result.
+        """
+        options = {"pages": pages} if pages else {}
         with open(self.document_pdf_path_to_use, "rb") as f:
-            document = f.read()
-
-        poller = self.document_analysis_client.begin_analyze_document(self.di_model_id, document)
-        result = poller.result()
-
-        for doc in result.documents:
-            for name, field in doc.fields.items():
-                value = field.value if field.value else field.content
-                try:
-                    self.field_dict[name] = value
-                    self.field_confidence_dict[name] = field.confidence
-                except Exception as e:
-                    print(f"Error processing field '{name}': {e}")
+            poller = self.document_analysis_client.begin_analyze_document(model_id, f, **options)
+            return poller.result()
+
+    def _populate_layout(self, analysis: Dict[str, Any]):
+        """
+        Stores the text of each page of an analysis and its line index.
+        """
+        self.document_layout_pages.clear()
+        self.document_layout_pages.extend(analysis["pages"])
+        self.layout_index = analysis.get("layout")
+
+    def _populate_fields(self, analysis: Dict[str, Any]):
+        """
+        Stores the field values, confidence scores and pages of an analysis.
+        """
+        for name, field in analysis["fields"].items():
+            value = field.value if field.value else field.content
+            try:
+                self.field_dict[name] = value
+                self.field_confidence_dict[name] = field.confidence
+                self.field_pages_dict[name] = sorted({region.page_number for region in field.bounding_regions or []})
+            except Exception as e:
+                print(f"Error processing field '{name}': {e}")
+
+
+class AsyncDocumentIntelligence(DocumentIntelligence):
+    """
+    Document Intelligence client built on the SDK's async client.
+
+    Operations that are needed together are started at once and awaited together, so the
+    latency of an analysis is that of its slowest operation rather than the sum of all of them.
+    Use ``analyse_documents`` to overlap the analyses of many documents. Reading the PDF and the
+    result cache runs on the default executor, so it does not block the event loop. The async
+    client requires ``aiohttp``.
+    """
+
+    def init_document_analysis_client(self):
+        """
+        Initializes the async Azure Document Analysis client.
+
+        Synchronous token credentials are wrapped in an ``AsyncCredentialAdapter``.
+        """
+        credential = self.credential
+        if hasattr(credential, "get_token") and not inspect.iscoroutinefunction(credential.get_token):
+            credential = AsyncCredentialAdapter(credential)
+        self.document_analysis_client = AsyncDocumentAnalysisClient(
+            endpoint=self.di_endpoint,
+            credential=credential,
+            **self._client_options()
+        )
+
+    async def analyse_document(self, single_pass: bool = True):
+        """
+        Extracts the page layout and the fields of the document.
+
+        Args:
+            single_pass (bool): Use one analysis with the custom model. When False, the
+                prebuilt-layout and custom model analyses run concurrently.
+        """
+        if not single_pass:
+            await asyncio.gather(self.analyse_document_layout(), self.extract_document_fields())
+            return
+
+        analysis = await self._analysis(self.di_model_id)
+        self._populate_fields(analysis)
+        if analysis["pages"]:
+            self._populate_layout(analysis)
+        else:
+            await self.analyse_document_layout()
+
+    async def analyse_document_layout(self):
+        """
+        Analyzes the document layout using the prebuilt-layout model, in page ranges with ``shard_pages``.
+        """
+        self._populate_layout(await self._analysis("prebuilt-layout", sharded=True))
+
+    async def extract_document_fields(self):
+        """
+        Extracts structured fields using the custom model.
+        """
+        self._populate_fields(await self._analysis(self.di_model_id))
+
+    async def _analysis(self, model_id: str, sharded: bool = False) -> Dict[str, Any]:
+        """
+        Returns the summarized analysis of the document by a model, from the cache when possible.
+        """
+        loop = asyncio.get_running_loop()
+        key, analysis = await loop.run_in_executor(None, self._cached_analysis, model_id)
+        if analysis is None:
+            shards = await loop.run_in_executor(None, self._shards) if sharded else []
+            if len(shards) > 1:
+                semaphore = asyncio.Semaphore(self.max_shard_workers)
+
+                async def analyze(pages: str):
+                    async with semaphore:
+                        return await self._analyze(model_id, pages)
+
+                results = await asyncio.gather(*(analyze(pages) for pages in shards))
+            else:
+                results = [await self._analyze(model_id)]
+            analysis = await loop.run_in_executor(None, self._store_analysis, key, _summarize(*results))
+        return analysis
+
+    async def _analyze(self, model_id: str, pages: Optional[str] = None):
+        """
+        Sends the document to a model and awaits the analysis result.
+
+        The PDF is read on the default executor rather than on the event loop.
+
+        Args:
+            model_id (str): Model to analyze the document with.
+            pages (Optional[str]): Page range to analyze; all pages by default.
+
+        Returns:
+            AnalyzeResult: The analysis result.
+        """
+        options = {"pages": pages} if pages else {}
+        document = await asyncio.get_running_loop().run_in_executor(None, self._read_document)
+        poller = await self.document_analysis_client.begin_analyze_document(model_id, document, **options)
+        return await poller.result()
+
+    def _read_document(self) -> bytes:
+        """
+        Returns the content of the PDF.
+        """
+        with open(self.document_pdf_path_to_use, "rb") as f:
+            return f.read()
+
+    async def close(self):
+        """
+        Closes the async client.
+        """
+        if self.document_analysis_client is not None:
+            await self.document_analysis_client.close()
+            self.document_analysis_client = None
+
+    async def __aenter__(self):
+        if self.document_analysis_client is None:
+            self.init_document_analysis_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def analyse_documents(instances: Iterable[AsyncDocumentIntelligence], single_pass: bool = True,
+                            max_concurrency: Optional[int] = None):
+    """
+    Analyzes several documents concurrently.
+
+    Instances without a client get one for the duration of the call.
+
+    Args:
+        instances (Iterable[AsyncDocumentIntelligence]): One instance per document.
+        single_pass (bool): Passed on to ``AsyncDocumentIntelligence.analyse_document``.
+        max_concurrency (Optional[int]): Maximum number of documents analyzed at once; unlimited
+            by default.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def analyse(di: AsyncDocumentIntelligence):
+        owns_client = di.document_analysis_client is None
+        if owns_client:
+            di.init_document_analysis_client()
+        try:
+            if semaphore is None:
+                await di.analyse_document(single_pass)
+            else:
+                async with semaphore:
+                    await di.analyse_document(single_pass)
+        finally:
+            if owns_client:
+                await di.close()
+
+    await asyncio.gather(*(analyse(di) for di in instances))
@@ -0,0 +1,503 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import zipfile
+import xml.sax
+from pathlib import Path
+from typing import Callable, List, Optional
+from xml.sax.handler import ContentHandler
+from xml.sax.saxutils import XMLGenerator
+from xml.sax.xmlreader import AttributesNSImpl
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+DOCUMENT_PART = "word/document.xml"
+
+_UNLOADED = object()
+_win32com = _UNLOADED
+
+
+def load_win32com():
+    """
+    Imports ``win32com.client`` on first use; COM support is slow to load and only needed for Word.
+
+    Returns:
+        The ``win32com`` package, or None if pywin32 is not installed.
+    """
+    global _win32com
+    if _win32com is _UNLOADED:
+        try:
+            import win32com.client
+            _win32com = win32com
+        except ImportError:  # pywin32 is only available on Windows
+            _win32com = None
+    return _win32com
+
+
+def word_automation_available() -> bool:
+    """
+    Returns whether pywin32 is installed, without importing it.
+    """
+    return importlib.util.find_spec("win32com") is not None
+
+# Characters Word reports for inline run content, see Range.Text. Page breaks are reported as "\x0c".
+_RUN_CHARACTERS = {"tab": "\t", "br": "\x0b", "cr": "\x0b"}
+
+# WdInformation.wdActiveEndPageNumber
+_WD_ACTIVE_END_PAGE_NUMBER = 3
+
+
+class DocxBackend:
+    """
+    Interface used by Document to read paragraphs from and write translations to a DOCX file.
+    """
+
+    def extract_text(self, docx_path: Path) -> str:
+        """
+        Extracts all text content from the document.
+
+        Args:
+            docx_path (Path): Path to the DOCX file.
+
+        Returns:
+            str: The extracted text.
+        """
+        raise NotImplementedError
+
+    def get_paragraphs(self, docx_path: Path) -> list:
+        """
+        Retrieves the backend specific paragraph objects of the document.
+
+        Args:
+            docx_path (Path): Path to the DOCX file.
+
+        Returns:
+            list: A list of paragraph objects.
+        """
+        raise NotImplementedError
+
+    def get_paragraph_texts(self, docx_path: Path) -> List[str]:
+        """
+        Retrieves the text of every paragraph, without the trailing paragraph mark.
+
+        Args:
+            docx_path (Path): Path to the DOCX file.
+
+        Returns:
+            List[str]: Paragraph texts in document order.
+        """
+        raise NotImplementedError
+
+    def get_paragraph_pages(self, docx_path: Path) -> List[int]:
+        """
+        Retrieves the page on which every paragraph starts.
+
+        Args:
+            docx_path (Path): Path to the DOCX file.
+
+        Returns:
+            List[int]: One-based page numbers, aligned with ``get_paragraph_texts``.
+        """
+        raise NotImplementedError
+
+    def save_translated(self, docx_path: Path, translated_texts: list,
+                        translated_docx_path: Path, translated_pdf_path: Path) -> List[Path]:
+        """
+        Writes translated paragraphs into a copy of the document.
+
+        Args:
+            docx_path (Path): Path to the source DOCX file.
+            translated_texts (list): Translated text for each paragraph, by paragraph index.
+            translated_docx_path (Path): Output path of the translated DOCX.
+            translated_pdf_path (Path): Output path of the translated PDF.
+
+        Returns:
+            List[Path]: The files written; the PDF is missing when the backend cannot render one.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases any resources held by the backend.
+        """
+
+
+class WordBackend(DocxBackend):
+    """
+    Backend driving Microsoft Word through COM automation (Windows only).
+    """
+
+    def __init__(self):
+        if not word_automation_available():
+            raise RuntimeError("WordBackend requires pywin32 and Microsoft Word.")
+        self.word_app: Optional[object] = None
+        self.doc: Optional[object] = None
+
+    def extract_text(self, docx_path: Path) -> str:
+        self._open(docx_path)
+        try:
+            return self.doc.Content.Text.strip()
+        finally:
+            self.close()
+
+    def get_paragraphs(self, docx_path: Path) -> list:
+        self._open(docx_path)
+        return list(self.doc.Paragraphs)
+
+    def get_paragraph_texts(self, docx_path: Path) -> List[str]:
+        self._open(docx_path)
+        try:
+            return [p.Range.Text.rstrip("\r\x07") for p in self.doc.Paragraphs]
+        finally:
+            self.close()
+
+    def get_paragraph_pages(self, docx_path: Path) -> List[int]:
+        self._open(docx_path)
+        try:
+            pages = []
+            for p in self.doc.Paragraphs:
+                start = p.Range.Start
+                pages.append(int(self.doc.Range(start, start).Information(_WD_ACTIVE_END_PAGE_NUMBER)))
+            return pages
+        finally:
+            self.close()
+
+    def save_translated(self, docx_path: Path, translated_texts: list,
+                        translated_docx_path: Path, translated_pdf_path: Path) -> List[Path]:
+        self._open(docx_path)
+        try:
+            paragraphs = list(self.doc.Paragraphs)
+            for i, paragraph in enumerate(paragraphs):
+                try:
+                    text = translated_texts[i]
+                    if paragraph.Range.Tables.Count > 0:
+                        paragraph.Range.Text = text
+                    else:
+                        paragraph.Range.Text = text + "\r"
+                except Exception:
+                    continue
+
+            self.doc.SaveAs(str(translated_docx_path), FileFormat=16)
+            self.doc.SaveAs(str(translated_pdf_path), FileFormat=17)
+        finally:
+            self.close()
+        return [Path(translated_docx_path), Path(translated_pdf_path)]
+
+    def _open(self, docx_path: Path):
+        """
+        Opens the Word application and loads the document.
+        """
+        if not self.word_app:
+            self.word_app = load_win32com().client.Dispatch("Word.Application")
+            self.word_app.Visible = False
+        if not self.doc:
+            self.doc = self.word_app.Documents.Open(str(docx_path))
+
+    def close(self):
+        """
+        Closes the Word document and application.
+        """
+        if self.doc:
+            self.doc.Close(False)
+            self.doc = None
+        if self.word_app:
+            self.word_app.Quit(False)
+            self.word_app = None
+
+
+class _ParagraphHandler(ContentHandler):
+    """
+    SAX handler tracking body paragraphs of word/document.xml the way Word enumerates them.
+
+    Paragraphs inside text boxes are not part of the main story and are ignored. Every table
+    row contributes an extra empty paragraph, matching Word's end-of-row marks.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._stack: List[tuple] = []
+        self._textbox_depth = 0
+        self._paragraph_depth = 0
+        self.paragraph_index = -1
+
+    @property
+    def _in_paragraph(self) -> bool:
+        return self._textbox_depth == 0 and self._paragraph_depth > 0
+
+    def _parent_is_run(self) -> bool:
+        return len(self._stack) >= 2 and self._stack[-2] == (W_NS, "r")
+
+    def startElementNS(self, name, qname, attrs):
+        self._stack.append(name)
+        uri, local = name
+        if uri != W_NS:
+            return
+        if local == "txbxContent":
+            self._textbox_depth += 1
+        elif self._textbox_depth == 0 and local == "p":
+            self._paragraph_depth += 1
+            if self._paragraph_depth == 1:
+                self.paragraph_index += 1
+                self.paragraph_started()
+
+    def endElementNS(self, name, qname):
+        self._stack.pop()
+        uri, local = name
+        if uri != W_NS:
+            return
+        if local == "txbxContent":
+            self._textbox_depth -= 1
+        elif self._textbox_depth == 0 and local == "p":
+            self._paragraph_depth -= 1
+            if self._paragraph_depth == 0:
+                self.paragraph_ended()
+        elif self._textbox_depth == 0 and local == "tr":
+            self.paragraph_index += 1
+            self.paragraph_started()
+            self.paragraph_ended()
+
+    def paragraph_started(self):
+        pass
+
+    def paragraph_ended(self):
+        pass
+
+
+class _ParagraphReader(_ParagraphHandler):
+    """
+    Collects the text of each paragraph and the page it starts on.
+
+    Pages are taken from the layout Word last saved: ``w:lastRenderedPageBreak`` marks and
+    explicit page breaks. Several marks with no text in between count as one page break, since
+    Word records a rendered break right after an explicit one.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.paragraphs: List[str] = []
+        self.pages: List[int] = []
+        self._buffer: List[str] = []
+        self._capture = False
+        self._page = 1
+        self._paragraph_page: Optional[int] = None
+        self._text_since_break = False
+
+    def paragraph_started(self):
+        self._buffer = []
+        self._paragraph_page = None
+
+    def paragraph_ended(self):
+        self.paragraphs.append("".join(self._buffer))
+        self.pages.append(self._paragraph_page or self._page)
+
+    def _page_break(self):
+        if self._text_since_break:
+            self._page += 1
+            self._text_since_break = False
+
+    def startElementNS(self, name, qname, attrs):
+        super().startElementNS(name, qname, attrs)
+        if not self._in_paragraph or name[0] != W_NS:
+            return
+        if name[1] == "t":
+            self._capture = True
+        elif name[1] == "lastRenderedPageBreak":
+            self._page_break()
+        elif name[1] == "br" and attrs.get((W_NS, "type")) == "page" and self._parent_is_run():
+            self._buffer.append("\x0c")
+            self._page_break()
+        elif name[1] in _RUN_CHARACTERS and self._parent_is_run():
+            self._buffer.append(_RUN_CHARACTERS[name[1]])
+
+    def endElementNS(self, name, qname):
+        if name == (W_NS, "t"):
+            self._capture = False
+        super().endElementNS(name, qname)
+
+    def characters(self, content):
+        if self._capture:
+            self._buffer.append(content)
+            if content.strip():
+                self._text_since_break = True
+                if self._paragraph_page is None:
+                    self._paragraph_page = self._page
+
+
+class _ParagraphWriter(_ParagraphHandler):
+    """
+    Copies word/document.xml to ``out``, replacing the text of each paragraph that has a translation.
+
+    The translated text is written into the first text element of the paragraph; other text,
+    tab and break elements of its runs are dropped. Formatting of the first run is kept. A
+    paragraph without a text element, e.g. one holding only tabs or breaks, gets a new run at
+    its end, so that no translation is lost.
+    """
+
+    def __init__(self, out, translated_texts: list):
+        super().__init__()
+        self._out = XMLGenerator(out, encoding="utf-8", short_empty_elements=True)
+        self._translated_texts = translated_texts
+        self._replacement: Optional[str] = None
+        self._text_written = False
+        self._skip_depth = 0
+        self._suppress_characters = False
+
+    def paragraph_started(self):
+        self._text_written = False
+        if self.paragraph_index < len(self._translated_texts):
+            self._replacement = self._translated_texts[self.paragraph_index]
+        else:
+            self._replacement = None
+
+    def paragraph_ended(self):
+        self._replacement = None
+
+    def startDocument(self):
+        self._out.startDocument()
+
+    def endDocument(self):
+        self._out.endDocument()
+
+    def startPrefixMapping(self, prefix, uri):
+        self._out.startPrefixMapping(prefix, uri)
+
+    def endPrefixMapping(self, prefix):
+        self._out.endPrefixMapping(prefix)
+
+    def startElementNS(self, name, qname, attrs):
+        super().startElementNS(name, qname, attrs)
+        if self._skip_depth:
+            self._skip_depth += 1
+            return
+        if self._replacement is not None and self._in_paragraph and name[0] == W_NS:
+            if name[1] == "t":
+                self._suppress_characters = True
+                if not self._text_written:
+                    self._text_written = True
+                    attrs = dict(attrs.items())
+                    attrs[(XML_NS, "space")] = "preserve"
+                    self._out.startElementNS(name, qname, AttributesNSImpl(attrs, {}))
+                    self._out.characters(str(self._replacement))
+                    return
+            elif name[1] in _RUN_CHARACTERS and self._parent_is_run():
+                self._skip_depth = 1
+                return
+        self._out.startElementNS(name, qname, attrs)
+
+    def endElementNS(self, name, qname):
+        skipped = self._skip_depth > 0
+        if skipped:
+            self._skip_depth -= 1
+        elif name == (W_NS, "t"):
+            self._suppress_characters = False
+        elif name == (W_NS, "p") and self._paragraph_depth == 1 and self._textbox_depth == 0:
+            self._write_missing_text()
+        super().endElementNS(name, qname)
+        if not skipped:
+            self._out.endElementNS(name, qname)
+
+    def characters(self, content):
+        if not self._skip_depth and not self._suppress_characters:
+            self._out.characters(content)
+
+    def _write_missing_text(self):
+        """
+        Appends a run with the translation to a paragraph that had no text element to hold it.
+        """
+        if self._text_written or not self._replacement:
+            return
+        self._text_written = True
+        self._out.startElementNS((W_NS, "r"), None, AttributesNSImpl({}, {}))
+        self._out.startElementNS((W_NS, "t"), None, AttributesNSImpl({(XML_NS, "space"): "preserve"}, {}))
+        self._out.characters(str(self._replacement))
+        self._out.endElementNS((W_NS, "t"), None)
+        self._out.endElementNS((W_NS, "r"), None)
+
+    def ignorableWhitespace(self, whitespace):
+        self._out.ignorableWhitespace(whitespace)
+
+    def processingInstruction(self, target, data):
+        self._out.processingInstruction(target, data)
+
+
+def _parse(stream, handler: ContentHandler):
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, True)
+    parser.setFeature(xml.sax.handler.feature_external_ges, False)
+    parser.setContentHandler(handler)
+    parser.parse(stream)
+
+
+class OpenXmlBackend(DocxBackend):
+    """
+    Pure-Python backend reading and writing the DOCX package directly.
+
+    word/document.xml is processed with a streaming SAX parser, so memory use does not grow with
+    the size of the document. Rendering a PDF requires a layout engine; pass ``pdf_converter``
+    (for example ``Document.convert_docx_to_pdf``) to produce one, otherwise only the DOCX is written.
+    """
+
+    def __init__(self, pdf_converter: Optional[Callable[[Path], Path]] = None):
+        self.pdf_converter = pdf_converter
+
+    def extract_text(self, docx_path: Path) -> str:
+        return "\r".join(self.get_paragraph_texts(docx_path)).strip()
+
+    def get_paragraphs(self, docx_path: Path) -> List[str]:
+        return self.get_paragraph_texts(docx_path)
+
+    def get_paragraph_texts(self, docx_path: Path) -> List[str]:
+        return self._read(docx_path).paragraphs
+
+    def get_paragraph_pages(self, docx_path: Path) -> List[int]:
+        return self._read(docx_path).pages
+
+    @staticmethod
+    def _read(docx_path: Path) -> _ParagraphReader:
+        reader = _ParagraphReader()
+        with zipfile.ZipFile(docx_path) as package:
+            with package.open(DOCUMENT_PART) as stream:
+                _parse(stream, reader)
+        return reader
+
+    def save_translated(self, docx_path: Path, translated_texts: list,
+                        translated_docx_path: Path, translated_pdf_path: Path) -> List[Path]:
+        translated_docx_path = Path(translated_docx_path)
+        fd, tmp_path = tempfile.mkstemp(suffix=".docx", dir=translated_docx_path.parent)
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(docx_path) as source, \
+                    zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    entry = zipfile.ZipInfo(info.filename, info.date_time)
+                    entry.compress_type = zipfile.ZIP_DEFLATED
+                    entry.external_attr = info.external_attr
+                    with source.open(info) as src, target.open(entry, "w") as dst:
+                        if info.filename == DOCUMENT_PART:
+                            _parse(src, _ParagraphWriter(dst, translated_texts))
+                        else:
+                            shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, translated_docx_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        if not self.pdf_converter:
+            return [translated_docx_path]
+        pdf_path = Path(self.pdf_converter(translated_docx_path))
+        if pdf_path != Path(translated_pdf_path):
+            os.replace(pdf_path, translated_pdf_path)
+        return [translated_docx_path, Path(translated_pdf_path)]
+
+
+def default_backend() -> DocxBackend:
+    """
+    Returns the Word backend when Word automation is available, otherwise the OpenXML backend.
+
+    Returns:
+        DocxBackend: A new backend instance.
+    """
+    if word_automation_available():
+        return WordBackend()
+    return OpenXmlBackend()
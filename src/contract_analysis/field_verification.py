@@ -0,0 +1,146 @@
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from .document_intelligence import DocumentIntelligence
+    from .openai_gpt import OpenAIGPT
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+
+VERIFICATION_PROMPT = """
+You are a contract auditor checking values extracted automatically from a contract.
+The user message contains excerpts of the contract, each introduced by its page number, followed by
+a JSON object mapping field names to the extracted value and the pages the value was found on.
+For every field, read the excerpts of its pages and decide whether the extracted value is correct.
+Answer with a single JSON object and nothing else, mapping each field name to an object with the keys
+"correct" (true or false) and "value" (the correct value as written in the contract, or null if the
+excerpts do not contain it).
+"""
+
+
+class FieldCheck(NamedTuple):
+    """
+    Outcome of the verification of one field.
+
+    Attributes:
+        name (str): Field name.
+        value (Any): Value extracted by Document Intelligence.
+        confidence (float): Confidence reported by Document Intelligence.
+        pages (List[int]): Pages the field was found on.
+        confirmed (Optional[bool]): Whether GPT confirmed the value; None if it gave no answer.
+        verified_value (Optional[str]): Value read by GPT.
+    """
+    name: str
+    value: Any
+    confidence: float
+    pages: List[int]
+    confirmed: Optional[bool]
+    verified_value: Optional[str]
+
+
+def low_confidence_fields(field_confidence_dict: Dict[str, float], field_pages_dict: Dict[str, List[int]],
+                          threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> List[str]:
+    """
+    Returns the located fields whose confidence is below a threshold.
+
+    Fields without pages were not found in the document; there is no excerpt to check them against.
+
+    Args:
+        field_confidence_dict (Dict[str, float]): Confidence of each field.
+        field_pages_dict (Dict[str, List[int]]): Pages each field was found on.
+        threshold (float): Fields with a lower confidence are returned.
+
+    Returns:
+        List[str]: Field names, in the order of ``field_confidence_dict``.
+    """
+    return [
+        name for name, confidence in field_confidence_dict.items()
+        if (confidence or 0.0) < threshold and field_pages_dict.get(name)
+    ]
+
+
+class FieldVerifier:
+    """
+    Double-checks the uncertain fields of a Document Intelligence analysis with GPT.
+
+    Only fields below the confidence threshold are checked, and GPT only sees the pages they were
+    found on, each page once, in a single request. The cost of a verification therefore grows with
+    the number of uncertain fields rather than with the length of the document.
+    """
+
+    def __init__(self, gpt: "OpenAIGPT", threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+                 prompt: str = VERIFICATION_PROMPT):
+        """
+        Initializes the verifier.
+
+        Args:
+            gpt (OpenAIGPT): GPT client.
+            threshold (float): Fields with a lower confidence are verified.
+            prompt (str): System prompt of the verification request.
+        """
+        self.gpt = gpt
+        self.threshold = threshold
+        self.prompt = prompt
+
+    def verify(self, document_intelligence: "DocumentIntelligence") -> Dict[str, FieldCheck]:
+        """
+        Verifies the low-confidence fields of an analyzed document.
+
+        Args:
+            document_intelligence (DocumentIntelligence): Client whose fields and layout were extracted.
+
+        Returns:
+            Dict[str, FieldCheck]: Checks of the verified fields; empty if all fields are confident.
+
+        Raises:
+            ContextLengthExceeded: If the pages of the uncertain fields do not fit one request.
+            openai.OpenAIError: If the request fails, see ``OpenAIGPT.run_json``.
+        """
+        di = document_intelligence
+        names = low_confidence_fields(di.field_confidence_dict, di.field_pages_dict, self.threshold)
+        if not names:
+            return {}
+
+        fields = {
+            name: {"value": _to_text(di.field_dict.get(name)), "pages": di.field_pages_dict[name]}
+            for name in names
+        }
+        pages = sorted({page for field in fields.values() for page in field["pages"]})
+        excerpts = "\n".join(f"-- PAGE {page} --\n{_page_text(di, page)}" for page in pages)
+        request = f"{excerpts}\n\nFields:\n{json.dumps(fields, ensure_ascii=False, indent=2)}"
+        # Sent whole: a chunked request would separate the excerpts from the fields list.
+        answers = self.gpt.run_json(request, self.prompt)
+
+        checks = {}
+        for name in names:
+            answer = answers.get(name) if isinstance(answers.get(name), dict) else {}
+            confirmed = answer.get("correct")
+            checks[name] = FieldCheck(
+                name=name,
+                value=di.field_dict.get(name),
+                confidence=di.field_confidence_dict.get(name) or 0.0,
+                pages=fields[name]["pages"],
+                confirmed=confirmed if isinstance(confirmed, bool) else None,
+                verified_value=_to_text(answer.get("value")),
+            )
+        return checks
+
+
+def _page_text(di: "DocumentIntelligence", page: int) -> str:
+    """
+    Returns the text of a page, one line per line of the layout when the index is available.
+    """
+    index = di.layout_index
+    if index is not None and page <= index.page_count:
+        return index.page_text(page, "\n")
+    if page <= len(di.document_layout_pages):
+        return di.document_layout_pages[page - 1]
+    return ""
+
+
+def _to_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
@@ -0,0 +1,121 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, Optional, Tuple
+
+# Frequent function words per language. Contract prose is dense in these, so a few hundred
+# characters are usually enough to tell languages sharing a script apart.
+_STOP_WORDS: Dict[str, Dict[str, FrozenSet[str]]] = {
+    "LATIN": {
+        "en": frozenset("the and of to in is that for with as by this be on are or shall any such which will not from has have it its an at".split()),
+        "fr": frozenset("le la les des du et est une un dans pour que qui par sur au aux avec ce cette sont pas ou il elle être sera ses leur".split()),
+        "de": frozenset("der die das und ist den dem des ein eine einer zu mit von für auf nicht im sich auch werden wird oder bei durch sind nach zur zum".split()),
+        "es": frozenset("el la los las de del y en que por para con una un es se al lo como su sus será o este esta sobre entre no".split()),
+        "it": frozenset("il lo la gli le di e che è per con del della dei delle un una non sono al alla nel nella da si come ai questo".split()),
+        "pt": frozenset("o a os as de do da dos das e que em no na para com um uma não por se ao é pelo pela seu sua são".split()),
+        "nl": frozenset("de het een en van is dat op te in voor met niet zijn aan door wordt worden of bij deze die als naar ook om tot".split()),
+        "sv": frozenset("och att det som en ett är av för på med till den har inte om de eller vid ska skall från under sig".split()),
+        "da": frozenset("og at det er en et af for på med til den har ikke som de eller ved skal fra under sig der".split()),
+        "pl": frozenset("i w na z do że się nie jest to o jak przez dla oraz lub od po które który która być jego".split()),
+        "ro": frozenset("și de la în a cu pe din care este un o pentru nu se sau al ale prin fi va".split()),
+        "cs": frozenset("a v na je se že s z do o to k pro by jako nebo jsou být který která které".split()),
+    },
+    "CYRILLIC": {
+        "ru": frozenset("и в не на что с по к а из от для о это как или быть его также который".split()),
+        "uk": frozenset("і в у не на що з до та від для про це як або бути його також який".split()),
+        "bg": frozenset("и в на за с от да не се е по че към или са това като който".split()),
+    },
+}
+
+# Scripts that identify a single language, and the confidence attached to that guess.
+_SCRIPT_LANGUAGES: Dict[str, Tuple[str, float]] = {
+    "GREEK": ("el", 0.95),
+    "HEBREW": ("he", 0.95),
+    "HANGUL": ("ko", 0.95),
+    "HIRAGANA": ("ja", 0.95),
+    "KATAKANA": ("ja", 0.95),
+    "THAI": ("th", 0.95),
+    "DEVANAGARI": ("hi", 0.7),
+    "ARABIC": ("ar", 0.6),
+    "CJK": ("zh-Hans", 0.5),
+}
+
+_WORD = re.compile(r"[^\W\d_]+")
+_MIN_WORDS = 5
+
+
+def _script(character: str) -> Optional[str]:
+    """
+    Returns the script of a letter from its Unicode name, e.g. ``LATIN`` or ``CYRILLIC``.
+    """
+    try:
+        name = unicodedata.name(character)
+    except ValueError:
+        return None
+    return name.split(" ", 1)[0]
+
+
+def detect_script(text: str) -> Optional[str]:
+    """
+    Returns the script used by most letters of the text.
+
+    Args:
+        text (str): Text sample.
+
+    Returns:
+        Optional[str]: Script name, or None if the text has no letters.
+    """
+    counts = Counter(_script(c) for c in text if c.isalpha())
+    counts.pop(None, None)
+    if not counts:
+        return None
+    # Japanese mixes kana with CJK ideographs; any substantial kana share decides for Japanese.
+    kana = counts["HIRAGANA"] + counts["KATAKANA"]
+    if kana and kana >= 0.1 * (kana + counts["CJK"]):
+        return "HIRAGANA"
+    return counts.most_common(1)[0][0]
+
+
+def detect_language(text: str) -> Tuple[Optional[str], float]:
+    """
+    Guesses the language of a text without calling a service.
+
+    The dominant script decides the language when it is used by a single language. Otherwise
+    words are matched against stop-word lists of the languages written in that script, each
+    word weighted by how many of those languages share it. The confidence grows with the score
+    lead of the best language over the runner-up, so longer samples give firmer answers, and is
+    reduced when the stop words explain too little of the text to be ordinary prose.
+
+    Args:
+        text (str): Text sample, a few hundred characters or more.
+
+    Returns:
+        Tuple[Optional[str], float]: Language code (or None) and a confidence between 0 and 1.
+    """
+    script = detect_script(text)
+    if script is None:
+        return None, 0.0
+    if script in _SCRIPT_LANGUAGES:
+        return _SCRIPT_LANGUAGES[script]
+    profiles = _STOP_WORDS.get(script)
+    if not profiles:
+        return None, 0.0
+
+    words = [w.lower() for w in _WORD.findall(text)]
+    if len(words) < _MIN_WORDS:
+        return None, 0.0
+
+    sharing = Counter(word for stop_words in profiles.values() for word in stop_words)
+    scores = {
+        language: sum(1.0 / sharing[w] for w in words if w in stop_words)
+        for language, stop_words in profiles.items()
+    }
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (language, best), (_, second) = ranked[0], ranked[1]
+    if best == 0:
+        return None, 0.0
+
+    evidence = 1.0 - math.exp(-(best - second) / 2.5)
+    coverage = sum(1 for w in words if w in profiles[language]) / len(words)
+    return language, round(evidence * min(1.0, coverage / 0.1), 3)
@@ -0,0 +1,281 @@
+import bisect
+import json
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+_MAGIC = b"CALI1"
+_HEADER_SIZE = struct.Struct("<I")
+
+
+class Line(NamedTuple):
+    """
+    A line of text located on a page.
+
+    Attributes:
+        index (int): Position of the line in the document.
+        page (int): One-based page number.
+        text (str): Line content.
+        offset (int): Start offset of the line in ``LayoutIndex.text``.
+        box (Tuple[float, float, float, float]): Bounding box ``(x0, y0, x1, y1)`` in page units.
+    """
+    index: int
+    page: int
+    text: str
+    offset: int
+    box: Tuple[float, float, float, float]
+
+
+class LayoutIndex:
+    """
+    Compact, queryable store of the lines of an analyzed document.
+
+    All line texts are kept in one string, separated by newlines, and everything else lives in
+    ``array`` buffers: line start offsets, the first line of every page and four coordinates per
+    line. An index costs little more than its text, so thousands of documents can be held in
+    memory, and it can be written to and read from disk as a single binary blob.
+    """
+
+    def __init__(self, text: str, line_offsets: array, page_starts: array, boxes: array,
+                 page_sizes: array, unit: Optional[str] = None):
+        """
+        Initializes the index from its buffers; use ``from_results`` or ``load`` instead.
+
+        Args:
+            text (str): Line texts joined with newlines.
+            line_offsets (array): Start offset of each line in ``text`` (typecode ``I``).
+            page_starts (array): Index of the first line of each page, plus the line count (``I``).
+            boxes (array): ``x0, y0, x1, y1`` of each line (``f``).
+            page_sizes (array): Width and height of each page (``f``).
+            unit (Optional[str]): Unit of the coordinates, e.g. ``"inch"``.
+        """
+        self.text = text
+        self.line_offsets = line_offsets
+        self.page_starts = page_starts
+        self.boxes = boxes
+        self.page_sizes = page_sizes
+        self.unit = unit
+
+    @classmethod
+    def from_results(cls, *results) -> "LayoutIndex":
+        """
+        Builds an index from Document Intelligence analysis results.
+
+        Results of consecutive page ranges are merged in the order given.
+
+        Args:
+            *results: ``AnalyzeResult`` objects.
+
+        Returns:
+            LayoutIndex: The index.
+        """
+        texts: List[str] = []
+        line_offsets = array("I")
+        page_starts = array("I")
+        boxes = array("f")
+        page_sizes = array("f")
+        unit = None
+        offset = 0
+        for result in results:
+            for page in result.pages:
+                page_starts.append(len(line_offsets))
+                page_sizes.extend((float(page.width or 0), float(page.height or 0)))
+                unit = unit or page.unit
+                for line in page.lines:
+                    texts.append(line.content)
+                    line_offsets.append(offset)
+                    offset += len(line.content) + 1
+                    boxes.extend(_bounding_box(line.polygon))
+        page_starts.append(len(line_offsets))
+        return cls("\n".join(texts), line_offsets, page_starts, boxes, page_sizes,
+                   unit if isinstance(unit, str) else None)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_starts) - 1
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets)
+
+    def line(self, index: int) -> Line:
+        """
+        Returns a line by its position in the document.
+        """
+        start = self.line_offsets[index]
+        end = self.line_offsets[index + 1] - 1 if index + 1 < len(self.line_offsets) else len(self.text)
+        box = tuple(self.boxes[4 * index:4 * index + 4])
+        return Line(index, self._page_of_line(index), self.text[start:end], start, box)
+
+    def lines(self, page: int) -> List[Line]:
+        """
+        Returns the lines of a page.
+
+        Args:
+            page (int): One-based page number.
+
+        Returns:
+            List[Line]: Lines in reading order.
+        """
+        return [self.line(i) for i in self._line_range(page)]
+
+    def page_text(self, page: int, separator: str = "") -> str:
+        """
+        Returns the text of a page.
+
+        Args:
+            page (int): One-based page number.
+            separator (str): Inserted between lines. The default matches ``document_layout_pages``.
+
+        Returns:
+            str: Page text.
+        """
+        return separator.join(line.text for line in self.lines(page))
+
+    def page_of_offset(self, offset: int) -> int:
+        """
+        Returns the page containing a character offset of ``text``.
+
+        Args:
+            offset (int): Character offset.
+
+        Returns:
+            int: One-based page number.
+        """
+        return self._page_of_line(self._line_of_offset(offset))
+
+    def lines_in_region(self, page: int, x0: float, y0: float, x1: float, y1: float,
+                        contained: bool = False) -> List[Line]:
+        """
+        Returns the lines of a page whose bounding boxes overlap, or lie within, a region.
+
+        Args:
+            page (int): One-based page number.
+            x0, y0, x1, y1 (float): Region corners, in page units.
+            contained (bool): Only return lines entirely inside the region.
+
+        Returns:
+            List[Line]: Matching lines in reading order.
+        """
+        matches = []
+        boxes = self.boxes
+        for i in self._line_range(page):
+            bx0, by0, bx1, by1 = boxes[4 * i], boxes[4 * i + 1], boxes[4 * i + 2], boxes[4 * i + 3]
+            if contained:
+                hit = bx0 >= x0 and by0 >= y0 and bx1 <= x1 and by1 <= y1
+            else:
+                hit = bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0
+            if hit:
+                matches.append(self.line(i))
+        return matches
+
+    def search(self, pattern: Union[str, "re.Pattern"], flags: int = 0) -> List[Line]:
+        """
+        Returns the lines containing a match of a regular expression.
+
+        The pattern runs once over the whole text, with ``re.MULTILINE``, so ``^`` and ``$``
+        match at line boundaries. Matches spanning several lines report the line they start on.
+
+        Args:
+            pattern (Union[str, re.Pattern]): Regular expression.
+            flags (int): ``re`` flags, used when ``pattern`` is a string.
+
+        Returns:
+            List[Line]: Matching lines, each reported once, in reading order.
+        """
+        regex = re.compile(pattern, flags | re.MULTILINE) if isinstance(pattern, str) else pattern
+        indices = dict.fromkeys(self._line_of_offset(m.start()) for m in regex.finditer(self.text))
+        return [self.line(i) for i in indices]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the index.
+
+        Returns:
+            bytes: Binary representation, read back with ``from_bytes``.
+        """
+        text = self.text.encode("utf-8")
+        buffers = [self.line_offsets, self.page_starts, self.boxes, self.page_sizes]
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "unit": self.unit,
+            "text": len(text),
+            "buffers": [[b.typecode, b.itemsize, len(b)] for b in buffers],
+        }).encode("utf-8")
+        return b"".join([_MAGIC, _HEADER_SIZE.pack(len(header)), header, text] + [b.tobytes() for b in buffers])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LayoutIndex":
+        """
+        Reads an index serialized with ``to_bytes``.
+
+        Args:
+            data (bytes): Serialized index.
+
+        Returns:
+            LayoutIndex: The index.
+
+        Raises:
+            ValueError: If the data is not a serialized index.
+        """
+        if not data.startswith(_MAGIC):
+            raise ValueError("Not a serialized LayoutIndex.")
+        position = len(_MAGIC)
+        (header_size,) = _HEADER_SIZE.unpack_from(data, position)
+        position += _HEADER_SIZE.size
+        header = json.loads(data[position:position + header_size])
+        position += header_size
+        text = data[position:position + header["text"]].decode("utf-8")
+        position += header["text"]
+
+        buffers = []
+        for typecode, itemsize, length in header["buffers"]:
+            buffer = array(typecode)
+            if buffer.itemsize != itemsize:
+                raise ValueError(f"Incompatible item size for array type '{typecode}'.")
+            buffer.frombytes(data[position:position + itemsize * length])
+            if header["byteorder"] != sys.byteorder:
+                buffer.byteswap()
+            buffers.append(buffer)
+            position += itemsize * length
+        return cls(text, *buffers, unit=header["unit"])
+
+    def save(self, path: Union[str, Path]):
+        """
+        Writes the index to a file.
+        """
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "LayoutIndex":
+        """
+        Reads an index written with ``save``.
+        """
+        return cls.from_bytes(Path(path).read_bytes())
+
+    def _line_range(self, page: int) -> range:
+        if not 1 <= page <= self.page_count:
+            raise IndexError(f"Page {page} is out of range.")
+        return range(self.page_starts[page - 1], self.page_starts[page])
+
+    def _line_of_offset(self, offset: int) -> int:
+        return max(bisect.bisect_right(self.line_offsets, offset) - 1, 0)
+
+    def _page_of_line(self, index: int) -> int:
+        # Pages without lines share their start with the next page; bisect_right skips past them.
+        return bisect.bisect_right(self.page_starts, index, 0, len(self.page_starts) - 1)
+
+
+def _bounding_box(polygon: Optional[Iterable]) -> Tuple[float, float, float, float]:
+    """
+    Returns the axis-aligned bounding box of a polygon of points.
+    """
+    points = list(polygon or [])
+    if not points:
+        return 0.0, 0.0, 0.0, 0.0
+    xs = [float(p.x) for p in points]
+    ys = [float(p.y) for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
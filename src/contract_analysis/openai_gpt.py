@@ -1,11 +1,122 @@
 from azure.identity import get_bearer_token_provider
+import openai
 from openai import AzureOpenAI
-from typing import Callable, Union, List, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterable, Optional, Tuple, Union, List, Dict
+import json
 import re
+import threading
 import time
 
+from .cache import ResultCache
+from .chunking import TextChunker, TokenCounter, get_token_counter
+from .responses import parse_json_object
+from .throttling import AdaptiveConcurrencyLimiter, backoff_delay, parse_retry_after
+
 PromptRegistry = Dict[str, Union[str, Callable[[], str]]]
 
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Error classes of a failed request, see ``classify_error``.
+THROTTLE = "throttle"
+TRANSIENT = "transient"
+CONTEXT_LENGTH = "context_length"
+FATAL = "fatal"
+
+_CONTEXT_LENGTH_CODES = ("context_length_exceeded", "string_above_max_length")
+
+
+class ContextLengthExceeded(Exception):
+    """
+    Raised when a request does not fit the deployment's context window.
+    """
+
+
+@dataclass
+class CallStats:
+    """
+    Retry statistics of one chat completion request.
+
+    Attributes:
+        attempts (int): Requests sent to the service.
+        throttled (int): Attempts rejected with HTTP 429.
+        transient (int): Attempts that failed with a connection, timeout or server error.
+        waited (float): Seconds spent waiting between attempts.
+        outcome (str): ``succeeded``, ``cached``, or the class of the error that ended the call.
+        finish_reason (Optional[str]): Why the model stopped, e.g. ``stop`` or ``length`` when
+            ``max_tokens`` cut the answer off; None for cached responses and failed calls.
+    """
+    attempts: int = 0
+    throttled: int = 0
+    transient: int = 0
+    waited: float = 0.0
+    outcome: str = "pending"
+    finish_reason: Optional[str] = None
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classifies a failed request by what retrying it can achieve.
+
+    Args:
+        error (BaseException): Error raised by the OpenAI client.
+
+    Returns:
+        str: ``THROTTLE`` (retry after the requested delay), ``TRANSIENT`` (retry with backoff),
+            ``CONTEXT_LENGTH`` (retry with less text) or ``FATAL`` (do not retry).
+    """
+    if isinstance(error, openai.APIConnectionError):
+        return TRANSIENT
+    if not isinstance(error, openai.APIStatusError):
+        return FATAL
+    code = getattr(error, "code", None)
+    if error.status_code == 429:
+        return FATAL if code == "insufficient_quota" else THROTTLE
+    if error.status_code in (400, 413) and (
+        code in _CONTEXT_LENGTH_CODES or "maximum context length" in str(error).lower()
+    ):
+        return CONTEXT_LENGTH
+    if error.status_code in (408, 409) or error.status_code >= 500:
+        return TRANSIENT
+    return FATAL
+
+PACKED_PROMPT = """
+The user message contains a contract. Below are several independent tasks, each introduced by its name.
+Carry out every task on the contract on its own, exactly as if it were the only instruction you were given.
+Answer with a single JSON object and nothing else: its keys are the task names and each value is the
+complete answer to that task, as a string.
+"""
+
+_limiters: Dict[Tuple[str, str], AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_deployment_limiter(azure_endpoint: str, model: str,
+                           max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> AdaptiveConcurrencyLimiter:
+    """
+    Returns the process-wide concurrency limiter of a deployment.
+
+    All clients of the same deployment share one limiter, so parallel prompts, documents and
+    threads together stay within the deployment's limit.
+
+    Args:
+        azure_endpoint (str): Endpoint for Azure OpenAI.
+        model (str): Deployment name.
+        max_concurrency (int): Limit of a limiter created by this call; an existing limiter keeps its own.
+
+    Returns:
+        AdaptiveConcurrencyLimiter: The limiter, created on first request.
+    """
+    key = (azure_endpoint.rstrip("/"), model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = AdaptiveConcurrencyLimiter(max_concurrency)
+        return limiter
+
+
 class OpenAIGPT:
     """
     A robust and modular wrapper for Azure OpenAI GPT-4 API with prompt registry support.
@@ -18,7 +129,13 @@ class OpenAIGPT:
         api_version: str,
         azure_endpoint: str,
         model: str,
-        token_scope: str = "https://cognitiveservices.azure.com/.default"
+        token_scope: str = "https://cognitiveservices.azure.com/.default",
+        max_input_tokens: Optional[int] = None,
+        chunk_overlap_tokens: int = 0,
+        token_counter: Optional[TokenCounter] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        response_cache: Optional[ResultCache] = None,
+        max_retries: int = 4,
     ):
         """
         Initialize the GPT client with a prompt registry and a custom Azure credential.
@@ -30,6 +147,16 @@ class OpenAIGPT:
             azure_endpoint (str): Endpoint for Azure OpenAI.
             model (str): Deployment name of the GPT model.
             token_scope (str): Scope for Azure AD token.
+            max_input_tokens (Optional[int]): Token budget of a request (prompt and text). Longer
+                texts are split at paragraph and clause boundaries before they are sent.
+            chunk_overlap_tokens (int): Tokens repeated between consecutive chunks.
+            token_counter (Optional[TokenCounter]): Local tokenizer; defaults to ``tiktoken`` when
+                installed and to an estimate otherwise.
+            max_concurrency (int): Maximum number of concurrent requests to the deployment, shared
+                by all clients of the deployment in the process.
+            response_cache (Optional[ResultCache]): Cache of completions, keyed by deployment, prompts
+                and generation parameters, so unchanged requests are not sent again.
+            max_retries (int): Retries of a throttled or transiently failing request.
         """
         self.gpt_credential = gpt_credential
         self.prompt_registry = prompt_registry
@@ -38,23 +165,62 @@ class OpenAIGPT:
             azure_endpoint=azure_endpoint,
             azure_ad_token_provider=get_bearer_token_provider(
                 self.gpt_credential, token_scope
-            )
+            ),
+            # Retries are classified and paced by _run_api.
+            max_retries=0,
         )
         self.model = model
+        self.api_version = api_version
+        self.azure_endpoint = azure_endpoint
+        self.generation_params = {"temperature": 0.1, "max_tokens": 3000, "top_p": 0.5}
+        self.response_cache = response_cache
+        self.max_retries = max_retries
+        self.call_stats: Deque[CallStats] = deque(maxlen=1000)
+        self._local = threading.local()
+        self.max_input_tokens = max_input_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self._token_counter = token_counter
+        self.limiter = get_deployment_limiter(azure_endpoint, model, max_concurrency)
 
-    def _split_text(self, text: str, chunk_size: int) -> List[str]:
+    @property
+    def last_call_stats(self) -> Optional[CallStats]:
+        """
+        Returns the retry statistics of the last request made by the current thread.
+        """
+        return getattr(self._local, "stats", None)
+
+    @property
+    def token_counter(self) -> TokenCounter:
+        """
+        Returns the tokenizer used to size requests, resolved on first use.
         """
-        Splits text into chunks based on page markers.
+        if self._token_counter is None:
+            self._token_counter = get_token_counter()
+        return self._token_counter
+
+    def _chunk_text(self, text: str, prompt: str) -> List[str]:
+        """
+        Splits text so that each chunk fits ``max_input_tokens`` together with the prompt.
 
         Args:
             text (str): Input text.
-            chunk_size (int): Number of pages per chunk.
+            prompt (str): Prompt sent with every chunk.
 
         Returns:
-            List[str]: List of text chunks.
+            List[str]: The text as is without a budget or when it fits, its chunks otherwise.
+
+        Raises:
+            ValueError: If the prompt alone exceeds the budget.
         """
-        pages = text.split("-- PAGE")
-        return [f"-- PAGE{''.join(pages[i:i+chunk_size])}" for i in range(0, len(pages), chunk_size)]
+        if not self.max_input_tokens:
+            return [text]
+        budget = self.max_input_tokens - self.token_counter(prompt)
+        if budget < 1:
+            raise ValueError("The prompt alone exceeds max_input_tokens.")
+        if self.token_counter(text) <= budget:
+            return [text]
+        overlap = min(self.chunk_overlap_tokens, budget - 1)
+        return TextChunker(budget, overlap, self.token_counter).split(text)
 
     def _clean_text(self, text: str) -> str:
         """
@@ -68,36 +234,93 @@ class OpenAIGPT:
         """
         return re.sub(r'--.*?--', '', text, flags=re.DOTALL)
 
-    def _run_api(self, system_prompt: str, user_prompt: str) -> str:
+    def _cache_key(self, system_prompt: str, user_prompt: str) -> str:
+        """
+        Builds the response cache key of a request.
+        """
+        return ResultCache.key(
+            "chat", self.azure_endpoint.rstrip("/"), self.model, self.api_version,
+            json.dumps(self.generation_params, sort_keys=True), system_prompt, user_prompt,
+        )
+
+    def _run_api(self, system_prompt: str, user_prompt: str, use_cache: bool = True, store: bool = True) -> str:
         """
         Executes a chat completion request with retry logic.
 
+        Throttled requests wait for the service's ``Retry-After`` delay, or a jittered backoff,
+        and lower the deployment's concurrency limit; connection, timeout and server errors are
+        retried with jittered backoff. Other errors are raised at once. The statistics of the
+        call are available from ``last_call_stats`` and ``call_stats``.
+
         Args:
             system_prompt (str): System-level prompt.
             user_prompt (str): User-level prompt.
+            use_cache (bool): Read and store the response in ``response_cache``.
+            store (bool): Store a new response in ``response_cache``; False leaves it to the
+                caller, which can check the response first.
 
         Returns:
             str: Response from the GPT model.
+
+        Raises:
+            ContextLengthExceeded: If the request does not fit the context window.
+            openai.OpenAIError: If the request fails for good, or keeps failing after ``max_retries``.
         """
-        for attempt in range(5):
+        stats = CallStats()
+        self._local.stats = stats
+        self.call_stats.append(stats)
+
+        key = None
+        if self.response_cache is not None and use_cache:
+            key = self._cache_key(system_prompt, user_prompt)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                stats.outcome = "cached"
+                return cached
+
+        for attempt in range(self.max_retries + 1):
+            stats.attempts += 1
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=3000,
-                    top_p=0.5
-                )
-                return response.choices[0].message.content
+                with self.limiter:
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        **self.generation_params
+                    )
             except Exception as e:
-                print(f"[Retry {attempt+1}] OpenAI API error: {e}")
-                time.sleep(2 ** attempt)
-        return "Error: OpenAI API failed after retries."
+                kind = classify_error(e)
+                if kind == CONTEXT_LENGTH:
+                    stats.outcome = kind
+                    raise ContextLengthExceeded(str(e)) from e
+                if kind == FATAL or attempt == self.max_retries:
+                    stats.outcome = kind
+                    raise
+                response_headers = getattr(getattr(e, "response", None), "headers", None)
+                retry_after = parse_retry_after(response_headers)
+                if kind == THROTTLE:
+                    stats.throttled += 1
+                    self.limiter.on_throttle(retry_after)
+                else:
+                    stats.transient += 1
+                delay = retry_after if retry_after is not None else backoff_delay(attempt)
+                stats.waited += delay
+                print(f"[Retry {attempt+1}] OpenAI API {kind} error, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                continue
 
-    def run_prompt(self, prompt_key: str, text: str, clean: bool = False) -> List[str]:
+            self.limiter.on_success()
+            stats.outcome = "succeeded"
+            choice = response.choices[0]
+            stats.finish_reason = choice.finish_reason
+            content = choice.message.content
+            if key is not None and store and content is not None:
+                self.response_cache.put(key, content)
+            return content
+
+    def run_prompt(self, prompt_key: str, text: str, clean: bool = False, use_cache: bool = True) -> List[str]:
         """
         Runs a prompt from the registry against the input text.
 
@@ -105,6 +328,7 @@ class OpenAIGPT:
             prompt_key (str): Key to retrieve the prompt.
             text (str): Input text.
             clean (bool): Whether to clean the text before processing.
+            use_cache (bool): Use ``response_cache``; False sends the requests regardless.
 
         Returns:
             List[str]: List of GPT responses.
@@ -112,45 +336,183 @@ class OpenAIGPT:
         Raises:
             ValueError: If the prompt key is not found.
         """
+        return self.run(text, self._prompt(prompt_key), clean=clean, use_cache=use_cache)
+
+    def run_prompts(self, prompt_keys: Iterable[str], text: str, clean: bool = False,
+                    max_workers: Optional[int] = None, packed: bool = False,
+                    use_cache: bool = True) -> Dict[str, List[str]]:
+        """
+        Runs several prompts from the registry against the same text in parallel.
+
+        The prompts run on a thread pool; the deployment's concurrency limit still bounds the
+        requests in flight, so an audit takes about as long as its slowest prompt.
+
+        With ``packed``, the prompts are first merged into one request that sends the text once
+        and asks for a JSON answer keyed by prompt. Prompts whose answer is missing from that
+        response, because it is malformed or was cut off, are run again separately, as are all
+        prompts when the text does not fit a single request.
+
+        Args:
+            prompt_keys (Iterable[str]): Keys of the prompts to run.
+            text (str): Input text.
+            clean (bool): Whether to clean the text before processing.
+            max_workers (Optional[int]): Size of the thread pool; defaults to one thread per
+                prompt, up to the deployment's concurrency limit.
+            packed (bool): Answer all prompts in a single request when possible.
+            use_cache (bool): Use ``response_cache``; False sends the requests regardless.
+
+        Returns:
+            Dict[str, List[str]]: GPT responses per prompt key, in the order of ``prompt_keys``.
+
+        Raises:
+            ValueError: If a prompt key is not found, before any request is sent.
+        """
+        prompts = {key: self._prompt(key) for key in prompt_keys}
+        if not prompts:
+            return {}
+        results = self._run_packed(prompts, text, clean, use_cache) if packed and len(prompts) > 1 else {}
+        remaining = {key: prompt for key, prompt in prompts.items() if key not in results}
+        if remaining:
+            workers = max_workers or min(len(remaining), self.limiter.max_concurrency)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {key: executor.submit(self.run, text, prompt, clean, use_cache) for key, prompt in remaining.items()}
+                results.update({key: future.result() for key, future in futures.items()})
+        return {key: results[key] for key in prompts}
+
+    def _run_packed(self, prompts: Dict[str, str], text: str, clean: bool = False,
+                    use_cache: bool = True) -> Dict[str, List[str]]:
+        """
+        Answers several prompts with one request.
+
+        The response is only stored in ``response_cache`` once it has been read, so a malformed
+        or cut-off answer is asked for again on the next run rather than replayed.
+
+        Args:
+            prompts (Dict[str, str]): Prompt texts by key.
+            text (str): Input text.
+            clean (bool): Whether to clean the text before processing.
+            use_cache (bool): Use ``response_cache``.
+
+        Returns:
+            Dict[str, List[str]]: Responses of the prompts answered by the request; empty if the
+                text does not fit a single request, the response was cut off by ``max_tokens`` or
+                it holds no JSON object.
+        """
+        if clean:
+            text = self._clean_text(text)
+        tasks = "\n\n".join(f"### TASK: {key}\n{prompt.strip()}" for key, prompt in prompts.items())
+        system_prompt = f"{PACKED_PROMPT.strip()}\n\n{tasks}"
+        if len(self._chunk_text(text, system_prompt)) > 1:
+            return {}
+
+        try:
+            answers = self.run_json(text, system_prompt, use_cache=use_cache)
+        except ContextLengthExceeded:
+            return {}
+        return {
+            key: [answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)]
+            for key, answer in answers.items()
+            if key in prompts and answer not in (None, "")
+        }
+
+    def _prompt(self, prompt_key: str) -> str:
+        """
+        Returns the text of a registry prompt, calling its provider if needed.
+
+        Raises:
+            ValueError: If the prompt key is not found in the registry.
+        """
         if prompt_key not in self.prompt_registry:
             raise ValueError(f"Prompt '{prompt_key}' not found in registry.")
         prompt = self.prompt_registry[prompt_key]
         if callable(prompt):
             prompt = prompt()
-        return self.run(text, prompt, clean=clean)
+        return prompt
 
-    def run(self, text: str, prompt: str, clean: bool = False) -> List[str]:
+    def run(self, text: str, prompt: str, clean: bool = False, use_cache: bool = True) -> List[str]:
         """
         Runs the GPT model on the input text with fallback chunking.
 
+        With ``max_input_tokens`` set, a text that does not fit is split into chunks of the right
+        size up front, and each chunk is sent in its own request. A request that still overflows
+        the context window is split in halves at paragraph and clause boundaries and sent again.
+
         Args:
             text (str): Input text.
             prompt (str): Prompt to use.
             clean (bool): Whether to clean the text before processing.
+            use_cache (bool): Use ``response_cache``; False sends the requests regardless.
 
         Returns:
             List[str]: List of GPT responses.
+
+        Raises:
+            ContextLengthExceeded: If a part of the text cannot be split to fit the context window.
+            openai.OpenAIError: If a request fails, see ``_run_api``.
         """
         if clean:
             text = self._clean_text(text)
 
+        results = []
+        for chunk in self._chunk_text(text, prompt):
+            results.extend(self._run_fitting(prompt, chunk, use_cache))
+        return results
+
+    def run_json(self, text: str, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Sends the text whole in a single request and reads the JSON object of the response.
+
+        Unlike ``run``, the text is never chunked, for requests whose parts must be seen together.
+        The response is only stored in ``response_cache`` once it has been read, so a malformed
+        or cut-off answer is asked for again on the next run rather than replayed.
+
+        Args:
+            text (str): Input text.
+            prompt (str): Prompt to use.
+            use_cache (bool): Use ``response_cache``; False sends the request regardless.
+
+        Returns:
+            Dict[str, Any]: The answer; empty if the response was cut off by ``max_tokens`` or
+                holds no JSON object.
+
+        Raises:
+            ContextLengthExceeded: If the text does not fit the context window.
+            openai.OpenAIError: If the request fails, see ``_run_api``.
+        """
+        response = self._run_api(prompt, text, use_cache=use_cache, store=False)
+        stats = self.last_call_stats or CallStats()
+        if stats.finish_reason == "length":
+            return {}
+        answer = parse_json_object(response)
+        if answer and use_cache and self.response_cache is not None and stats.outcome != "cached":
+            self.response_cache.put(self._cache_key(prompt, text), response)
+        return answer
+
+    def _run_fitting(self, prompt: str, text: str, use_cache: bool = True) -> List[str]:
+        """
+        Runs a request, halving the text with the token-aware chunker while it overflows the context window.
+
+        Args:
+            prompt (str): Prompt to use.
+            text (str): Input text.
+            use_cache (bool): Use ``response_cache``.
+
+        Returns:
+            List[str]: One response per request that fit.
+
+        Raises:
+            ContextLengthExceeded: If the text cannot be split any further.
+        """
         try:
-            return [self._run_api(prompt, text)]
-        except Exception:
-            print("Initial run failed, attempting fallback...")
-            results = []
-            for chunk in self._split_text(text, 4):
-                try:
-                    if clean:
-                        chunk = self._clean_text(chunk)
-                    results.append(self._run_api(prompt, chunk))
-                except Exception:
-                    for sub_chunk in self._split_text(chunk, 2):
-                        try:
-                            if clean:
-                                sub_chunk = self._clean_text(sub_chunk)
-                            results.append(self._run_api(prompt, sub_chunk))
-                        except Exception as e:
-                            print(f"Final fallback failed: {e}")
-                            results.append("Error: Final fallback failed.")
-            return results
+            return [self._run_api(prompt, text, use_cache=use_cache)]
+        except ContextLengthExceeded:
+            budget = max(self.token_counter(text) // 2, 1)
+            overlap = min(self.chunk_overlap_tokens, budget - 1)
+            chunks = TextChunker(budget, overlap, self.token_counter).split(text)
+            if len(chunks) < 2:
+                raise
+            print(f"Context length exceeded, retrying in {len(chunks)} chunks...")
+        results = []
+        for chunk in chunks:
+            results.extend(self._run_fitting(prompt, chunk, use_cache))
+        return results
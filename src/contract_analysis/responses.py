@@ -0,0 +1,25 @@
+import json
+import re
+from typing import Any, Dict
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def parse_json_object(response: str) -> Dict[str, Any]:
+    """
+    Reads the JSON object of a GPT response, ignoring code fences and surrounding text.
+
+    Args:
+        response (str): GPT response.
+
+    Returns:
+        Dict[str, Any]: The object; empty if the response holds no complete JSON object.
+    """
+    match = _JSON_OBJECT.search(response or "")
+    if not match:
+        return {}
+    try:
+        value = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    return value if isinstance(value, dict) else {}
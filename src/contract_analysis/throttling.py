@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Reads the delay requested by the service from response headers.
+
+    Supports ``retry-after-ms``/``x-ms-retry-after-ms`` (milliseconds) and ``Retry-After``
+    (seconds or an HTTP date).
+
+    Args:
+        headers (Optional[Mapping[str, str]]): Response headers.
+
+    Returns:
+        Optional[float]: Delay in seconds, or None if the headers do not request one.
+    """
+    if not headers:
+        return None
+    lowered = {str(k).lower(): v for k, v in headers.items()}
+
+    for name in ("retry-after-ms", "x-ms-retry-after-ms"):
+        try:
+            return max(float(lowered[name]) / 1000.0, 0.0)
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    value = lowered.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    Computes an exponential backoff delay with full jitter.
+
+    Args:
+        attempt (int): Zero-based retry attempt.
+        base (float): Delay scale in seconds.
+        cap (float): Maximum delay in seconds.
+
+    Returns:
+        float: Delay in seconds, uniformly drawn from ``[0, min(cap, base * 2 ** attempt)]``.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit for calls to a throttled service, adjusted with additive increase / multiplicative decrease.
+
+    The limit is halved whenever the service throttles and grows by one after a full window of
+    successful calls, up to ``max_concurrency``. A ``Retry-After`` delay pauses every caller, not
+    just the one that was throttled.
+
+    Usage:
+        with limiter:
+            response = send()
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1):
+        """
+        Initializes the limiter.
+
+        Args:
+            max_concurrency (int): Upper bound for concurrent calls.
+            min_concurrency (int): Lower bound the limit never drops below.
+        """
+        if max_concurrency < 1 or min_concurrency < 1:
+            raise ValueError("Concurrency limits must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self._limit = max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        Returns the current concurrency limit.
+        """
+        return self._limit
+
+    def acquire(self):
+        """
+        Blocks until a call may start.
+        """
+        with self._condition:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(pause)
+                elif self._in_flight >= self._limit:
+                    self._condition.wait()
+                else:
+                    self._in_flight += 1
+                    return
+
+    def release(self):
+        """
+        Marks a call as finished.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        """
+        Records a successful call, raising the limit after a full window of successes.
+        """
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self.max_concurrency:
+                self._limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """
+        Records a throttled call: halves the limit and pauses all callers for ``retry_after`` seconds.
+
+        Args:
+            retry_after (Optional[float]): Delay requested by the service.
+        """
+        with self._condition:
+            self._limit = max(self.min_concurrency, self._limit // 2)
+            self._successes = 0
+            if retry_after:
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
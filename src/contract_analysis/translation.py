@@ -1,48 +1,195 @@
+import hashlib
+import json
+import re
+import time
 import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 from azure.core.credentials import TokenCredential
 from contract_analysis import Document
+from .document import TranslationResult
+from .cache import atomic_write_text
+from .credentials import COGNITIVE_SERVICES_SCOPE, get_token_broker
+from .http_transport import HttpTransport, get_default_transport
+from .language_detection import detect_language as detect_language_locally
+from .throttling import AdaptiveConcurrencyLimiter, backoff_delay, parse_retry_after
+from .translation_memory import TranslationMemory
+
+API_VERSION = "3.0"
+
+# Characters of the document sampled for language detection, locally and by the service.
+LOCAL_DETECTION_SAMPLE_SIZE = 5000
+SERVICE_DETECTION_SAMPLE_SIZE = 1000
+
+_CONTROL_CHARACTERS = "".join(chr(c) for c in range(0x00, 0x20)) + "\x7f"
+
+# Translator v3 request limits: array elements per request and characters across all elements.
+MAX_ELEMENTS_PER_REQUEST = 1000
+MAX_CHARACTERS_PER_REQUEST = 50000
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;:])\s+|(?<=[。！？；])\s*")
+_WORD = re.compile(r"\S+")
+
+# Incremental translations are recorded in a JSON file next to the translated DOCX.
+SIDECAR_SUFFIX = ".segments.json"
+SIDECAR_VERSION = 1
 
 class TranslationAction(Enum):
     TRANSLATE = "translate"
     DETECT = "detect"
 
+
+def split_text(text: str, max_characters: int) -> List[str]:
+    """
+    Splits text into pieces of at most ``max_characters``, preferring sentence and word boundaries.
+
+    Args:
+        text (str): Text to split.
+        max_characters (int): Maximum length of a piece.
+
+    Returns:
+        List[str]: Slices of the text, in order. Only whitespace separates consecutive pieces, or
+            nothing where a run without whitespace, such as Chinese or Thai text, was cut.
+    """
+    return [text[start:end] for start, end in _split_spans(text, max_characters)]
+
+
+def _split_spans(text: str, max_characters: int) -> List[Tuple[int, int]]:
+    """
+    Returns the start and end offsets of the pieces of ``split_text``.
+    """
+    if len(text) <= max_characters:
+        return [(0, len(text))]
+
+    spans = []
+    start = end = None
+    for part_start, part_end in _part_spans(text, max_characters):
+        if start is not None and part_end - start <= max_characters:
+            end = part_end
+        else:
+            if start is not None:
+                spans.append((start, end))
+            start, end = part_start, part_end
+    if start is not None:
+        spans.append((start, end))
+    return spans
+
+
+def _part_spans(text: str, max_characters: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yields the spans of the sentences of a text, split on whitespace when they are too long and
+    cutting words only when unavoidable.
+    """
+    boundaries = [match.span() for match in _SENTENCE_BOUNDARY.finditer(text)]
+    sentence_start = 0
+    for boundary_start, boundary_end in boundaries + [(len(text), len(text))]:
+        sentence = text[sentence_start:boundary_start]
+        if sentence.strip() and len(sentence.strip()) <= max_characters:
+            offset = len(sentence) - len(sentence.lstrip())
+            yield sentence_start + offset, sentence_start + offset + len(sentence.strip())
+        else:
+            for word in _WORD.finditer(sentence):
+                for i in range(word.start(), word.end(), max_characters):
+                    yield sentence_start + i, sentence_start + min(i + max_characters, word.end())
+        sentence_start = boundary_end
+
+
+def build_batches(texts: List[str], max_elements: int = MAX_ELEMENTS_PER_REQUEST,
+                  max_characters: int = MAX_CHARACTERS_PER_REQUEST) -> List[List[int]]:
+    """
+    Packs texts, in order, into request batches respecting the element and character limits.
+
+    Args:
+        texts (List[str]): Texts to translate, each at most ``max_characters`` long.
+        max_elements (int): Maximum number of texts per request.
+        max_characters (int): Maximum number of characters per request.
+
+    Returns:
+        List[List[int]]: Indices into ``texts`` for each request.
+    """
+    batches = []
+    current: List[int] = []
+    size = 0
+    for index, text in enumerate(texts):
+        if current and (len(current) >= max_elements or size + len(text) > max_characters):
+            batches.append(current)
+            current = []
+            size = 0
+        current.append(index)
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def paragraph_hash(text: str) -> str:
+    """
+    Returns the content hash identifying a paragraph across versions of a document.
+
+    Args:
+        text (str): Paragraph text.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 class Translation:
     def __init__(self, credential: TokenCredential, translator_endpoint: str,
-                 translator_region: str, target_language: str, document: Document):
+                 translator_region: str, target_language: str, document: Document,
+                 max_elements_per_request: int = MAX_ELEMENTS_PER_REQUEST,
+                 max_characters_per_request: int = MAX_CHARACTERS_PER_REQUEST,
+                 max_workers: int = 1, max_retries: int = 5,
+                 memory: Optional[TranslationMemory] = None,
+                 transport: Optional[HttpTransport] = None,
+                 local_detection_threshold: Optional[float] = 0.8,
+                 incremental: bool = False, defer_rendering: bool = False):
         """
         Initializes the Translation service with Azure credentials and configuration.
 
         Args:
-            credential (TokenCredential): Azure credential for authentication.
+            credential (TokenCredential): Azure credential for authentication. Tokens are obtained
+                through the process-wide TokenBroker for this credential.
             translator_endpoint (str): Endpoint for Azure Translator.
             translator_region (str): Azure region for Translator.
             target_language (str): Target language for translation.
             document (Document): Document object to be translated.
+            max_elements_per_request (int): Maximum number of texts sent in one request.
+            max_characters_per_request (int): Maximum number of characters sent in one request.
+            max_workers (int): Maximum number of concurrent requests. The effective concurrency is
+                lowered automatically while the service answers with HTTP 429.
+            max_retries (int): Retries for throttled, failed-over (5xx) or dropped requests.
+            memory (Optional[TranslationMemory]): Persistent segment cache; only segments missing
+                from it are sent to the service.
+            transport (Optional[HttpTransport]): Pooled HTTP client; defaults to the process-wide one.
+            local_detection_threshold (Optional[float]): Minimum confidence for the offline language
+                detector to be trusted; below it the service detects the language. None disables
+                offline detection.
+            incremental (bool): Only translate paragraphs changed since the previous translation of
+                the document, reusing the translations recorded next to the translated DOCX.
+            defer_rendering (bool): Keep translations as text and write the translated DOCX and PDF
+                only when a later stage uses the document's translated paths.
         """
-        self.credential = credential
+        self.credential = get_token_broker(credential)
         self.translator_endpoint = translator_endpoint.rstrip("/")
         self.translator_region = translator_region
         self.target_language = target_language
         self.document = document
-        self.access_token = None
-        self.token_expiry = None
-
-    def _get_access_token(self):
-        """
-        Retrieves a new access token using the provided Azure credential.
-        """
-        token = self.credential.get_token("https://cognitiveservices.azure.com/.default")
-        self.access_token = token.token
-        self.token_expiry = datetime.utcfromtimestamp(token.expires_on)
-
-    def _ensure_token_valid(self):
-        """
-        Ensures the access token is valid and refreshes it if expired.
-        """
-        if not self.access_token or not self.token_expiry or datetime.utcnow() >= self.token_expiry:
-            self._get_access_token()
+        self.max_elements_per_request = max_elements_per_request
+        self.max_characters_per_request = max_characters_per_request
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self._limiter = AdaptiveConcurrencyLimiter(max_workers)
+        self.memory = memory
+        self.transport = transport or get_default_transport()
+        self.local_detection_threshold = local_detection_threshold
+        self.source_language: Optional[str] = None
+        self.incremental = incremental
+        self.defer_rendering = defer_rendering
+        self.result: Optional[TranslationResult] = None
 
     def translate_text(self, text: str = None, action: TranslationAction = TranslationAction.TRANSLATE) -> str:
         """
@@ -60,61 +207,298 @@ class Translation:
         """
         if action == TranslationAction.DETECT:
             full_text = self.document.extract_text()
-            text = full_text[:1000].strip()
+            text = full_text[:SERVICE_DETECTION_SAMPLE_SIZE].strip()
 
-            if not text or all(ord(c) in list(range(0x00, 0x20)) + [0x7F] for c in text):
+            if not text.strip(_CONTROL_CHARACTERS):
                 return text
 
-        self._ensure_token_valid()
-
-        url = f"{self.translator_endpoint}/translator/text/v3.0/translate"
-        params = {"api-version": "3.0", "to": [self.target_language]}
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-            "Ocp-Apim-Subscription-Region": self.translator_region,
-        }
-        body = [{"text": text}]
-
+        data = self._post([{"text": text}])
         try:
-            response = requests.post(url, headers=headers, params=params, json=body)
-            response.raise_for_status()
-            data = response.json()
-
             if action == TranslationAction.TRANSLATE:
                 return data[0]["translations"][0]["text"]
             elif action == TranslationAction.DETECT:
                 return data[0]["detectedLanguage"]["language"]
+        except (KeyError, IndexError, TypeError) as e:
+            raise RuntimeError(f"Unexpected response format: {data}") from e
+
+    def translate_texts(self, texts: List[str]) -> List[str]:
+        """
+        Translates many texts with as few requests as the service limits allow.
+
+        Texts longer than the per-request character limit are split at sentence boundaries and
+        their translated pieces joined again. Blank texts are returned as empty strings. With
+        ``max_workers`` above one, batches are sent concurrently and reassembled in order. When a
+        translation memory is configured, only segments it does not know are sent.
+
+        Args:
+            texts (List[str]): Texts to translate.
+
+        Returns:
+            List[str]: Translations, in the order of ``texts``.
+
+        Raises:
+            RuntimeError: If an API request fails or the response format is unexpected.
+        """
+        segments: List[str] = []
+        owners: List[int] = []
+        separators: List[str] = []
+        for index, text in enumerate(texts):
+            if text and text.strip():
+                spans = _split_spans(text, self.max_characters_per_request)
+                for i, (start, end) in enumerate(spans):
+                    next_start = spans[i + 1][0] if i + 1 < len(spans) else end
+                    segments.append(text[start:end])
+                    owners.append(index)
+                    # Rejoined with the original whitespace, or none inside unspaced scripts.
+                    separators.append(text[end:next_start])
+
+        known = {}
+        if self.memory is not None:
+            known = self.memory.get_many(segments, *self._memory_scope())
+        unseen = [segment for segment in dict.fromkeys(segments) if segment not in known]
+
+        batches = build_batches(unseen, self.max_elements_per_request, self.max_characters_per_request)
+        batch_texts = [[unseen[i] for i in batch] for batch in batches]
+        if self.max_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(self._translate_batch, batch_texts))
+        else:
+            results = [self._translate_batch(texts) for texts in batch_texts]
+
+        translated = {}
+        for batch, translations in zip(batch_texts, results):
+            translated.update(zip(batch, translations))
+        if self.memory is not None and translated:
+            self.memory.put_many(list(translated.items()), *self._memory_scope())
+        translated.update(known)
+
+        pieces: List[List[str]] = [[] for _ in texts]
+        for segment, owner, separator in zip(segments, owners, separators):
+            pieces[owner].append(translated[segment] + separator)
+
+        return ["".join(p) for p in pieces]
+
+    def _memory_scope(self) -> tuple:
+        """
+        Returns the source language, target language and API version keying the translation memory.
+        """
+        return (self.source_language or "auto", self.target_language, API_VERSION)
+
+    def _translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Translates one batch of texts in a single request.
+
+        Args:
+            texts (List[str]): Texts within the per-request limits.
 
-        except requests.RequestException as e:
-            raise RuntimeError(f"API request failed: {e}") from e
-        except (KeyError, IndexError) as e:
-            raise RuntimeError(f"Unexpected response format: {response.text}") from e
+        Returns:
+            List[str]: Translations, in the order of ``texts``.
+        """
+        data = self._post([{"text": text} for text in texts])
+        try:
+            if len(data) != len(texts):
+                raise IndexError("Response does not contain one result per text.")
+            return [item["translations"][0]["text"] for item in data]
+        except (KeyError, IndexError, TypeError) as e:
+            raise RuntimeError(f"Unexpected response format: {data}") from e
 
-    def translate_document(self):
+    def _post(self, body: list) -> list:
         """
-        Translates the document paragraph by paragraph and saves the translated version.
+        Sends a translate request to Azure Translator.
+
+        Throttled (429), server error (5xx) and connection failures are retried, waiting for the
+        service's ``Retry-After`` delay when given and a jittered exponential backoff otherwise.
+
+        Args:
+            body (list): Request body, one ``{"text": ...}`` element per text.
+
+        Returns:
+            list: Decoded JSON response.
+
+        Raises:
+            RuntimeError: If the API request fails.
         """
-        paragraphs = self.document.get_paragraphs()
-        translated_texts = []
+        url = f"{self.translator_endpoint}/translator/text/v3.0/translate"
+        params = {"api-version": API_VERSION, "to": [self.target_language]}
+
+        last_error = None
+        delay = 0.0
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(delay)
+
+            access_token = self.credential.get_token(COGNITIVE_SERVICES_SCOPE).token
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json",
+                "Ocp-Apim-Subscription-Region": self.translator_region,
+            }
+
+            with self._limiter:
+                try:
+                    response = self.transport.post(url, headers=headers, params=params, json=body)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    last_error = e
+                    delay = backoff_delay(attempt)
+                    continue
 
-        for p in paragraphs:
-            text = p.Range.Text.strip()
-            if text and text != "\r":
-                translated = self.translate_text(text, action=TranslationAction.TRANSLATE)
-                translated_texts.append(translated)
-            else:
-                translated_texts.append("")
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = parse_retry_after(response.headers)
+                if response.status_code == 429:
+                    self._limiter.on_throttle(retry_after)
+                last_error = requests.HTTPError(f"{response.status_code} response", response=response)
+                delay = retry_after if retry_after is not None else backoff_delay(attempt)
+                continue
 
-        self.document.save_translated(translated_texts)
+            try:
+                response.raise_for_status()
+                data = response.json()
+            except requests.RequestException as e:
+                raise RuntimeError(f"API request failed: {e}") from e
+            except ValueError as e:
+                raise RuntimeError(f"Unexpected response format: {response.text}") from e
+
+            self._limiter.on_success()
+            return data
+
+        raise RuntimeError(
+            f"API request failed after {self.max_retries + 1} attempts: {last_error}"
+        ) from last_error
+
+    def translate(self) -> TranslationResult:
+        """
+        Translates the document paragraphs without writing any file.
+
+        In incremental mode only paragraphs whose content changed since the previous run are sent,
+        and the result counts as rendered when no paragraph changed and the translated files exist.
+
+        Returns:
+            TranslationResult: Translated paragraphs with their offsets and pages.
+        """
+        paragraphs = [p.strip() for p in self.document.get_paragraph_texts()]
+        if self.incremental:
+            return self._translate_incrementally(paragraphs)
+        return TranslationResult(self.document, self.translate_texts(paragraphs))
+
+    def translate_document(self, render: Optional[bool] = None) -> TranslationResult:
+        """
+        Translates the document paragraphs in batched requests and selects the translated version.
+
+        Args:
+            render (Optional[bool]): Whether to write the translated DOCX and PDF now. When False,
+                they are written the first time the document's translated paths are used.
+                Defaults to the opposite of ``defer_rendering``.
+
+        Returns:
+            TranslationResult: Translated paragraphs with their offsets and pages.
+        """
+        result = self.translate()
+        self.document.translation = result
         self.document.set_paths_to_use(translated=True)
+        should_render = (not self.defer_rendering) if render is None else render
+        if should_render:
+            result.render()
+        return result
+
+    def _translate_incrementally(self, paragraphs: List[str]) -> TranslationResult:
+        """
+        Translates the paragraphs missing from the sidecar of the previous run.
+
+        The sidecar is updated with the new translations straight away, whether or not they are
+        rendered; the paragraph hashes and the files it records only change once the translated
+        files are written, since they are what tells a later run that those files are up to date.
+        Only the files the backend wrote are expected, so a DOCX-only backend is not asked to
+        render again on every run.
 
-    def check_language_and_translate_if_needed(self):
+        Args:
+            paragraphs (List[str]): Paragraph texts of the document.
+
+        Returns:
+            TranslationResult: Result recording the rendered paragraphs in the sidecar once rendered.
+        """
+        sidecar_path = self._sidecar_path()
+        previous_hashes, previous, previous_files = self._load_sidecar(sidecar_path)
+        hashes = [paragraph_hash(p) for p in paragraphs]
+
+        translations = {h: previous[h] for h in hashes if h in previous}
+        changed = {h: p for h, p in zip(hashes, paragraphs) if h not in translations}
+        translations.update(zip(changed, self.translate_texts(list(changed.values()))))
+
+        unchanged = (hashes == previous_hashes and bool(previous_files)
+                     and all((sidecar_path.parent / name).exists() for name in previous_files))
+
+        def write_sidecar(rendered_hashes: List[str], files: List[str]):
+            atomic_write_text(sidecar_path, json.dumps({
+                "version": SIDECAR_VERSION,
+                "target_language": self.target_language,
+                "api_version": API_VERSION,
+                "paragraphs": rendered_hashes,
+                "files": files,
+                "translations": translations,
+            }, ensure_ascii=False))
+
+        if changed or translations.keys() != previous.keys():
+            write_sidecar(previous_hashes, previous_files)
+        return TranslationResult(
+            self.document, [translations[h] for h in hashes], rendered=unchanged,
+            on_render=lambda written: write_sidecar(hashes, [Path(path).name for path in written]),
+        )
+
+    def _sidecar_path(self) -> Path:
+        """
+        Returns the path of the file recording the paragraph hashes and translations of the last run.
+        """
+        docx_path = Path(self.document.translated_docx_path)
+        return docx_path.with_name(docx_path.name + SIDECAR_SUFFIX)
+
+    def _load_sidecar(self, path: Path) -> tuple:
+        """
+        Reads a sidecar, ignoring it if it is missing, unreadable or was made for other settings.
+
+        Returns:
+            tuple: Paragraph hashes of the previous run, translations keyed by paragraph hash and
+                names of the translated files it rendered.
+        """
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return [], {}, []
+        if (not isinstance(data, dict) or data.get("version") != SIDECAR_VERSION
+                or data.get("target_language") != self.target_language
+                or data.get("api_version") != API_VERSION):
+            return [], {}, []
+        # Sidecars written before the rendered files were recorded expect both DOCX and PDF.
+        files = data.get("files", [self.document.translated_docx_path.name,
+                                   self.document.translated_pdf_path.name])
+        return data.get("paragraphs", []), data.get("translations", {}), files
+
+    def detect_language(self) -> str:
+        """
+        Detects the document language, offline when the local detector is confident enough.
+
+        Returns:
+            str: Detected language code.
+        """
+        if self.local_detection_threshold is not None:
+            sample = self.document.extract_text()[:LOCAL_DETECTION_SAMPLE_SIZE]
+            language, confidence = detect_language_locally(sample)
+            if language and confidence >= self.local_detection_threshold:
+                return language
+        return self.translate_text(action=TranslationAction.DETECT)
+
+    def check_language_and_translate_if_needed(self) -> Optional[TranslationResult]:
         """
         Detects the document language and translates it if it differs from the target language.
+
+        Returns:
+            Optional[TranslationResult]: The translation, or None if the document is already in
+                the target language.
         """
-        detected_language = self.translate_text(action=TranslationAction.DETECT)
+        detected_language = self.detect_language()
+        self.source_language = detected_language or None
         if detected_language != self.target_language:
-            self.translate_document()
+            self.result = self.translate_document()
         else:
+            self.result = None
             self.document.set_paths_to_use(translated=False)
+        return self.result
@@ -0,0 +1,207 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SQLITE_MAX_VARIABLES = 900
+
+# Bytes accounted to a segment: its key and its UTF-8 encoded translation.
+_SIZE = "length({key}) + length(CAST({translation} AS BLOB))"
+_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN "
+    "UPDATE totals SET value = value + new.size WHERE name = 'bytes'; END",
+    "CREATE TRIGGER IF NOT EXISTS segments_update AFTER UPDATE OF size ON segments BEGIN "
+    "UPDATE totals SET value = value + new.size - old.size WHERE name = 'bytes'; END",
+    "CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN "
+    "UPDATE totals SET value = value - old.size WHERE name = 'bytes'; END",
+]
+
+
+def normalize_segment(text: str) -> str:
+    """
+    Normalizes a segment so that texts differing only in Unicode form or whitespace share one entry.
+
+    Args:
+        text (str): Segment text.
+
+    Returns:
+        str: Normalized text.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationMemory:
+    """
+    Persistent segment cache for Azure Translator, stored in SQLite.
+
+    Entries are keyed by the hash of the normalized segment, the source and target languages and
+    the Translator API version. Triggers keep a running total of the bytes stored, updated in the
+    same transaction as the segments, and once it exceeds ``max_bytes`` the least recently used
+    entries are removed. The database can be shared by threads and worker processes.
+    """
+
+    def __init__(self, db_path: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Opens, or creates, the translation memory.
+
+        Args:
+            db_path (Union[str, Path]): Path to the SQLite database file.
+            max_bytes (int): Maximum size of the stored keys and translations, in bytes.
+        """
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used REAL NOT NULL, "
+                "size INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(segments)")}
+            if "size" not in columns:
+                # Databases written before sizes were tracked.
+                self._connection.execute("ALTER TABLE segments ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+                self._connection.execute(
+                    "UPDATE segments SET size = " + _SIZE.format(key="key", translation="translation")
+                )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "INSERT OR IGNORE INTO totals (name, value) SELECT 'bytes', COALESCE(SUM(size), 0) FROM segments"
+            )
+            for trigger in _TRIGGERS:
+                self._connection.execute(trigger)
+
+    @staticmethod
+    def key(text: str, source_language: str, target_language: str, api_version: str) -> str:
+        """
+        Computes the cache key of a segment.
+
+        Args:
+            text (str): Segment text.
+            source_language (str): Source language code, or ``"auto"`` when unknown.
+            target_language (str): Target language code.
+            api_version (str): Translator API version.
+
+        Returns:
+            str: Hexadecimal key.
+        """
+        material = "\x1f".join([normalize_segment(text), source_language, target_language, api_version])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: Iterable[str], source_language: str, target_language: str,
+                 api_version: str) -> Dict[str, str]:
+        """
+        Looks up translations of several segments.
+
+        Args:
+            texts (Iterable[str]): Segment texts.
+            source_language (str): Source language code, or ``"auto"`` when unknown.
+            target_language (str): Target language code.
+            api_version (str): Translator API version.
+
+        Returns:
+            Dict[str, str]: Translations of the segments found, keyed by segment text.
+        """
+        texts = list(dict.fromkeys(texts))
+        keys: Dict[str, List[str]] = {}
+        for text in texts:
+            keys.setdefault(self.key(text, source_language, target_language, api_version), []).append(text)
+
+        found: Dict[str, str] = {}
+        key_list = list(keys)
+        with self._lock, self._connection:
+            for i in range(0, len(key_list), _SQLITE_MAX_VARIABLES):
+                chunk = key_list[i:i + _SQLITE_MAX_VARIABLES]
+                rows = self._connection.execute(
+                    f"SELECT key, translation FROM segments WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, translation in rows:
+                    for text in keys[key]:
+                        found[text] = translation
+                now = time.time()
+                self._connection.executemany(
+                    "UPDATE segments SET last_used = ? WHERE key = ?", [(now, key) for key, _ in rows]
+                )
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, translations: List[Tuple[str, str]], source_language: str, target_language: str,
+                 api_version: str):
+        """
+        Stores translated segments, evicting the least recently used ones beyond ``max_bytes``.
+
+        Args:
+            translations (List[Tuple[str, str]]): Pairs of segment text and translation.
+            source_language (str): Source language code, or ``"auto"`` when unknown.
+            target_language (str): Target language code.
+            api_version (str): Translator API version.
+        """
+        now = time.time()
+        rows = [
+            (self.key(text, source_language, target_language, api_version), translation, now)
+            for text, translation in translations
+        ]
+        with self._lock, self._connection:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete does not fire triggers.
+            self._connection.executemany(
+                "INSERT INTO segments (key, translation, last_used, size) "
+                f"VALUES (?1, ?2, ?3, {_SIZE.format(key='?1', translation='?2')}) "
+                "ON CONFLICT (key) DO UPDATE SET translation = excluded.translation, "
+                "last_used = excluded.last_used, size = excluded.size",
+                rows,
+            )
+            excess = self._stored_bytes() - self.max_bytes
+            if excess > 0:
+                self._evict(excess)
+
+    def _stored_bytes(self) -> int:
+        """
+        Returns the running total of stored bytes.
+        """
+        (total,) = self._connection.execute("SELECT value FROM totals WHERE name = 'bytes'").fetchone()
+        return total
+
+    def _evict(self, excess: int):
+        """
+        Removes least recently used segments until at least ``excess`` bytes are freed.
+        """
+        keys = []
+        freed = 0
+        for key, size in self._connection.execute("SELECT key, size FROM segments ORDER BY last_used"):
+            keys.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._connection.executemany("DELETE FROM segments WHERE key = ?", keys)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns hit and miss counters of this instance and the number and size of stored segments.
+
+        Returns:
+            Dict[str, int]: ``hits``, ``misses``, ``entries`` and ``bytes``.
+        """
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM segments").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": self._stored_bytes()}
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from contract_analysis import ConversionCache, Document, ResultCache
+
+
+class TestConversionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache = ConversionCache(self.root / "cache", max_bytes=1024)
+
+        self.pdf_path = self.root / "contract.pdf"
+        self.pdf_path.write_bytes(b"%PDF-1.7 contract")
+        self.converted = self.root / "converted.docx"
+        self.converted.write_bytes(b"docx-bytes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get(self.pdf_path, "pdf-docx", self.root / "contract.docx"))
+        self.assertFalse((self.root / "contract.docx").exists())
+
+    def test_put_then_get(self):
+        self.cache.put(self.pdf_path, "pdf-docx", self.converted)
+        destination = self.root / "contract.docx"
+        self.assertEqual(self.cache.get(self.pdf_path, "pdf-docx", destination), destination)
+        self.assertEqual(destination.read_bytes(), b"docx-bytes")
+
+    def test_key_includes_direction_and_content(self):
+        self.cache.put(self.pdf_path, "pdf-docx", self.converted)
+        self.assertIsNone(self.cache.get(self.pdf_path, "docx-pdf", self.root / "out.docx"))
+
+        copy = self.root / "copy.pdf"
+        copy.write_bytes(self.pdf_path.read_bytes())
+        self.assertIsNotNone(self.cache.get(copy, "pdf-docx", self.root / "copy.docx"))
+
+        self.pdf_path.write_bytes(b"%PDF-1.7 amended contract")
+        self.assertIsNone(self.cache.get(self.pdf_path, "pdf-docx", self.root / "contract.docx"))
+
+    def test_lru_eviction(self):
+        sources = []
+        for i in range(3):
+            source = self.root / f"source{i}.pdf"
+            source.write_bytes(f"source {i}".encode())
+            output = self.root / f"output{i}.docx"
+            output.write_bytes(b"x" * 400)
+            sources.append(source)
+            self.cache.put(source, "pdf-docx", output)
+            # Make access order deterministic regardless of filesystem timestamp resolution.
+            for path in (self.root / "cache").glob("*/*"):
+                stat = path.stat()
+                os.utime(path, (stat.st_atime, stat.st_mtime - 10))
+
+        self.assertIsNone(self.cache.get(sources[0], "pdf-docx", self.root / "a.docx"))
+        self.assertIsNotNone(self.cache.get(sources[1], "pdf-docx", self.root / "b.docx"))
+        self.assertIsNotNone(self.cache.get(sources[2], "pdf-docx", self.root / "c.docx"))
+
+    def test_convert_pdf_to_docx_uses_cache(self):
+        self.cache.put(self.pdf_path, "pdf-docx", self.converted)
+        docx_path = Document.convert_pdf_to_docx(self.pdf_path, cache=self.cache)
+        self.assertEqual(docx_path, self.pdf_path.with_suffix(".docx"))
+        self.assertEqual(docx_path.read_bytes(), b"docx-bytes")
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(Path(self.tmp.name) / "results", ttl=60, max_bytes=4096)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        key = ResultCache.key("hash", "prebuilt-layout", "2023-07-31")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, {"pages": ["Page één"], "fields": {}})
+        self.assertEqual(self.cache.get(key), {"pages": ["Page één"], "fields": {}})
+        self.assertNotEqual(key, ResultCache.key("hash", "custom-model", "2023-07-31"))
+
+    def test_expired_entries_are_dropped(self):
+        key = ResultCache.key("hash")
+        self.cache.put(key, [1, 2])
+        with patch("contract_analysis.cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.cache.get(key))
+        self.assertIsNone(self.cache.get(key))
+
+    def test_size_eviction(self):
+        keys = [ResultCache.key(str(i)) for i in range(3)]
+        for key in keys:
+            self.cache.put(key, os.urandom(1200).hex())
+            for path in Path(self.tmp.name, "results").glob("*/*"):
+                stat = path.stat()
+                os.utime(path, (stat.st_atime, stat.st_mtime - 10))
+        self.assertIsNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_puts_within_budget_do_not_rescan(self):
+        from contract_analysis import cache as cache_module
+        with patch("contract_analysis.cache._evict_least_recently_used",
+                   wraps=cache_module._evict_least_recently_used) as evict:
+            for i in range(5):
+                self.cache.put(ResultCache.key(str(i)), i)
+            # Only the first put measures the directory.
+            self.assertEqual(evict.call_count, 1)
+
+            # Past the budget, the directory is measured and trimmed.
+            self.cache.put(ResultCache.key("large"), os.urandom(3000).hex())
+            self.cache.put(ResultCache.key("larger"), os.urandom(3000).hex())
+            self.assertEqual(evict.call_count, 2)
+            sizes = [path.stat().st_size for path in Path(self.tmp.name, "results").glob("*/*")]
+            self.assertLessEqual(sum(sizes), 4096)
+
+            with patch("contract_analysis.cache._RESCAN_INTERVAL", 3):
+                for i in range(3):
+                    self.cache.put(ResultCache.key(str(i)), i)
+            self.assertEqual(evict.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from contract_analysis import TextChunker
+from contract_analysis.chunking import approximate_token_count
+
+
+def count_words(text):
+    return len(text.split())
+
+
+class TestTextChunker(unittest.TestCase):
+    def setUp(self):
+        self.paragraphs = [f"Clause {i} binds the parties to these terms.\n" for i in range(10)]
+        self.text = "".join(self.paragraphs)
+
+    def test_short_text_is_one_chunk(self):
+        chunker = TextChunker(100, count_tokens=count_words)
+        self.assertEqual(chunker.split(self.text), [self.text])
+        self.assertEqual(chunker.split(""), [])
+
+    def test_chunks_respect_budget_and_paragraphs(self):
+        chunker = TextChunker(20, count_tokens=count_words)
+        chunks = chunker.split(self.text)
+        self.assertEqual(len(chunks), 5)
+        for chunk in chunks:
+            self.assertLessEqual(count_words(chunk), 20)
+            self.assertTrue(chunk.endswith("\n"))
+        self.assertEqual("".join(chunks), self.text)
+
+    def test_overlap_repeats_trailing_paragraphs(self):
+        chunker = TextChunker(24, overlap_tokens=8, count_tokens=count_words)
+        chunks = chunker.split(self.text)
+        self.assertEqual(len(chunks), 5)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertTrue(chunk.startswith(previous.splitlines(keepends=True)[-1]))
+            self.assertLessEqual(count_words(chunk), 24)
+        self.assertEqual(chunks[-1], "".join(self.paragraphs[8:]))
+
+    def test_long_paragraph_is_split_between_clauses(self):
+        paragraph = "The supplier shall deliver the goods; the customer shall pay the fees. Both parties agree.\n"
+        chunks = TextChunker(9, count_tokens=count_words).split(paragraph)
+        self.assertEqual(chunks, ["The supplier shall deliver the goods; ",
+                                  "the customer shall pay the fees. Both parties agree.\n"])
+
+    def test_overlong_clause_is_split_between_words(self):
+        chunks = TextChunker(4, count_tokens=count_words).split("one two three four five six seven eight nine")
+        self.assertEqual(chunks, ["one two three four ", "five six seven eight ", "nine"])
+
+    def test_invalid_budget(self):
+        with self.assertRaises(ValueError):
+            TextChunker(0)
+        with self.assertRaises(ValueError):
+            TextChunker(10, overlap_tokens=10)
+
+    def test_approximate_token_count(self):
+        self.assertEqual(approximate_token_count("Fees: EUR 12,500."), 7)
+        self.assertEqual(approximate_token_count(""), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,22 @@
 import platform  # ✅ Added for OS check
 
 # Import necessary modules for testing and mocking
+import os
+import tempfile
+import threading
+import tracemalloc
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
 import requests
-from contract_analysis import ContentUnderstanding
+from contract_analysis import ContentUnderstanding, HttpTransport
 
-# Load configuration from a YAML file
+# Load test settings; the real configuration/config.yaml is not under version control
 import yaml
+from pathlib import Path
 
 # Read configuration values from the YAML file
-with open("configuration/config.yaml", "r") as f:
+with open(Path(__file__).parent / "fixtures" / "config.yaml", "r") as f:
     config = yaml.safe_load(f)
 
 # Extract specific configuration parameters for the ContentUnderstanding class
@@ -20,9 +26,16 @@ content_understanding_subscription_key = config["content_understanding"]["subscr
 content_understanding_token_provider = config["content_understanding"]["token_provider"]
 content_understanding_analyzer_id = config["content_understanding"]["analyzer_id"]
 
-# ✅ This decorator ensures the test class runs only on Windows
-@unittest.skipUnless(platform.system() == "Windows", "This test suite runs only on Windows")
-class TestContentUnderstanding(unittest.TestCase):
+def poll_response(result, status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = result
+    response.raise_for_status.return_value = None
+    return response
+
+
+class ContentUnderstandingTestCase(unittest.TestCase):
 
     def setUp(self):
         self.endpoint = content_understanding_endpoint
@@ -42,6 +55,11 @@ class TestContentUnderstanding(unittest.TestCase):
         )
         self.cu.file_location = "contracts/document.pdf"
 
+
+# ✅ This decorator ensures the test class runs only on Windows
+@unittest.skipUnless(platform.system() == "Windows", "This test suite runs only on Windows")
+class TestContentUnderstanding(ContentUnderstandingTestCase):
+
     def test_get_headers_with_subscription_key(self):
         headers = self.cu._get_headers(self.subscription_key, None, self.x_ms_useragent)
         self.assertIn("Ocp-Apim-Subscription-Key", headers)
@@ -52,7 +70,7 @@ class TestContentUnderstanding(unittest.TestCase):
         self.assertIn("Authorization", headers)
         self.assertEqual(headers["Authorization"], "Bearer mock-token")
 
-    @patch("contract_analysis.content_understanding.requests.post")
+    @patch("contract_analysis.http_transport.HttpTransport.post")
     @patch("builtins.open", new_callable=unittest.mock.mock_open, read_data=b"file-content")
     def test_begin_analyze_with_file(self, mock_file, mock_post):
         mock_response = MagicMock()
@@ -64,7 +82,7 @@ class TestContentUnderstanding(unittest.TestCase):
         mock_post.assert_called()
         self.assertEqual(response, mock_response)
 
-    @patch("contract_analysis.content_understanding.requests.post")
+    @patch("contract_analysis.http_transport.HttpTransport.post")
     def test_begin_analyze_with_url(self, mock_post):
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
@@ -75,7 +93,7 @@ class TestContentUnderstanding(unittest.TestCase):
         mock_post.assert_called()
         self.assertEqual(response, mock_response)
 
-    @patch("contract_analysis.content_understanding.requests.get")
+    @patch("contract_analysis.http_transport.HttpTransport.get")
     def test_poll_result_succeeded(self, mock_get):
         mock_response = MagicMock()
         mock_response.headers = {"operation-location": "https://mock.operation/location"}
@@ -86,7 +104,7 @@ class TestContentUnderstanding(unittest.TestCase):
         result = self.cu.poll_result(mock_response, timeout_seconds=5, polling_interval_seconds=1)
         self.assertEqual(result, mock_result)
 
-    @patch("contract_analysis.content_understanding.requests.get")
+    @patch("contract_analysis.http_transport.HttpTransport.get")
     def test_poll_result_failed(self, mock_get):
         mock_response = MagicMock()
         mock_response.headers = {"operation-location": "https://mock.operation/location"}
@@ -103,6 +121,127 @@ class TestContentUnderstanding(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.cu.poll_result(mock_response)
 
+
+class TestPolling(ContentUnderstandingTestCase):
+    @patch("contract_analysis.content_understanding.time.sleep")
+    @patch("contract_analysis.http_transport.HttpTransport.get")
+    def test_poll_result_honors_retry_after(self, mock_get, mock_sleep):
+        mock_response = MagicMock()
+        mock_response.headers = {"operation-location": "https://mock.operation/location"}
+        running = poll_response({"status": "running"}, status_code=429, headers={"Retry-After": "7"})
+        done = poll_response({"status": "succeeded", "data": "mock-data"})
+        mock_get.side_effect = [running, done]
+
+        result = self.cu.poll_result(mock_response, timeout_seconds=60, polling_interval_seconds=1)
+        self.assertEqual(result["data"], "mock-data")
+        mock_sleep.assert_called_once_with(7.0)
+        running.json.assert_not_called()
+        done.json.assert_called_once()
+
+    @patch("contract_analysis.content_understanding.time.sleep")
+    @patch("contract_analysis.http_transport.HttpTransport.get")
+    def test_poll_result_waits_at_least_the_interval(self, mock_get, mock_sleep):
+        mock_response = MagicMock()
+        mock_response.headers = {"operation-location": "https://mock.operation/location"}
+        mock_get.side_effect = [
+            poll_response({"status": "running"}, headers={"Retry-After": "0"}),
+            poll_response({"status": "running"}, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+            poll_response({"status": "succeeded", "data": "mock-data"}),
+        ]
+
+        self.cu.poll_result(mock_response, timeout_seconds=60, polling_interval_seconds=2)
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [2, 2])
+
+    @patch("contract_analysis.content_understanding.time.sleep")
+    @patch("contract_analysis.http_transport.HttpTransport.get")
+    def test_poll_many_yields_results_as_they_complete(self, mock_get, mock_sleep):
+        polls = {
+            "https://mock.operation/a": [poll_response({"status": "running"}), poll_response({"status": "succeeded", "id": "a"})],
+            "https://mock.operation/b": [poll_response({"status": "succeeded", "id": "b"})],
+            "https://mock.operation/c": [poll_response({"status": "failed"})],
+        }
+        mock_get.side_effect = lambda url, headers: polls[url].pop(0)
+        first = MagicMock()
+        first.headers = {"operation-location": "https://mock.operation/a"}
+
+        results = list(self.cu.poll_many(
+            [first, "https://mock.operation/b", "https://mock.operation/c"],
+            timeout_seconds=60, polling_interval_seconds=1, return_exceptions=True,
+        ))
+        self.assertEqual([location for location, _ in results],
+                         ["https://mock.operation/b", "https://mock.operation/c", "https://mock.operation/a"])
+        self.assertEqual(results[0][1]["id"], "b")
+        self.assertIsInstance(results[1][1], RuntimeError)
+        self.assertEqual(results[2][1]["id"], "a")
+        self.assertEqual(mock_get.call_count, 4)
+
+    @patch("contract_analysis.http_transport.HttpTransport.get")
+    def test_poll_many_raises_failures_by_default(self, mock_get):
+        mock_get.return_value = poll_response({"status": "failed"})
+        with self.assertRaises(RuntimeError):
+            list(self.cu.poll_many(["https://mock.operation/a"]))
+
+
+class _DiscardingHandler(BaseHTTPRequestHandler):
+    """
+    Accepts an analyze request, reading and discarding its body in small chunks.
+    """
+
+    def do_POST(self):
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+        self.server.received_length = int(self.headers["Content-Length"])
+        self.send_response(202)
+        self.send_header("operation-location", "http://127.0.0.1/operation")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestStreamingUpload(unittest.TestCase):
+    # A scanned contract of a few hundred MB; the file is sparse, so it costs no disk space.
+    FILE_SIZE = 256 * 1024 * 1024
+    MEMORY_BUDGET = 16 * 1024 * 1024
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _DiscardingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "scanned.pdf")
+        with open(self.path, "wb") as f:
+            f.truncate(self.FILE_SIZE)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_begin_analyze_streams_file(self):
+        with HttpTransport() as transport:
+            cu = ContentUnderstanding(
+                endpoint=f"http://127.0.0.1:{self.server.server_address[1]}",
+                api_version="2024-12-01-preview",
+                subscription_key="key",
+                analyzer_id="analyzer",
+                transport=transport,
+            )
+            cu.file_location = self.path
+
+            tracemalloc.start()
+            try:
+                response = cu.begin_analyze()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.server.received_length, self.FILE_SIZE)
+        self.assertLess(peak, self.MEMORY_BUDGET)
+
+
 # Run the test suite
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,12 +1,12 @@
 import platform  # ✅ Added for OS check
-import sys
+import tempfile
 # Import necessary modules for testing and mocking
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 # Import the ContractAnalysis class to be tested
-if sys.platform == "win32":
-    from contract_analysis import ContractAnalysis
+from contract_analysis import ContractAnalysis
 
 # ✅ This decorator ensures the test class runs only on Windows
 @unittest.skipUnless(platform.system() == "Windows", "This test suite runs only on Windows")
@@ -23,12 +23,14 @@ class TestContractAnalysis(unittest.TestCase):
         self.mock_gpt = MagicMock()
 
         self.patcher_doc = patch('contract_analysis.contract_analysis.Document.from_file', return_value=self.mock_document)
+        self.patcher_check = patch('contract_analysis.contract_analysis.Document.check_file', return_value=Path("test.docx"))
         self.patcher_translation = patch('contract_analysis.contract_analysis.Translation', return_value=self.mock_translation)
         self.patcher_di = patch('contract_analysis.contract_analysis.DocumentIntelligence', return_value=self.mock_document_intelligence)
         self.patcher_cu = patch('contract_analysis.contract_analysis.ContentUnderstanding', return_value=self.mock_content_understanding)
         self.patcher_gpt = patch('contract_analysis.contract_analysis.OpenAIGPT', return_value=self.mock_gpt)
 
         self.patcher_doc.start()
+        self.patcher_check.start()
         self.patcher_translation.start()
         self.patcher_di.start()
         self.patcher_cu.start()
@@ -53,13 +55,13 @@ class TestContractAnalysis(unittest.TestCase):
 
     def tearDown(self):
         self.patcher_doc.stop()
+        self.patcher_check.stop()
         self.patcher_translation.stop()
         self.patcher_di.stop()
         self.patcher_cu.stop()
         self.patcher_gpt.stop()
 
     def test_document_initialization(self):
-        self.mock_document.ensure_pdf_exists.assert_called_once()
         self.assertEqual(self.analysis.document, self.mock_document)
 
     def test_translation_initialization(self):
@@ -83,6 +85,7 @@ class TestContractAnalysis(unittest.TestCase):
             model="gpt-mock-model"
         )
         self.assertEqual(self.analysis.gpt_credential, new_credential)
+        self.assertEqual(self.analysis.gpt, self.mock_gpt)
 
     def test_document_layout_pages_property(self):
         self.mock_document_intelligence.document_layout_pages = ["page1", "page2"]
@@ -96,6 +99,73 @@ class TestContractAnalysis(unittest.TestCase):
         self.mock_document_intelligence.field_confidence_dict = {"field1": 0.95}
         self.assertEqual(self.analysis.field_confidence_dict, {"field1": 0.95})
 
+    def test_field_pages_dict_property(self):
+        self.mock_document_intelligence.field_pages_dict = {"field1": [2]}
+        self.assertEqual(self.analysis.field_pages_dict, {"field1": [2]})
+
+
+class TestContractAnalysisInput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docx_path = Path(self.tmp.name) / "contract.docx"
+        self.docx_path.touch()
+        self.settings = dict(
+            target_language="en",
+            translator_endpoint="https://translator.example.com",
+            translator_region="westeurope",
+            di_endpoint="https://di.example.com",
+            di_model_id="prebuilt-layout",
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_missing_document_fails_at_construction(self):
+        with self.assertRaises(FileNotFoundError):
+            ContractAnalysis(document_path=str(Path(self.tmp.name) / "missing.docx"), **self.settings)
+
+    def test_unsupported_document_fails_at_construction(self):
+        text_path = Path(self.tmp.name) / "contract.txt"
+        text_path.touch()
+        with self.assertRaises(ValueError):
+            ContractAnalysis(document_path=str(text_path), **self.settings)
+
+    @patch("contract_analysis.contract_analysis.DocumentIntelligence")
+    @patch("contract_analysis.contract_analysis.Document.from_file")
+    def test_document_intelligence_analyzes_original_pdf_after_translation(self, mock_from_file, mock_di):
+        document = mock_from_file.return_value
+        document.original_pdf_path = Path(self.tmp.name) / "contract.pdf"
+        type(document).pdf_path_to_use = property(lambda _: self.fail("rendered the deferred translation"))
+        analysis = ContractAnalysis(document_path=str(self.docx_path), **self.settings)
+        self.assertIs(analysis.document_intelligence, mock_di.return_value)
+        self.assertEqual(mock_di.call_args.kwargs["document_pdf_path"], str(document.original_pdf_path))
+
+    @patch("contract_analysis.contract_analysis.DocumentIntelligence")
+    @patch("contract_analysis.contract_analysis.Document.from_file")
+    def test_components_are_built_on_first_use(self, mock_from_file, mock_di):
+        document = mock_from_file.return_value
+        analysis = ContractAnalysis(document_path=str(self.docx_path), **self.settings)
+        mock_from_file.assert_not_called()
+        self.assertIsNone(analysis._document_intelligence)
+        self.assertIs(analysis.document_intelligence, mock_di.return_value)
+        self.assertIs(analysis.document_intelligence, mock_di.return_value)
+        mock_di.assert_called_once()
+        document.ensure_pdf_exists.assert_called_once()
+
+    @patch("contract_analysis.contract_analysis.OpenAIGPT")
+    @patch("contract_analysis.contract_analysis.DocumentIntelligence")
+    @patch("contract_analysis.contract_analysis.Document.from_file")
+    @patch("contract_analysis.contract_analysis.FieldVerifier")
+    def test_verify_fields(self, mock_verifier, mock_from_file, mock_di, mock_gpt):
+        mock_verifier.return_value.verify.return_value = {"field1": "check"}
+        analysis = ContractAnalysis(document_path=str(self.docx_path), gpt_api_version="v1.0",
+                                    gpt_endpoint="https://gpt.example.com", gpt_model="gpt-mock-model",
+                                    **self.settings)
+        self.assertEqual(analysis.verify_fields(threshold=0.5), {"field1": "check"})
+        mock_verifier.assert_called_once_with(mock_gpt.return_value, threshold=0.5)
+        mock_verifier.return_value.verify.assert_called_once_with(mock_di.return_value)
+
+
 # Run the test suite
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import asyncio
+import gc
+import time
+import unittest
+import weakref
+from unittest.mock import MagicMock
+
+from azure.core.credentials import AccessToken
+
+from contract_analysis.credentials import (
+    COGNITIVE_SERVICES_SCOPE, AsyncCredentialAdapter, TokenBroker, get_token_broker,
+)
+
+
+class TestTokenBroker(unittest.TestCase):
+    def setUp(self):
+        self.credential = MagicMock()
+        self.issued = 0
+
+        def get_token(*scopes, **kwargs):
+            self.issued += 1
+            return AccessToken(f"token-{self.issued}", int(time.time()) + self.lifetime)
+
+        self.lifetime = 3600
+        self.credential.get_token.side_effect = get_token
+        self.broker = TokenBroker(self.credential, refresh_margin=300)
+
+    def tearDown(self):
+        self.broker.close()
+
+    def test_caches_token_per_scope(self):
+        self.assertEqual(self.broker.get_token(COGNITIVE_SERVICES_SCOPE).token, "token-1")
+        self.assertEqual(self.broker.get_token(COGNITIVE_SERVICES_SCOPE).token, "token-1")
+        self.assertEqual(self.broker.get_token("https://other/.default").token, "token-2")
+        self.assertEqual(self.credential.get_token.call_count, 2)
+
+    def test_refreshes_in_background_before_expiry(self):
+        self.lifetime = 300.2
+        self.assertEqual(self.broker.get_token(COGNITIVE_SERVICES_SCOPE).token, "token-1")
+        self.assertEqual(self.broker.get_token(COGNITIVE_SERVICES_SCOPE).token, "token-1")
+        self.lifetime = 3600
+        deadline = time.time() + 5
+        while self.issued < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.broker.get_token(COGNITIVE_SERVICES_SCOPE).token, "token-2")
+        self.assertEqual(self.credential.get_token.call_count, 2)
+
+    def test_idle_scope_is_not_refreshed_in_background(self):
+        self.lifetime = 300.1
+        self.broker.get_token(COGNITIVE_SERVICES_SCOPE)
+        time.sleep(0.3)
+        self.assertEqual(self.issued, 1)
+        self.assertEqual(self.broker._timers, {})
+
+    def test_released_broker_stops_refreshing(self):
+        credential = MagicMock()
+        credential.get_token.return_value = AccessToken("token", int(time.time()) + 3600)
+        broker = get_token_broker(credential)
+        broker.get_token(COGNITIVE_SERVICES_SCOPE)
+        timer = next(iter(broker._timers.values()))
+        broker_ref = weakref.ref(broker)
+        del broker
+        gc.collect()
+        self.assertIsNone(broker_ref())
+        self.assertTrue(timer.finished.is_set())
+
+    def test_expired_token_is_refreshed_synchronously(self):
+        self.lifetime = 10
+        self.broker.close()
+        self.broker.get_token(COGNITIVE_SERVICES_SCOPE)
+        self.assertEqual(self.broker.get_token(COGNITIVE_SERVICES_SCOPE).token, "token-2")
+
+    def test_claims_bypass_cache(self):
+        self.broker.get_token(COGNITIVE_SERVICES_SCOPE)
+        self.broker.get_token(COGNITIVE_SERVICES_SCOPE, claims="{}")
+        self.assertEqual(self.credential.get_token.call_count, 2)
+
+    def test_bearer_token_provider(self):
+        provider = self.broker.bearer_token_provider()
+        self.assertEqual(provider(), "token-1")
+
+    def test_get_token_broker_is_shared(self):
+        self.assertIs(get_token_broker(self.credential), get_token_broker(self.credential))
+        self.assertIs(get_token_broker(self.broker), self.broker)
+        self.assertIs(get_token_broker(), get_token_broker())
+
+    def test_async_adapter_uses_broker(self):
+        adapter = AsyncCredentialAdapter(self.broker)
+        self.assertIs(adapter.broker, self.broker)
+
+        async def fetch():
+            return [(await adapter.get_token(COGNITIVE_SERVICES_SCOPE)).token for _ in range(2)]
+
+        self.assertEqual(asyncio.run(fetch()), ["token-1", "token-1"])
+        self.assertEqual(self.credential.get_token.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
@@ -66,5 +68,57 @@ class TestDocument(unittest.TestCase):
         mock_doc.Close.assert_called()
         mock_word.Quit.assert_called()
 
+class TestDocumentParsing(unittest.TestCase):
+    def setUp(self):
+        from contract_analysis import Document
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docx_path = Path(self.tmp.name) / "sample.docx"
+        self.docx_path.write_bytes(b"docx")
+        self.backend = MagicMock()
+        self.backend.get_paragraph_texts.return_value = ["Title", "", "Clause 1"]
+        self.doc = Document(self.docx_path, backend=self.backend)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_once(self):
+        self.assertEqual(self.doc.extract_text(), "Title\r\rClause 1")
+        self.assertEqual(self.doc.get_paragraph_texts(), ["Title", "", "Clause 1"])
+        self.doc.extract_text()
+        self.backend.get_paragraph_texts.assert_called_once_with(self.docx_path)
+
+    def test_offsets(self):
+        parsed = self.doc.parse()
+        self.assertEqual(parsed.offsets, [0, 6, 7])
+        self.assertEqual(parsed.text[parsed.offsets[2]:], "Clause 1")
+        self.assertEqual(parsed.paragraph_index(9), 2)
+
+    def test_reparse_when_file_changes(self):
+        self.doc.parse()
+        self.docx_path.write_bytes(b"edited docx")
+        stat = self.docx_path.stat()
+        os.utime(self.docx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.backend.get_paragraph_texts.return_value = ["Title"]
+        self.assertEqual(self.doc.get_paragraph_texts(), ["Title"])
+        self.assertEqual(self.backend.get_paragraph_texts.call_count, 2)
+
+    def test_translation_result_renders_on_first_use(self):
+        from contract_analysis import TranslationResult
+        self.backend.get_paragraph_pages.return_value = [1, 1, 2]
+        result = TranslationResult(self.doc, ["Titre", "", "Clause 1"])
+        self.doc.translation = result
+        self.doc.set_paths_to_use(translated=True)
+        self.assertEqual(result.page_of_offset(result.offsets[2]), 2)
+        self.assertEqual(result.text_of_page(1), "Titre\r")
+        self.backend.save_translated.assert_not_called()
+
+        self.assertEqual(self.doc.pdf_path_to_use, self.doc.translated_pdf_path)
+        self.assertEqual(self.doc.docx_path_to_use, self.doc.translated_docx_path)
+        self.backend.save_translated.assert_called_once_with(
+            self.docx_path, ["Titre", "", "Clause 1"], self.doc.translated_docx_path, self.doc.translated_pdf_path
+        )
+        self.assertTrue(result.rendered)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
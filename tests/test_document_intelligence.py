@@ -1,5 +1,12 @@
 import platform  # ✅ Added for OS check
+import asyncio
+import builtins
+import datetime
+import tempfile
+import threading
+import time
 import unittest
+from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
 from azure.core.credentials import AzureKeyCredential
 import sys
@@ -13,8 +20,8 @@ class TestDocumentIntelligence(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        # Load configuration from YAML only once for all tests
-        with open("configuration/config.yaml", "r") as f:
+        # Load test settings only once for all tests; the real configuration/config.yaml is not versioned
+        with open(Path(__file__).parent / "fixtures" / "config.yaml", "r") as f:
             config = yaml.safe_load(f)
 
         cls.document_intelligence_endpoint = config["document_intelligence"]["endpoint"]
@@ -60,7 +67,7 @@ class TestDocumentIntelligence(unittest.TestCase):
         self.di.document_analysis_client = mock_client
 
         self.di.analyse_document_layout()
-        mock_client.begin_analyze_document.assert_called_with(self.prebuilt_layout_model_id, b"pdf-content")
+        mock_client.begin_analyze_document.assert_called_with(self.prebuilt_layout_model_id, mock_file.return_value)
         self.assertEqual(self.di.document_layout_pages, ["Line 1"])
 
     @patch("builtins.open", new_callable=mock_open, read_data=b"pdf-content")
@@ -81,9 +88,297 @@ class TestDocumentIntelligence(unittest.TestCase):
         self.di.document_analysis_client = mock_client
 
         self.di.extract_document_fields()
-        mock_client.begin_analyze_document.assert_called_with(self.mock_model_id, b"pdf-content")
+        mock_client.begin_analyze_document.assert_called_with(self.mock_model_id, mock_file.return_value)
         self.assertEqual(self.di.field_dict["Field1"], "Value1")
         self.assertEqual(self.di.field_confidence_dict["Field1"], 0.95)
 
+
+class TestCombinedAnalysis(unittest.TestCase):
+    def setUp(self):
+        from contract_analysis import DocumentIntelligence
+        self.di = DocumentIntelligence(
+            credential=MagicMock(),
+            di_endpoint="https://di.example.com",
+            di_model_id="custom-model",
+            document_pdf_path="contract.pdf",
+        )
+        self.di.init_field_dict(["Field1"])
+        self.di.document_analysis_client = MagicMock()
+
+        line = MagicMock(content="Line 1")
+        field = MagicMock(value="Value1", content="Content1", confidence=0.9)
+        self.result = MagicMock(pages=[MagicMock(lines=[line])], documents=[MagicMock(fields={"Field1": field})])
+        self.di.document_analysis_client.begin_analyze_document.return_value.result.return_value = self.result
+
+    @patch("builtins.open", new_callable=mock_open, read_data=b"pdf-content")
+    def test_single_pass(self, mock_file):
+        self.di.analyse_document()
+        self.di.document_analysis_client.begin_analyze_document.assert_called_once_with("custom-model", mock_file.return_value)
+        self.assertEqual(self.di.document_layout_pages, ["Line 1"])
+        self.assertEqual(self.di.field_dict, {"Field1": "Value1"})
+        self.assertEqual(self.di.field_confidence_dict, {"Field1": 0.9})
+
+    @patch("builtins.open", new_callable=mock_open, read_data=b"pdf-content")
+    def test_two_pass(self, mock_file):
+        self.di.analyse_document(single_pass=False)
+        models = [c.args[0] for c in self.di.document_analysis_client.begin_analyze_document.call_args_list]
+        self.assertEqual(models, ["prebuilt-layout", "custom-model"])
+        self.assertEqual(self.di.document_layout_pages, ["Line 1"])
+
+    @patch("builtins.open", new_callable=mock_open, read_data=b"pdf-content")
+    def test_falls_back_to_layout_model_without_pages(self, mock_file):
+        layout = MagicMock(pages=self.result.pages)
+        self.result.pages = []
+        self.di.document_analysis_client.begin_analyze_document.return_value.result.side_effect = [self.result, layout]
+        self.di.analyse_document()
+        self.assertEqual(self.di.document_analysis_client.begin_analyze_document.call_count, 2)
+        self.assertEqual(self.di.document_layout_pages, ["Line 1"])
+
+
+def write_pdf(path: Path, page_count: int):
+    kids = b" ".join(b"%d 0 R" % (i + 3) for i in range(page_count))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)]
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"] * page_count
+    data = b"%PDF-1.7\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj %s endobj\n" % (number, body)
+    xref = b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    xref += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    trailer = b"trailer << /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF" % (len(objects) + 1, len(data))
+    path.write_bytes(data + xref + trailer)
+
+
+class TestShardedLayout(unittest.TestCase):
+    def setUp(self):
+        from contract_analysis import DocumentIntelligence
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = Path(self.tmp.name) / "contract.pdf"
+        write_pdf(self.pdf_path, 7)
+        self.di = DocumentIntelligence(
+            credential=MagicMock(),
+            di_endpoint="https://di.example.com",
+            di_model_id="custom-model",
+            document_pdf_path=str(self.pdf_path),
+            shard_pages=3,
+        )
+
+        def begin_analyze_document(model_id, document, pages=None):
+            first, last = (int(n) for n in pages.split("-"))
+            self.assertEqual(document.read(8), b"%PDF-1.7")
+            # Later shards finish first; the merge must still follow page order.
+            time.sleep(0.01 * (7 - first))
+            lines = [[MagicMock(content=f"Page {n}")] for n in range(first, last + 1)]
+            result = MagicMock(pages=[MagicMock(lines=page) for page in lines], documents=[])
+            return MagicMock(result=MagicMock(return_value=result))
+
+        self.di.document_analysis_client = MagicMock()
+        self.di.document_analysis_client.begin_analyze_document.side_effect = begin_analyze_document
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pdf_page_count(self):
+        from contract_analysis.document_intelligence import pdf_page_count, page_ranges
+        self.assertEqual(pdf_page_count(str(self.pdf_path)), 7)
+        self.assertEqual(page_ranges(7, 3), ["1-3", "4-6", "7-7"])
+
+    def test_scan_pdf_page_count_ignores_outlines_and_redefined_objects(self):
+        from contract_analysis.document_intelligence import scan_pdf_page_count
+        self.assertEqual(scan_pdf_page_count(str(self.pdf_path)), 7)
+        self.append(b"20 0 obj << /Type /Outlines /First 21 0 R /Count 40 >> endobj",
+                    b"2 0 obj << /Type /Pages /Kids [3 0 R] /Count 7 >> endobj",
+                    b"3 0 obj << /Type /Page /Parent 2 0 R /Annots [] >> endobj")
+        self.assertEqual(scan_pdf_page_count(str(self.pdf_path)), 7)
+
+    def test_scan_pdf_page_count_across_chunks(self):
+        from contract_analysis.document_intelligence import scan_pdf_page_count
+        with patch("contract_analysis.document_intelligence._SCAN_CHUNK_SIZE", 5), \
+                patch("contract_analysis.document_intelligence._OBJECT_WINDOW", 80):
+            self.assertEqual(scan_pdf_page_count(str(self.pdf_path)), 7)
+
+    def test_scan_pdf_page_count_is_ambiguous(self):
+        from contract_analysis.document_intelligence import scan_pdf_page_count
+        # A page tree left behind by an incremental update.
+        self.append(b"30 0 obj << /Type /Pages /Kids [] /Count 9 >> endobj")
+        self.assertIsNone(scan_pdf_page_count(str(self.pdf_path)))
+        # A linearization dictionary that disagrees with the page tree.
+        write_pdf(self.pdf_path, 7)
+        self.pdf_path.write_bytes(self.pdf_path.read_bytes().replace(
+            b"%PDF-1.7\n", b"%PDF-1.7\n40 0 obj << /Linearized 1 /L 900 /N 6 >> endobj\n"))
+        self.assertIsNone(scan_pdf_page_count(str(self.pdf_path)))
+        # A page tree in compressed object streams.
+        self.pdf_path.write_bytes(b"%PDF-1.7\n1 0 obj << /Type /ObjStm /N 9 /First 40 >> stream\nx\nendstream endobj")
+        self.assertIsNone(scan_pdf_page_count(str(self.pdf_path)))
+
+    @patch("contract_analysis.document_intelligence.pdf_page_count", return_value=None)
+    def test_unknown_page_count_is_not_sharded(self, mock_page_count):
+        self.di.document_analysis_client.begin_analyze_document.side_effect = None
+        self.di.document_analysis_client.begin_analyze_document.return_value.result.return_value = MagicMock(
+            pages=[MagicMock(lines=[MagicMock(content="All")])], documents=[])
+        with self.assertLogs("contract_analysis.document_intelligence", level="WARNING") as logs:
+            self.di.analyse_document_layout()
+        self.assertIn("single operation", logs.output[0])
+        self.di.document_analysis_client.begin_analyze_document.assert_called_once()
+        self.assertNotIn("pages", self.di.document_analysis_client.begin_analyze_document.call_args.kwargs)
+
+    def append(self, *objects: bytes):
+        """
+        Appends objects to the PDF as an incremental update.
+        """
+        self.pdf_path.write_bytes(self.pdf_path.read_bytes() + b"\n" + b"\n".join(objects) + b"\n%%EOF")
+
+    def test_shards_are_merged_in_page_order(self):
+        self.di.analyse_document_layout()
+        self.assertEqual(self.di.document_layout_pages, [f"Page {n}" for n in range(1, 8)])
+        pages = sorted(c.kwargs["pages"] for c in self.di.document_analysis_client.begin_analyze_document.call_args_list)
+        self.assertEqual(pages, ["1-3", "4-6", "7-7"])
+
+    def test_short_document_is_not_sharded(self):
+        self.di.shard_pages = 10
+        self.di.document_analysis_client.begin_analyze_document.side_effect = None
+        self.di.document_analysis_client.begin_analyze_document.return_value.result.return_value = MagicMock(
+            pages=[MagicMock(lines=[MagicMock(content="All")])], documents=[])
+        self.di.analyse_document_layout()
+        self.assertNotIn("pages", self.di.document_analysis_client.begin_analyze_document.call_args.kwargs)
+
+
+class TestResultCaching(unittest.TestCase):
+    def setUp(self):
+        from azure.ai.formrecognizer import BoundingRegion, DocumentField
+        from contract_analysis import DocumentIntelligence, ResultCache
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = Path(self.tmp.name) / "contract.pdf"
+        self.pdf_path.write_bytes(b"%PDF-1.7 contract")
+        self.cache = ResultCache(Path(self.tmp.name) / "results")
+
+        date_field = DocumentField(value_type="date", value=datetime.date(2024, 5, 1), content="1 May 2024",
+                                   bounding_regions=[BoundingRegion(page_number=2, polygon=[])], spans=[],
+                                   confidence=0.8)
+        self.result = MagicMock(pages=[MagicMock(lines=[MagicMock(content="Line 1")])],
+                                documents=[MagicMock(fields={"StartDate": date_field})])
+        self.make_di = lambda: DocumentIntelligence(
+            credential=MagicMock(),
+            di_endpoint="https://di.example.com",
+            di_model_id="custom-model",
+            document_pdf_path=str(self.pdf_path),
+            result_cache=self.cache,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def analyse(self):
+        di = self.make_di()
+        di.document_analysis_client = MagicMock()
+        di.document_analysis_client.begin_analyze_document.return_value.result.return_value = self.result
+        di.analyse_document()
+        return di
+
+    def test_unchanged_pdf_is_served_from_cache(self):
+        first = self.analyse()
+        second = self.analyse()
+        first.document_analysis_client.begin_analyze_document.assert_called_once()
+        second.document_analysis_client.begin_analyze_document.assert_not_called()
+        self.assertEqual(second.document_layout_pages, ["Line 1"])
+        self.assertEqual(second.layout_index.page_text(1), "Line 1")
+        self.assertEqual(second.field_dict, {"StartDate": datetime.date(2024, 5, 1)})
+        self.assertEqual(second.field_confidence_dict, {"StartDate": 0.8})
+
+    def test_changed_pdf_is_analyzed_again(self):
+        self.analyse()
+        self.pdf_path.write_bytes(b"%PDF-1.7 amended contract")
+        self.analyse().document_analysis_client.begin_analyze_document.assert_called_once()
+
+
+class TestAsyncDocumentIntelligence(unittest.TestCase):
+    def make_client(self, delay=0.1):
+        line = MagicMock(content="Line 1")
+        field = MagicMock(value="Value1", content="Content1", confidence=0.9)
+        client = MagicMock()
+        client.close = MagicMock(side_effect=lambda: asyncio.sleep(0))
+
+        async def begin_analyze_document(model_id, document):
+            async def result():
+                await asyncio.sleep(delay)
+                return MagicMock(pages=[MagicMock(lines=[line])], documents=[MagicMock(fields={"Field1": field})])
+            return MagicMock(result=result)
+
+        client.begin_analyze_document = MagicMock(side_effect=begin_analyze_document)
+        return client
+
+    def make_di(self):
+        from contract_analysis import AsyncDocumentIntelligence
+        di = AsyncDocumentIntelligence(
+            credential=MagicMock(),
+            di_endpoint="https://di.example.com",
+            di_model_id="custom-model",
+            document_pdf_path="contract.pdf",
+        )
+        di.init_field_dict(["Field1"])
+        return di
+
+    @patch("builtins.open", new_callable=mock_open, read_data=b"pdf-content")
+    def test_two_pass_operations_overlap(self, mock_file):
+        di = self.make_di()
+        di.document_analysis_client = self.make_client()
+        start = time.monotonic()
+        asyncio.run(di.analyse_document(single_pass=False))
+        self.assertLess(time.monotonic() - start, 0.18)
+        self.assertEqual(di.document_layout_pages, ["Line 1"])
+        self.assertEqual(di.field_dict, {"Field1": "Value1"})
+
+    @patch("builtins.open", new_callable=mock_open, read_data=b"pdf-content")
+    def test_analyse_documents_overlaps_documents(self, mock_file):
+        from contract_analysis.document_intelligence import analyse_documents
+        instances = [self.make_di() for _ in range(5)]
+        clients = [self.make_client() for _ in instances]
+        for di, client in zip(instances, clients):
+            di.document_analysis_client = client
+        start = time.monotonic()
+        asyncio.run(analyse_documents(instances))
+        self.assertLess(time.monotonic() - start, 0.4)
+        for di, client in zip(instances, clients):
+            client.begin_analyze_document.assert_called_once_with("custom-model", b"pdf-content")
+            self.assertEqual(di.field_confidence_dict, {"Field1": 0.9})
+
+    def test_files_are_read_off_the_event_loop(self):
+        from contract_analysis import ResultCache
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = Path(tmp) / "contract.pdf"
+            write_pdf(pdf_path, 7)
+            di = self.make_di()
+            di.document_pdf_path_to_use = str(pdf_path)
+            di.result_cache = ResultCache(Path(tmp) / "results")
+            di.shard_pages = 3
+            di.document_analysis_client = MagicMock()
+
+            async def begin_analyze_document(model_id, document, pages=None):
+                self.assertTrue(document.startswith(b"%PDF-1.7"))
+                return MagicMock(result=lambda: asyncio.sleep(0, MagicMock(pages=[], documents=[])))
+
+            di.document_analysis_client.begin_analyze_document = begin_analyze_document
+            loop_thread = threading.get_ident()
+            threads = set()
+            read = builtins.open
+
+            def tracking_open(*args, **kwargs):
+                threads.add(threading.get_ident())
+                return read(*args, **kwargs)
+
+            with patch("builtins.open", side_effect=tracking_open):
+                asyncio.run(di.analyse_document_layout())
+            self.assertTrue(threads)
+            self.assertNotIn(loop_thread, threads)
+
+    @patch("contract_analysis.document_intelligence.AsyncDocumentAnalysisClient")
+    def test_sync_credential_is_adapted(self, mock_client):
+        from contract_analysis.credentials import AsyncCredentialAdapter
+        di = self.make_di()
+        di.init_document_analysis_client()
+        self.assertIsInstance(mock_client.call_args.kwargs["credential"], AsyncCredentialAdapter)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from contract_analysis.docx_backend import OpenXmlBackend
+from contract_analysis import Document
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+            xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+            xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml"
+            mc:Ignorable="w14">
+  <w:body>
+    <w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>
+      <w:r><w:rPr><w:b/></w:rPr><w:t>Article</w:t></w:r><w:r><w:tab/><w:t xml:space="preserve"> 1</w:t></w:r></w:p>
+    <w:p/>
+    <w:tbl><w:tr>
+      <w:tc><w:p><w:r><w:t>Cell A</w:t></w:r></w:p></w:tc>
+      <w:tc><w:p><w:r><w:t>Cell B</w:t></w:r></w:p></w:tc>
+    </w:tr></w:tbl>
+    <w:p><w:r><w:t>Line one</w:t><w:br/><w:t>Line two</w:t></w:r>
+      <w:r><w:txbxContent><w:p><w:r><w:t>Text box</w:t></w:r></w:p></w:txbxContent></w:r></w:p>
+    <w:sectPr/>
+  </w:body>
+</w:document>"""
+
+
+def write_docx(path: Path, document_xml: str = DOCUMENT_XML):
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("[Content_Types].xml", "<Types/>")
+        package.writestr("word/document.xml", document_xml)
+
+
+class TestOpenXmlBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docx_path = Path(self.tmp.name) / "sample.docx"
+        write_docx(self.docx_path)
+        self.backend = OpenXmlBackend()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_paragraph_texts(self):
+        paragraphs = self.backend.get_paragraph_texts(self.docx_path)
+        self.assertEqual(
+            paragraphs,
+            ["Article\t 1", "", "Cell A", "Cell B", "", "Line one\x0bLine two"],
+        )
+
+    def test_get_paragraph_pages(self):
+        write_docx(self.docx_path, """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>
+  <w:p><w:r><w:t>Page one</w:t></w:r></w:p>
+  <w:p><w:r><w:t>Still one</w:t><w:br w:type="page"/></w:r><w:r><w:lastRenderedPageBreak/><w:t>two</w:t></w:r></w:p>
+  <w:p><w:r><w:lastRenderedPageBreak/><w:t>Page three</w:t></w:r></w:p>
+  <w:p/>
+</w:body></w:document>""")
+        self.assertEqual(self.backend.get_paragraph_pages(self.docx_path), [1, 1, 3, 3])
+        self.assertEqual(self.backend.get_paragraph_texts(self.docx_path)[1], "Still one\x0ctwo")
+
+    def test_extract_text(self):
+        text = self.backend.extract_text(self.docx_path)
+        self.assertTrue(text.startswith("Article\t 1\r\rCell A\rCell B"))
+        self.assertNotIn("Text box", text)
+
+    def test_save_translated(self):
+        translated_docx = Path(self.tmp.name) / "sample_translated.docx"
+        translated_pdf = Path(self.tmp.name) / "sample_translated.pdf"
+        written = self.backend.save_translated(
+            self.docx_path,
+            ["Artikel 1", "", "Zelle A", "Zelle B", "", "Zeile"],
+            translated_docx,
+            translated_pdf,
+        )
+
+        self.assertEqual(written, [translated_docx])
+        self.assertEqual(
+            self.backend.get_paragraph_texts(translated_docx),
+            ["Artikel 1", "", "Zelle A", "Zelle B", "", "Zeile"],
+        )
+        self.assertFalse(translated_pdf.exists())
+        with zipfile.ZipFile(translated_docx) as package:
+            self.assertEqual(package.namelist(), ["[Content_Types].xml", "word/document.xml"])
+            xml = package.read("word/document.xml").decode("utf-8")
+        self.assertIn('mc:Ignorable="w14"', xml)
+        self.assertIn('xmlns:w14=', xml)
+        self.assertIn("<w:b/>", xml)
+        self.assertIn('<w:tab w:val="left" w:pos="720"/>', xml)
+        self.assertIn("Text box", xml)
+
+    def test_save_translated_keeps_paragraphs_without_translation(self):
+        translated_docx = Path(self.tmp.name) / "sample_translated.docx"
+        self.backend.save_translated(
+            self.docx_path, ["Artikel 1"], translated_docx, Path(self.tmp.name) / "out.pdf"
+        )
+        paragraphs = self.backend.get_paragraph_texts(translated_docx)
+        self.assertEqual(paragraphs[0], "Artikel 1")
+        self.assertEqual(paragraphs[2:4], ["Cell A", "Cell B"])
+
+    def test_save_translated_adds_run_to_paragraph_without_text(self):
+        write_docx(self.docx_path, """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>
+  <w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:tab/></w:r></w:p>
+  <w:p/>
+</w:body></w:document>""")
+        translated_docx = Path(self.tmp.name) / "sample_translated.docx"
+        self.backend.save_translated(
+            self.docx_path, ["Signature", ""], translated_docx, Path(self.tmp.name) / "out.pdf"
+        )
+        self.assertEqual(self.backend.get_paragraph_texts(translated_docx), ["Signature", ""])
+
+    def test_document_uses_backend(self):
+        document = Document(self.docx_path, backend=self.backend)
+        self.assertEqual(document.get_paragraph_texts()[2], "Cell A")
+        document.save_translated(["Artikel 1"])
+        self.assertTrue(document.translated_docx_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
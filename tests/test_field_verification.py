@@ -0,0 +1,80 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from contract_analysis import FieldVerifier
+from contract_analysis.field_verification import low_confidence_fields
+
+
+def make_document_intelligence():
+    pages = ["Page one text" + " filler" * 200, "Customer: Contoso Ltd", "Page three text" + " filler" * 200,
+             "Start date: 1 March 2024"]
+    return SimpleNamespace(
+        document_layout_pages=pages,
+        layout_index=None,
+        field_dict={
+            "CustomerName": "Contoso Ltc",
+            "SupportSFStartDate": datetime.date(2024, 3, 1),
+            "MasterAgreementType": "Enterprise",
+            "Footer": None,
+        },
+        field_confidence_dict={"CustomerName": 0.41, "SupportSFStartDate": 0.55, "MasterAgreementType": 0.97,
+                               "Footer": 0.0},
+        field_pages_dict={"CustomerName": [2], "SupportSFStartDate": [4], "MasterAgreementType": [1],
+                          "Footer": []},
+    )
+
+
+class TestFieldVerifier(unittest.TestCase):
+    def setUp(self):
+        self.di = make_document_intelligence()
+        self.gpt = MagicMock()
+        self.gpt.run_json.return_value = {
+            "CustomerName": {"correct": False, "value": "Contoso Ltd"},
+            "SupportSFStartDate": {"correct": True, "value": "2024-03-01"},
+        }
+
+    def test_low_confidence_fields(self):
+        names = low_confidence_fields(self.di.field_confidence_dict, self.di.field_pages_dict, 0.8)
+        # Footer was not found, so there is nothing to check it against.
+        self.assertEqual(names, ["CustomerName", "SupportSFStartDate"])
+
+    def test_verify_sends_only_uncertain_fields_and_their_pages(self):
+        checks = FieldVerifier(self.gpt, threshold=0.8).verify(self.di)
+
+        self.gpt.run_json.assert_called_once()
+        self.gpt.run.assert_not_called()
+        request, prompt = self.gpt.run_json.call_args[0]
+        self.assertEqual(prompt, FieldVerifier(self.gpt).prompt)
+        self.assertIn("-- PAGE 2 --\nCustomer: Contoso Ltd", request)
+        self.assertIn("-- PAGE 4 --", request)
+        self.assertNotIn("filler", request)
+        self.assertNotIn("MasterAgreementType", request)
+        self.assertIn('"2024-03-01"', request)
+
+        self.assertEqual(set(checks), {"CustomerName", "SupportSFStartDate"})
+        self.assertFalse(checks["CustomerName"].confirmed)
+        self.assertEqual(checks["CustomerName"].verified_value, "Contoso Ltd")
+        self.assertEqual(checks["CustomerName"].pages, [2])
+        self.assertTrue(checks["SupportSFStartDate"].confirmed)
+
+    def test_verify_without_uncertain_fields_makes_no_request(self):
+        checks = FieldVerifier(self.gpt, threshold=0.3).verify(self.di)
+        self.assertEqual(checks, {})
+        self.gpt.run_json.assert_not_called()
+
+    def test_unreadable_response(self):
+        self.gpt.run_json.return_value = {}
+        checks = FieldVerifier(self.gpt).verify(self.di)
+        self.assertIsNone(checks["CustomerName"].confirmed)
+        self.assertIsNone(checks["CustomerName"].verified_value)
+
+    def test_failed_request_is_raised(self):
+        self.gpt.run_json.side_effect = RuntimeError("service unavailable")
+        with self.assertRaises(RuntimeError):
+            FieldVerifier(self.gpt).verify(self.di)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from unittest.mock import patch
+
+from contract_analysis.http_transport import HttpTransport, get_default_transport
+
+
+class TestHttpTransport(unittest.TestCase):
+    def test_pool_configuration(self):
+        transport = HttpTransport(pool_connections=2, pool_maxsize=5)
+        adapter = transport.session.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_maxsize, 5)
+        self.assertEqual(adapter.max_retries.total, 0)
+        transport.close()
+
+    @patch("requests.Session.request")
+    def test_default_timeout(self, mock_request):
+        transport = HttpTransport(timeout=(1, 2))
+        transport.post("https://example.com", json={})
+        mock_request.assert_called_with("POST", "https://example.com", json={}, timeout=(1, 2))
+        transport.get("https://example.com", timeout=5)
+        mock_request.assert_called_with("GET", "https://example.com", timeout=5)
+
+    def test_default_transport_is_shared(self):
+        self.assertIs(get_default_transport(), get_default_transport())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from contract_analysis.language_detection import detect_language, detect_script
+
+ENGLISH = (
+    "This Agreement is entered into by and between the Customer and the Supplier. The Supplier shall "
+    "provide the services described in the Statement of Work and the Customer shall pay the fees set "
+    "out in Schedule 2."
+)
+FRENCH = (
+    "Le présent contrat est conclu entre le Client et le Fournisseur. Le Fournisseur fournira les "
+    "services décrits dans le bon de commande et le Client paiera les frais prévus à l'annexe 2."
+)
+GERMAN = (
+    "Dieser Vertrag wird zwischen dem Kunden und dem Lieferanten geschlossen. Der Lieferant erbringt die "
+    "in der Leistungsbeschreibung beschriebenen Leistungen und der Kunde zahlt die in Anlage 2 "
+    "festgelegten Gebühren."
+)
+SPANISH = (
+    "El presente contrato se celebra entre el Cliente y el Proveedor. El Proveedor prestará los servicios "
+    "descritos en la orden de trabajo y el Cliente pagará las tarifas establecidas en el Anexo 2."
+)
+
+
+class TestLanguageDetection(unittest.TestCase):
+    def test_latin_languages(self):
+        for text, expected in [(ENGLISH, "en"), (FRENCH, "fr"), (GERMAN, "de"), (SPANISH, "es")]:
+            language, confidence = detect_language(text)
+            self.assertEqual(language, expected)
+            self.assertGreaterEqual(confidence, 0.8)
+
+    def test_confidence_grows_with_sample(self):
+        _, short = detect_language(FRENCH[:80])
+        _, long = detect_language(" ".join([FRENCH] * 5))
+        self.assertLess(short, long)
+
+    def test_mixed_text_has_low_confidence(self):
+        _, confidence = detect_language("The Supplier (le Fournisseur) shall provide der Lieferant services.")
+        self.assertLess(confidence, 0.8)
+
+    def test_script_languages(self):
+        self.assertEqual(detect_language("Η παρούσα σύμβαση συνάπτεται μεταξύ του Πελάτη"), ("el", 0.95))
+        self.assertEqual(detect_language("本契約は、顧客とサプライヤーとの間で締結されます。")[0], "ja")
+        self.assertLess(detect_language("本合同由客户与供应商签订")[1], 0.8)
+
+    def test_no_letters(self):
+        self.assertEqual(detect_language("1.2.3 -- 42"), (None, 0.0))
+        self.assertIsNone(detect_script("\r\r\t"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from azure.ai.formrecognizer import Point
+
+from contract_analysis import LayoutIndex
+
+
+def make_line(content, x0, y0, x1, y1):
+    polygon = [Point(x0, y0), Point(x1, y0), Point(x1, y1), Point(x0, y1)]
+    return SimpleNamespace(content=content, polygon=polygon)
+
+
+def make_result():
+    pages = [
+        SimpleNamespace(width=8.5, height=11, unit="inch", lines=[
+            make_line("MASTER SERVICES AGREEMENT", 2.0, 1.0, 6.5, 1.3),
+            make_line("1. Term", 1.0, 2.0, 2.0, 2.2),
+        ]),
+        SimpleNamespace(width=8.5, height=11, unit="inch", lines=[]),
+        SimpleNamespace(width=8.5, height=11, unit="inch", lines=[
+            make_line("2. Payment terms", 1.0, 1.0, 3.0, 1.2),
+            make_line("Signature: ____", 1.0, 9.5, 4.0, 9.8),
+        ]),
+    ]
+    return SimpleNamespace(pages=pages)
+
+
+class TestLayoutIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = LayoutIndex.from_results(make_result())
+
+    def test_pages_and_lines(self):
+        self.assertEqual(self.index.page_count, 3)
+        self.assertEqual(self.index.line_count, 4)
+        self.assertEqual(self.index.page_text(1), "MASTER SERVICES AGREEMENT1. Term")
+        self.assertEqual(self.index.lines(2), [])
+        line = self.index.lines(3)[0]
+        self.assertEqual((line.page, line.text), (3, "2. Payment terms"))
+        self.assertEqual(self.index.text[line.offset:line.offset + len(line.text)], line.text)
+        for actual, expected in zip(line.box, (1.0, 1.0, 3.0, 1.2)):
+            self.assertAlmostEqual(actual, expected, places=5)
+
+    def test_page_of_offset(self):
+        self.assertEqual(self.index.page_of_offset(0), 1)
+        self.assertEqual(self.index.page_of_offset(self.index.text.index("Payment")), 3)
+        self.assertEqual(self.index.page_of_offset(len(self.index.text) - 1), 3)
+
+    def test_lines_in_region(self):
+        bottom = self.index.lines_in_region(3, 0, 9, 8.5, 11)
+        self.assertEqual([line.text for line in bottom], ["Signature: ____"])
+        self.assertEqual(self.index.lines_in_region(1, 0, 0, 3, 3, contained=True)[0].text, "1. Term")
+        with self.assertRaises(IndexError):
+            self.index.lines_in_region(4, 0, 0, 1, 1)
+
+    def test_search(self):
+        self.assertEqual([line.page for line in self.index.search(r"^\d+\.")], [1, 3])
+        self.assertEqual([line.text for line in self.index.search("term", flags=2)], ["1. Term", "2. Payment terms"])
+
+    def test_serialization(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "layout.bin"
+            self.index.save(path)
+            loaded = LayoutIndex.load(path)
+        self.assertEqual(loaded.text, self.index.text)
+        self.assertEqual(loaded.unit, "inch")
+        self.assertEqual(loaded.lines(3), self.index.lines(3))
+        with self.assertRaises(ValueError):
+            LayoutIndex.from_bytes(b"not an index")
+
+    def test_merges_page_ranges_in_order(self):
+        first, second = make_result(), make_result()
+        merged = LayoutIndex.from_results(first, second)
+        self.assertEqual(merged.page_count, 6)
+        self.assertEqual(merged.page_of_offset(merged.text.rindex("Signature")), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,33 @@
+import tempfile
+import threading
+import openai
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 import yaml
+from pathlib import Path
 import sys  # Required for platform check
 
-from contract_analysis import OpenAIGPT
+from contract_analysis import OpenAIGPT, ResultCache
+from contract_analysis.openai_gpt import CONTEXT_LENGTH, FATAL, THROTTLE, TRANSIENT, classify_error, get_deployment_limiter
 
-# Load configuration from a YAML file
-with open("configuration/config.yaml", "r") as f:
+# Load test settings; the real configuration/config.yaml is not under version control
+with open(Path(__file__).parent / "fixtures" / "config.yaml", "r") as f:
     config = yaml.safe_load(f)
 
 gpt_api_version = config["openai_gpt"]["api_version"]
 gpt_endpoint = config["openai_gpt"]["endpoint"]
 
-# Skip the entire test suite if not on Windows
-@unittest.skipUnless(sys.platform == "win32", "Requires Windows")
-class TestOpenAIGPT(unittest.TestCase):
+def api_error(error_class, status_code, message="error", headers=None, code=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    return error_class(message, response=response, body={"code": code} if code else None)
+
+
+def completion(content, finish_reason="stop"):
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content), finish_reason=finish_reason)])
+
+
+class OpenAIGPTTestCase(unittest.TestCase):
     def setUp(self):
         self.mock_credential = MagicMock()
         self.mock_client = MagicMock()
@@ -36,11 +49,10 @@ class TestOpenAIGPT(unittest.TestCase):
                     token_scope=self.token_scope
                 )
 
-    def test_split_text(self):
-        text = "-- PAGE1-- PAGE2-- PAGE3-- PAGE4"
-        chunks = self.gpt._split_text(text, 2)
-        self.assertEqual(len(chunks), 3)  # Adjusted to match actual behavior
 
+# Skip the original GPT tests if not on Windows
+@unittest.skipUnless(sys.platform == "win32", "Requires Windows")
+class TestOpenAIGPT(OpenAIGPTTestCase):
     def test_clean_text(self):
         dirty_text = "-- PAGE1 -- Some content -- PAGE2 --"
         clean = self.gpt._clean_text(dirty_text)
@@ -66,8 +78,241 @@ class TestOpenAIGPT(unittest.TestCase):
 
     def test_run_api_failure(self):
         self.mock_client.chat.completions.create.side_effect = Exception("API error")
-        result = self.gpt._run_api("system", "user")
-        self.assertIn("Error", result)
+        with self.assertRaises(Exception):
+            self.gpt._run_api("system", "user")
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 1)
+
+
+class TestOpenAIGPTRequests(OpenAIGPTTestCase):
+    def test_run_sizes_requests_to_token_budget(self):
+        self.gpt.max_input_tokens = 20
+        self.gpt._token_counter = lambda text: len(text.split())
+        self.gpt._run_api = MagicMock(side_effect=lambda system, user, use_cache: user)
+        text = "".join(f"Clause {i} applies to both parties.\n" for i in range(6))
+
+        results = self.gpt.run(text, "Check the clauses.")
+        self.assertEqual(len(results), 3)
+        self.assertEqual("".join(results), text)
+        for chunk in results:
+            self.assertLessEqual(len(chunk.split()) + 3, 20)
+
+    def test_run_without_budget_sends_text_once(self):
+        self.gpt._run_api = MagicMock(return_value="response")
+        self.assertEqual(self.gpt.run("-- PAGE1 text", "prompt"), ["response"])
+        self.gpt._run_api.assert_called_once_with("prompt", "-- PAGE1 text", use_cache=True)
+
+    def test_run_json_sends_text_whole(self):
+        self.gpt.max_input_tokens = 20
+        self.gpt._token_counter = lambda text: len(text.split())
+        self.mock_client.chat.completions.create.return_value = completion('Answer: {"A": {"correct": true}}')
+        text = "".join(f"Clause {i} applies to both parties.\n" for i in range(6))
+
+        self.assertEqual(self.gpt.run_json(text, "Check the clauses."), {"A": {"correct": True}})
+        self.mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(self.mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"], text)
+
+    def test_run_json_rejects_answers_cut_off_by_max_tokens(self):
+        self.mock_client.chat.completions.create.return_value = completion('{"A": {"correct": true}}', finish_reason="length")
+        self.assertEqual(self.gpt.run_json("Contract text", "Check the clauses."), {})
+
+    def test_run_prompts_fans_out_within_deployment_limit(self):
+        with patch("contract_analysis.openai_gpt.AzureOpenAI", return_value=self.mock_client):
+            with patch("contract_analysis.openai_gpt.get_bearer_token_provider", return_value=MagicMock()):
+                gpt = OpenAIGPT(
+                    prompt_registry={f"prompt_{i}": f"System prompt {i}" for i in range(4)},
+                    gpt_credential=self.mock_credential,
+                    api_version=self.api_version,
+                    azure_endpoint="https://fanout.example.com",
+                    model="gpt-fanout-model",
+                    max_concurrency=2,
+                )
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def create(model, messages, **kwargs):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.1)
+            with lock:
+                in_flight.pop()
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=messages[0]["content"]))])
+
+        self.mock_client.chat.completions.create.side_effect = create
+        start = time.perf_counter()
+        results = gpt.run_prompts(["prompt_3", "prompt_0", "prompt_1", "prompt_2"], "Some text", max_workers=4)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(list(results), ["prompt_3", "prompt_0", "prompt_1", "prompt_2"])
+        self.assertEqual(results["prompt_3"], ["System prompt 3"])
+        self.assertEqual(max(peak), 2)
+        self.assertLess(elapsed, 0.35)
+        self.assertIs(gpt.limiter, get_deployment_limiter("https://fanout.example.com/", "gpt-fanout-model"))
+
+    def test_run_prompts_unknown_key(self):
+        self.gpt.run = MagicMock()
+        with self.assertRaises(ValueError):
+            self.gpt.run_prompts(["test_prompt", "missing"], "Some text")
+        self.gpt.run.assert_not_called()
+
+    def test_run_prompts_packed_sends_text_once(self):
+        self.gpt.prompt_registry.update({"scope": "Describe the scope.", "timelines": "List the dates."})
+        self.gpt._run_api = MagicMock(return_value='```json\n{"scope": "Support services", "timelines": ["2024-03-01"]}\n```')
+
+        results = self.gpt.run_prompts(["scope", "timelines"], "Contract text", packed=True)
+        self.gpt._run_api.assert_called_once()
+        system_prompt, user_prompt = self.gpt._run_api.call_args[0]
+        self.assertIn("### TASK: scope\nDescribe the scope.", system_prompt)
+        self.assertIn("### TASK: timelines\nList the dates.", system_prompt)
+        self.assertEqual(user_prompt, "Contract text")
+        self.assertEqual(results, {"scope": ["Support services"], "timelines": ['["2024-03-01"]']})
+
+    def test_run_prompts_packed_falls_back_for_missing_answers(self):
+        self.gpt.prompt_registry.update({"scope": "Describe the scope.", "timelines": "List the dates."})
+        # A response cut off after the first answer.
+        self.gpt._run_api = MagicMock(side_effect=[
+            '{"scope": "Support services"}', "Dates: 2024-03-01",
+        ])
+
+        results = self.gpt.run_prompts(["scope", "timelines"], "Contract text", packed=True)
+        self.assertEqual(results, {"scope": ["Support services"], "timelines": ["Dates: 2024-03-01"]})
+        self.gpt._run_api.assert_called_with("List the dates.", "Contract text", use_cache=True)
+
+    def test_run_prompts_packed_truncated_json(self):
+        self.gpt.prompt_registry.update({"scope": "Describe the scope.", "timelines": "List the dates."})
+        self.gpt._run_api = MagicMock(side_effect=lambda system, user, **kwargs: '{"scope": "Supp' if "TASK" in system else system)
+
+        results = self.gpt.run_prompts(["scope", "timelines"], "Contract text", packed=True)
+        self.assertEqual(results, {"scope": ["Describe the scope."], "timelines": ["List the dates."]})
+        self.assertEqual(self.gpt._run_api.call_count, 3)
+
+    def test_run_prompts_packed_caches_only_readable_responses(self):
+        self.gpt.prompt_registry.update({"scope": "Describe the scope.", "timelines": "List the dates."})
+
+        def create(model, messages, **kwargs):
+            system = messages[0]["content"]
+            if "TASK" not in system:
+                return completion(system)
+            return completion(next(packed))
+
+        self.mock_client.chat.completions.create.side_effect = create
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.gpt.response_cache = ResultCache(cache_dir)
+            packed = iter(["No JSON here.", '{"scope": "Support", "timelines": "March"}'])
+            self.gpt.run_prompts(["scope", "timelines"], "Contract text", packed=True)
+            results = self.gpt.run_prompts(["scope", "timelines"], "Contract text", packed=True)
+            self.assertEqual(results, {"scope": ["Support"], "timelines": ["March"]})
+
+            self.mock_client.chat.completions.create.reset_mock()
+            self.assertEqual(self.gpt.run_prompts(["scope", "timelines"], "Contract text", packed=True), results)
+            self.mock_client.chat.completions.create.assert_not_called()
+
+    def test_run_prompts_packed_rejects_answers_cut_off_by_max_tokens(self):
+        self.gpt.prompt_registry.update({"scope": "Describe the scope.", "timelines": "List the dates."})
+
+        def create(model, messages, **kwargs):
+            system = messages[0]["content"]
+            if "TASK" in system:
+                # A complete object, but the model stopped before answering every task.
+                return completion('{"scope": "Support"}', finish_reason="length")
+            return completion(system)
+
+        self.mock_client.chat.completions.create.side_effect = create
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.gpt.response_cache = ResultCache(cache_dir)
+            results = self.gpt.run_prompts(["scope", "timelines"], "Contract text", packed=True)
+            self.assertEqual(results, {"scope": ["Describe the scope."], "timelines": ["List the dates."]})
+            self.assertEqual(self.mock_client.chat.completions.create.call_count, 3)
+            # Only the two separate answers were cached.
+            self.assertEqual(len(list(self.gpt.response_cache.cache_dir.rglob("*.json.gz"))), 2)
+
+    def test_run_api_response_cache(self):
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock(message=MagicMock(content="Cached answer"))]
+        self.mock_client.chat.completions.create.return_value = mock_response
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.gpt.response_cache = ResultCache(cache_dir)
+
+            self.assertEqual(self.gpt._run_api("system", "user"), "Cached answer")
+            self.assertEqual(self.gpt._run_api("system", "user"), "Cached answer")
+            self.assertEqual(self.mock_client.chat.completions.create.call_count, 1)
+
+            # Other prompts, generation parameters or a bypass reach the service.
+            self.gpt._run_api("system", "other user")
+            self.gpt._run_api("system", "user", use_cache=False)
+            self.gpt.generation_params = dict(self.gpt.generation_params, temperature=0.0)
+            self.gpt._run_api("system", "user")
+            self.assertEqual(self.mock_client.chat.completions.create.call_count, 4)
+
+    def test_run_api_does_not_cache_failures(self):
+        self.mock_client.chat.completions.create.side_effect = Exception("API error")
+        with tempfile.TemporaryDirectory() as cache_dir, patch("contract_analysis.openai_gpt.time.sleep"):
+            self.gpt.response_cache = ResultCache(cache_dir)
+            with self.assertRaises(Exception):
+                self.gpt._run_api("system", "user")
+            self.assertIsNone(self.gpt.response_cache.get(self.gpt._cache_key("system", "user")))
+
+    def test_classify_error(self):
+        self.assertEqual(classify_error(api_error(openai.RateLimitError, 429)), THROTTLE)
+        self.assertEqual(classify_error(api_error(openai.RateLimitError, 429, code="insufficient_quota")), FATAL)
+        self.assertEqual(classify_error(api_error(openai.InternalServerError, 503)), TRANSIENT)
+        self.assertEqual(classify_error(openai.APIConnectionError(request=MagicMock())), TRANSIENT)
+        self.assertEqual(classify_error(api_error(openai.BadRequestError, 400, code="context_length_exceeded")), CONTEXT_LENGTH)
+        self.assertEqual(classify_error(api_error(openai.BadRequestError, 400)), FATAL)
+        self.assertEqual(classify_error(api_error(openai.AuthenticationError, 401)), FATAL)
+
+    @patch("contract_analysis.openai_gpt.time.sleep")
+    def test_run_api_honors_retry_after(self, mock_sleep):
+        self.mock_client.chat.completions.create.side_effect = [
+            api_error(openai.RateLimitError, 429, headers={"retry-after": "3"}),
+            api_error(openai.InternalServerError, 503),
+            completion("Success"),
+        ]
+        self.gpt.limiter = MagicMock()
+        self.assertEqual(self.gpt._run_api("system", "user"), "Success")
+
+        stats = self.gpt.last_call_stats
+        self.assertEqual((stats.attempts, stats.throttled, stats.transient, stats.outcome), (3, 1, 1, "succeeded"))
+        self.assertEqual(mock_sleep.call_args_list[0][0][0], 3.0)
+        self.gpt.limiter.on_throttle.assert_called_once_with(3.0)
+        self.assertIs(self.gpt.call_stats[-1], stats)
+
+    @patch("contract_analysis.openai_gpt.time.sleep")
+    def test_run_api_fails_fast_on_fatal_errors(self, mock_sleep):
+        self.mock_client.chat.completions.create.side_effect = api_error(openai.AuthenticationError, 401)
+        with self.assertRaises(openai.AuthenticationError):
+            self.gpt._run_api("system", "user")
+        mock_sleep.assert_not_called()
+        self.assertEqual(self.gpt.last_call_stats.outcome, FATAL)
+
+    @patch("contract_analysis.openai_gpt.time.sleep")
+    def test_run_api_gives_up_after_max_retries(self, mock_sleep):
+        self.gpt.max_retries = 2
+        self.mock_client.chat.completions.create.side_effect = api_error(openai.InternalServerError, 500)
+        with self.assertRaises(openai.InternalServerError):
+            self.gpt._run_api("system", "user")
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_run_rechunks_on_context_overflow(self):
+        self.gpt._token_counter = lambda text: len(text.split())
+        overflow = api_error(openai.BadRequestError, 400, code="context_length_exceeded")
+
+        def create(model, messages, **kwargs):
+            user = messages[1]["content"]
+            if len(user.split()) > 10:
+                raise overflow
+            return completion(user)
+
+        self.mock_client.chat.completions.create.side_effect = create
+        text = "".join(f"Clause {i} applies to both parties.\n" for i in range(6))
+        results = self.gpt.run(text, "Check the clauses.")
+        self.assertGreater(len(results), 1)
+        self.assertEqual("".join(results), text)
+        for chunk in results:
+            self.assertLessEqual(len(chunk.split()), 10)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,20 @@
+import unittest
+
+from contract_analysis.responses import parse_json_object
+
+
+class TestParseJsonObject(unittest.TestCase):
+    def test_reads_object_around_text_and_fences(self):
+        self.assertEqual(parse_json_object('Result: {"A": {"correct": true}}'), {"A": {"correct": True}})
+        self.assertEqual(parse_json_object('```json\n{"scope": "Support"}\n```'), {"scope": "Support"})
+
+    def test_unreadable_responses(self):
+        self.assertEqual(parse_json_object("{not json}"), {})
+        self.assertEqual(parse_json_object('{"scope": "Supp'), {})
+        self.assertEqual(parse_json_object("[1, 2]"), {})
+        self.assertEqual(parse_json_object(""), {})
+        self.assertEqual(parse_json_object(None), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
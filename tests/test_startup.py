@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# Loaded modules are the real check; the time budget only catches gross regressions, it is
+# loose enough for slow CI runners (eager imports of the service SDKs took about a second).
+STARTUP_BUDGET_SECONDS = 5.0
+
+HEAVY_MODULES = ["openai", "azure.ai.formrecognizer", "azure.identity", "azure.core", "requests", "win32com"]
+# Components that are only imported when first used.
+COMPONENT_MODULES = [
+    "contract_analysis.translation",
+    "contract_analysis.openai_gpt",
+    "contract_analysis.document_intelligence",
+    "contract_analysis.content_understanding",
+]
+
+_PROBE = """
+import json, pathlib, sys, tempfile, time
+document_path = pathlib.Path(tempfile.mkdtemp()) / "contract.docx"
+document_path.touch()
+start = time.perf_counter()
+import contract_analysis
+from contract_analysis import ContractAnalysis
+analysis = ContractAnalysis(
+    document_path=str(document_path),
+    target_language="fr",
+    translator_endpoint="https://translator.example.com",
+    translator_region="westeurope",
+    gpt_api_version="2024-06-01",
+    gpt_endpoint="https://gpt.example.com",
+    gpt_model="gpt-mock-model",
+    di_endpoint="https://di.example.com",
+    di_model_id="prebuilt-layout",
+    cu_endpoint="https://cu.example.com",
+    cu_api_version="2024-12-01-preview",
+)
+print(json.dumps({
+    "startup": time.perf_counter() - start,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES + COMPONENT_MODULES,)
+
+
+class TestStartup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # A fresh interpreter, so that modules imported by other tests do not hide eager imports.
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+        cls.probe = json.loads(subprocess.run(
+            [sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True
+        ).stdout)
+
+    def test_service_sdks_are_not_imported(self):
+        self.assertEqual([m for m in self.probe["loaded"] if m in HEAVY_MODULES], [])
+
+    def test_components_are_not_imported(self):
+        self.assertEqual([m for m in self.probe["loaded"] if m in COMPONENT_MODULES], [])
+
+    def test_startup_time_budget(self):
+        self.assertLess(self.probe["startup"], STARTUP_BUDGET_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
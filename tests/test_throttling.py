@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+
+from contract_analysis.throttling import AdaptiveConcurrencyLimiter, backoff_delay, parse_retry_after
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after({"Retry-After": "3"}), 3.0)
+
+    def test_milliseconds_take_precedence(self):
+        self.assertEqual(parse_retry_after({"retry-after-ms": "250", "Retry-After": "1"}), 0.25)
+
+    def test_http_date_in_the_past(self):
+        self.assertEqual(parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(parse_retry_after({}))
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after({"Retry-After": "soon"}))
+
+    def test_backoff_delay_bounds(self):
+        for attempt in range(8):
+            self.assertLessEqual(backoff_delay(attempt, base=0.5, cap=4), min(4, 0.5 * 2 ** attempt))
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def test_throttle_halves_and_success_recovers(self):
+        limiter = AdaptiveConcurrencyLimiter(8)
+        limiter.on_throttle()
+        self.assertEqual(limiter.limit, 4)
+        limiter.on_throttle()
+        limiter.on_throttle()
+        limiter.on_throttle()
+        self.assertEqual(limiter.limit, 1)
+        limiter.on_success()
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(2):
+            limiter.on_success()
+        self.assertEqual(limiter.limit, 3)
+
+    def test_limits_concurrency(self):
+        limiter = AdaptiveConcurrencyLimiter(2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with limiter:
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLessEqual(max(peak), 2)
+
+    def test_retry_after_pauses_callers(self):
+        limiter = AdaptiveConcurrencyLimiter(2)
+        limiter.on_throttle(retry_after=0.1)
+        start = time.monotonic()
+        with limiter:
+            pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+if __name__ == "__main__":
+    unittest.main()
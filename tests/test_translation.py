@@ -1,18 +1,25 @@
 import unittest
 from unittest.mock import MagicMock, patch
+import requests
 import yaml
 import sys  # Required for platform check
 
-from contract_analysis import OpenAIGPT
+import tempfile
+import zipfile
+from pathlib import Path
 
-# Load configuration from a YAML file
-with open("configuration/config.yaml", "r") as f:
+from contract_analysis import Document, OpenAIGPT, Translation, TranslationMemory
+from contract_analysis.docx_backend import OpenXmlBackend
+from contract_analysis.translation import build_batches, split_text
+
+# Load test settings; the real configuration/config.yaml is not under version control
+with open(Path(__file__).parent / "fixtures" / "config.yaml", "r") as f:
     config = yaml.safe_load(f)
 
 gpt_api_version = config["openai_gpt"]["api_version"]
 gpt_endpoint = config["openai_gpt"]["endpoint"]
 
-# Skip the entire test suite if not on Windows
+# Skip the GPT tests if not on Windows
 @unittest.skipUnless(sys.platform == "win32", "Requires Windows")
 class TestOpenAIGPT(unittest.TestCase):
     def setUp(self):
@@ -36,11 +43,6 @@ class TestOpenAIGPT(unittest.TestCase):
                     token_scope=self.token_scope
                 )
 
-    def test_split_text(self):
-        text = "-- PAGE1-- PAGE2-- PAGE3-- PAGE4"
-        chunks = self.gpt._split_text(text, 2)
-        self.assertEqual(len(chunks), 3)  # Adjusted to match actual behavior
-
     def test_clean_text(self):
         dirty_text = "-- PAGE1 -- Some content -- PAGE2 --"
         clean = self.gpt._clean_text(dirty_text)
@@ -66,8 +68,268 @@ class TestOpenAIGPT(unittest.TestCase):
 
     def test_run_api_failure(self):
         self.mock_client.chat.completions.create.side_effect = Exception("API error")
-        result = self.gpt._run_api("system", "user")
-        self.assertIn("Error", result)
+        with self.assertRaises(Exception):
+            self.gpt._run_api("system", "user")
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, 1)
+
+def fake_translate_response(url, headers=None, params=None, json=None, **kwargs):
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {}
+    response.raise_for_status.return_value = None
+    response.json.return_value = [{"translations": [{"text": item["text"].upper()}]} for item in json]
+    return response
+
+
+class TestTranslateTexts(unittest.TestCase):
+    def setUp(self):
+        self.credential = MagicMock()
+        self.credential.get_token.return_value = MagicMock(token="token", expires_on=4102444800)
+        self.document = MagicMock()
+        self.translation = Translation(
+            credential=self.credential,
+            translator_endpoint="https://translator.example.com/",
+            translator_region="westeurope",
+            target_language="en",
+            document=self.document,
+            max_elements_per_request=3,
+            max_characters_per_request=20,
+        )
+
+    def test_build_batches(self):
+        self.assertEqual(build_batches(["a", "b", "c", "d"], max_elements=3, max_characters=100), [[0, 1, 2], [3]])
+        self.assertEqual(build_batches(["aaaa", "bbbb", "cc"], max_elements=10, max_characters=8), [[0, 1], [2]])
+
+    def test_split_text(self):
+        text = "First sentence. Second sentence is longer. Third."
+        pieces = split_text(text, 20)
+        self.assertTrue(all(len(p) <= 20 for p in pieces))
+        self.assertEqual(" ".join(pieces).split(), text.split())
+        self.assertEqual(split_text("short", 20), ["short"])
+
+    def test_split_text_without_spaces(self):
+        text = "本契約は東京で締結される。" * 3
+        pieces = split_text(text, 20)
+        self.assertEqual(pieces, ["本契約は東京で締結される。"] * 3)
+        self.assertEqual("".join(split_text("ก" * 45, 20)), "ก" * 45)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_translate_texts_batches_requests(self, mock_post):
+        texts = ["one", "", "two", "three", "four", "  "]
+        result = self.translation.translate_texts(texts)
+        self.assertEqual(result, ["ONE", "", "TWO", "THREE", "FOUR", ""])
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_post.call_args_list[0].kwargs["json"], [{"text": "one"}, {"text": "two"}, {"text": "three"}])
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_translate_texts_splits_long_paragraphs(self, mock_post):
+        result = self.translation.translate_texts(["Alpha beta. Gamma delta epsilon.", "x"])
+        self.assertEqual(result, ["ALPHA BETA. GAMMA DELTA EPSILON.", "X"])
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_translate_texts_keeps_original_separators(self, mock_post):
+        cjk = "本契約は東京で締結される。" * 3
+        thai = "ก" * 45
+        result = self.translation.translate_texts([cjk, thai, "First one.\nSecond  sentence here."])
+        self.assertEqual(result, [cjk, thai, "FIRST ONE.\nSECOND  SENTENCE HERE."])
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_translate_texts_sends_repeated_segments_once(self, mock_post):
+        self.assertEqual(self.translation.translate_texts(["oui", "non", "oui"]), ["OUI", "NON", "OUI"])
+        self.assertEqual(mock_post.call_args.kwargs["json"], [{"text": "oui"}, {"text": "non"}])
+
+    @patch("contract_analysis.translation.time.sleep")
+    @patch("contract_analysis.http_transport.HttpTransport.post")
+    def test_retry_after_throttling(self, mock_post, mock_sleep):
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "2"})
+        mock_post.side_effect = [throttled, fake_translate_response(None, json=[{"text": "a"}])]
+        self.assertEqual(self.translation.translate_texts(["a"]), ["A"])
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch("contract_analysis.translation.time.sleep")
+    @patch("contract_analysis.http_transport.HttpTransport.post")
+    def test_gives_up_after_max_retries(self, mock_post, mock_sleep):
+        self.translation.max_retries = 2
+        mock_post.return_value = MagicMock(status_code=503, headers={})
+        with self.assertRaises(RuntimeError):
+            self.translation.translate_texts(["a"])
+        self.assertEqual(mock_post.call_count, 3)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post")
+    def test_bad_request_is_not_retried(self, mock_post):
+        response = MagicMock(status_code=400, headers={})
+        response.raise_for_status.side_effect = requests.HTTPError("400 Bad Request")
+        mock_post.return_value = response
+        with self.assertRaises(RuntimeError):
+            self.translation.translate_texts(["a"])
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_concurrent_translation_keeps_order(self, mock_post):
+        translation = Translation(
+            credential=self.credential,
+            translator_endpoint="https://translator.example.com",
+            translator_region="westeurope",
+            target_language="en",
+            document=self.document,
+            max_elements_per_request=3,
+            max_workers=4,
+        )
+        texts = [f"paragraph {i}" for i in range(20)]
+        self.assertEqual(translation.translate_texts(texts), [t.upper() for t in texts])
+        self.assertEqual(mock_post.call_count, 7)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_translation_memory_skips_known_segments(self, mock_post):
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = TranslationMemory(Path(tmp) / "memory.sqlite")
+            self.translation.memory = memory
+            self.translation.source_language = "fr"
+            self.assertEqual(self.translation.translate_texts(["un", "deux", "un"]), ["UN", "DEUX", "UN"])
+            self.assertEqual(mock_post.call_args.kwargs["json"], [{"text": "un"}, {"text": "deux"}])
+
+            mock_post.reset_mock()
+            self.assertEqual(self.translation.translate_texts(["deux", "trois"]), ["DEUX", "TROIS"])
+            self.assertEqual(mock_post.call_args.kwargs["json"], [{"text": "trois"}])
+            self.assertEqual(memory.stats()["hits"], 1)
+            memory.close()
+
+
+class TestTranslation(unittest.TestCase):
+    def setUp(self):
+        self.credential = MagicMock()
+        self.credential.get_token.return_value = MagicMock(token="token", expires_on=4102444800)
+        self.document = MagicMock()
+        self.translation = Translation(
+            credential=self.credential,
+            translator_endpoint="https://translator.example.com/",
+            translator_region="westeurope",
+            target_language="en",
+            document=self.document,
+            max_elements_per_request=3,
+            max_characters_per_request=20,
+        )
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_translate_document(self, mock_post):
+        self.document.get_paragraph_texts.return_value = ["Titre ", "", "Clause"]
+        self.translation.translate_document()
+        self.document.save_translated.assert_called_once_with(["TITRE", "", "CLAUSE"])
+        self.document.set_paths_to_use.assert_called_once_with(translated=True)
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_deferred_rendering(self, mock_post):
+        self.document.get_paragraph_texts.return_value = ["Titre", "Clause"]
+        self.translation.defer_rendering = True
+        result = self.translation.translate_document()
+        self.assertEqual(result.paragraphs, ["TITRE", "CLAUSE"])
+        self.assertEqual(result.text, "TITRE\rCLAUSE")
+        self.assertIs(self.document.translation, result)
+        self.document.save_translated.assert_not_called()
+        result.render()
+        result.render()
+        self.document.save_translated.assert_called_once_with(["TITRE", "CLAUSE"])
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_incremental_translation_reuses_unchanged_paragraphs(self, mock_post):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.document.translated_docx_path = Path(tmp) / "contract_translated.docx"
+            self.document.translated_pdf_path = Path(tmp) / "contract_translated.pdf"
+            def save_translated(texts):
+                self.document.translated_docx_path.touch()
+                self.document.translated_pdf_path.touch()
+                return [self.document.translated_docx_path, self.document.translated_pdf_path]
+            self.document.save_translated.side_effect = save_translated
+            self.translation.incremental = True
+
+            self.document.get_paragraph_texts.return_value = ["Titre", "Clause un", "Clause deux"]
+            self.translation.translate_document()
+            self.document.save_translated.assert_called_with(["TITRE", "CLAUSE UN", "CLAUSE DEUX"])
+
+            mock_post.reset_mock()
+            self.document.get_paragraph_texts.return_value = ["Titre", "Clause une", "Clause deux"]
+            self.translation.translate_document()
+            self.assertEqual(mock_post.call_args.kwargs["json"], [{"text": "Clause une"}])
+            self.document.save_translated.assert_called_with(["TITRE", "CLAUSE UNE", "CLAUSE DEUX"])
+
+            mock_post.reset_mock()
+            self.document.save_translated.reset_mock()
+            self.translation.translate_document()
+            mock_post.assert_not_called()
+            self.document.save_translated.assert_not_called()
+            self.document.set_paths_to_use.assert_called_with(translated=True)
+
+            self.translation.target_language = "de"
+            self.translation.translate_document()
+            self.assertEqual(sum(len(c.kwargs["json"]) for c in mock_post.call_args_list), 3)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_incremental_translation_records_unrendered_translations(self, mock_post):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.document.translated_docx_path = Path(tmp) / "contract_translated.docx"
+            self.document.translated_pdf_path = Path(tmp) / "contract_translated.pdf"
+            self.translation.incremental = True
+            self.document.get_paragraph_texts.return_value = ["Titre", "Clause"]
+
+            self.translation.translate_document(render=False)
+            self.assertEqual(self.translation.translate().paragraphs, ["TITRE", "CLAUSE"])
+            self.assertEqual(mock_post.call_count, 1)
+            self.document.save_translated.assert_not_called()
+
+            # Translations are known, but the translated files were never written.
+            result = self.translation.translate_document()
+            self.assertEqual(mock_post.call_count, 1)
+            self.document.save_translated.assert_called_once_with(["TITRE", "CLAUSE"])
+            self.assertIs(self.document.translation, result)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post", side_effect=fake_translate_response)
+    def test_incremental_translation_without_pdf_rendering(self, mock_post):
+        with tempfile.TemporaryDirectory() as tmp:
+            docx_path = Path(tmp) / "contract.docx"
+            with zipfile.ZipFile(docx_path, "w") as package:
+                package.writestr("[Content_Types].xml", "<Types/>")
+                package.writestr("word/document.xml", """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>
+  <w:p><w:r><w:t>Titre</w:t></w:r></w:p>
+  <w:p><w:r><w:t>Clause</w:t></w:r></w:p>
+</w:body></w:document>""")
+            backend = OpenXmlBackend()
+            self.translation.document = Document(docx_path, backend=backend)
+            self.translation.incremental = True
+
+            self.translation.translate_document()
+            self.assertTrue(self.translation.document.translated_docx_path.exists())
+            self.assertFalse(self.translation.document.translated_pdf_path.exists())
+
+            # The backend renders no PDF, so the DOCX alone is up to date.
+            mock_post.reset_mock()
+            self.translation.document = Document(docx_path, backend=backend)
+            with patch.object(backend, "save_translated") as mock_save:
+                result = self.translation.translate_document()
+            mock_post.assert_not_called()
+            mock_save.assert_not_called()
+            self.assertEqual(result.paragraphs, ["TITRE", "CLAUSE"])
+
+    @patch("contract_analysis.http_transport.HttpTransport.post")
+    def test_confident_local_detection_skips_service(self, mock_post):
+        self.document.extract_text.return_value = (
+            "This Agreement is entered into by and between the Customer and the Supplier. The Supplier "
+            "shall provide the services described in the Statement of Work."
+        )
+        self.translation.check_language_and_translate_if_needed()
+        mock_post.assert_not_called()
+        self.document.set_paths_to_use.assert_called_once_with(translated=False)
+
+    @patch("contract_analysis.http_transport.HttpTransport.post")
+    def test_uncertain_local_detection_uses_service(self, mock_post):
+        self.document.extract_text.return_value = "Supplier: ACME GmbH"
+        response = fake_translate_response(None, json=[])
+        response.json.return_value = [{"detectedLanguage": {"language": "en", "score": 1.0}}]
+        mock_post.return_value = response
+        self.assertEqual(self.translation.detect_language(), "en")
+        mock_post.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
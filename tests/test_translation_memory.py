@@ -0,0 +1,76 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from contract_analysis import TranslationMemory
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "memory.sqlite"
+        # A key is 64 hex characters, so three one-letter translations fit the budget.
+        self.memory = TranslationMemory(self.db_path, max_bytes=200)
+
+    def tearDown(self):
+        self.memory.close()
+        self.tmp.cleanup()
+
+    def test_put_and_get(self):
+        self.memory.put_many([("Hallo Welt", "Hello world")], "de", "en", "3.0")
+        found = self.memory.get_many(["Hallo Welt", "Tschüss"], "de", "en", "3.0")
+        self.assertEqual(found, {"Hallo Welt": "Hello world"})
+        self.assertEqual(self.memory.stats(), {"hits": 1, "misses": 1, "entries": 1, "bytes": 64 + 11})
+
+    def test_normalized_text_shares_entry(self):
+        self.memory.put_many([("Hallo  Welt", "Hello world")], "de", "en", "3.0")
+        self.assertEqual(self.memory.get_many([" Hallo Welt\n"], "de", "en", "3.0"), {" Hallo Welt\n": "Hello world"})
+
+    def test_key_scope(self):
+        self.memory.put_many([("Hallo", "Hello")], "de", "en", "3.0")
+        self.assertEqual(self.memory.get_many(["Hallo"], "de", "fr", "3.0"), {})
+        self.assertEqual(self.memory.get_many(["Hallo"], "nl", "en", "3.0"), {})
+        self.assertEqual(self.memory.get_many(["Hallo"], "de", "en", "4.0"), {})
+
+    def test_persistent(self):
+        self.memory.put_many([("Hallo", "Hello")], "de", "en", "3.0")
+        reopened = TranslationMemory(self.db_path)
+        try:
+            self.assertEqual(reopened.get_many(["Hallo"], "de", "en", "3.0"), {"Hallo": "Hello"})
+        finally:
+            reopened.close()
+
+    def test_evicts_least_recently_used(self):
+        self.memory.put_many([("a", "A"), ("b", "B")], "de", "en", "3.0")
+        self.memory._connection.execute("UPDATE segments SET last_used = 0")
+        self.memory.get_many(["a"], "de", "en", "3.0")
+        self.memory.put_many([("c", "C"), ("d", "D")], "de", "en", "3.0")
+        found = self.memory.get_many(["a", "b", "c", "d"], "de", "en", "3.0")
+        self.assertEqual(sorted(found), ["a", "c", "d"])
+        self.assertEqual(self.memory.stats()["bytes"], 3 * 65)
+
+    def test_replacing_a_segment_updates_stored_bytes(self):
+        self.memory.put_many([("Hallo", "Hello")], "de", "en", "3.0")
+        self.memory.put_many([("Hallo", "Hi")], "de", "en", "3.0")
+        self.assertEqual(self.memory.get_many(["Hallo"], "de", "en", "3.0"), {"Hallo": "Hi"})
+        self.assertEqual(self.memory.stats()["bytes"], 64 + 2)
+
+    def test_sizes_databases_written_without_them(self):
+        path = Path(self.tmp.name) / "old.sqlite"
+        connection = sqlite3.connect(str(path))
+        connection.execute(
+            "CREATE TABLE segments (key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        connection.execute("INSERT INTO segments VALUES (?, 'Grüße', 0)", ("k" * 64,))
+        connection.commit()
+        connection.close()
+        memory = TranslationMemory(path)
+        try:
+            self.assertEqual(memory.stats()["bytes"], 64 + 7)
+        finally:
+            memory.close()
+
+
+if __name__ == "__main__":
+    unittest.main()